@@ -1,12 +1,16 @@
 """Agent factory functions for the Educational Workflow System."""
-from .study_manager import create_study_manager_agent
-from .notes_generator import create_notes_generator_agent
-from .example_solver import create_example_solver_agent
-from .quiz_maker import create_quiz_maker_agent
+from .study_manager import create_study_manager_agent, study_manager_agent_kwargs
+from .notes_generator import create_notes_generator_agent, notes_generator_agent_kwargs
+from .example_solver import create_example_solver_agent, example_solver_agent_kwargs
+from .quiz_maker import create_quiz_maker_agent, quiz_maker_agent_kwargs
 
 __all__ = [
     "create_study_manager_agent",
     "create_notes_generator_agent",
     "create_example_solver_agent",
     "create_quiz_maker_agent",
+    "study_manager_agent_kwargs",
+    "notes_generator_agent_kwargs",
+    "example_solver_agent_kwargs",
+    "quiz_maker_agent_kwargs",
 ]
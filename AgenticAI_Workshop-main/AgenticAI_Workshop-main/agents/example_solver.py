@@ -3,7 +3,7 @@
 # Agent 3: Example Solver
 from __future__ import annotations
 
-from typing import Any, Iterable, Optional
+from typing import Any, Dict, Iterable, Optional
 
 from crewai import Agent
 
@@ -18,12 +18,11 @@ SYSTEM_PROMPT = (
 )
 
 
-def create_example_solver_agent(
+def example_solver_agent_kwargs(
     tools: Optional[Iterable[object]] = None,
-    llm_overrides: dict[str, Any] | None = None,
-) -> Agent:
-    """Create the example solver agent that provides step-by-step problem solutions."""
-    return Agent(
+) -> Dict[str, Any]:
+    """Constructor arguments of the example solver agent (without the LLM)."""
+    return dict(
         name="Example Solver",
         role="Problem-Solving Expert and Solution Provider",
         goal="Solve example problems with detailed step-by-step solutions that teach problem-solving techniques",
@@ -34,9 +33,18 @@ def create_example_solver_agent(
             "logical steps that anyone can follow. Your solutions are thorough yet accessible, making you the perfect "
             "mentor for students learning to solve problems independently."
         ),
-        llm=build_crewai_llm(**(llm_overrides or {})),
         allow_delegation=False,
         verbose=True,
         system_prompt=SYSTEM_PROMPT,
         tools=list(tools or []),
     )
+
+
+def create_example_solver_agent(
+    tools: Optional[Iterable[object]] = None,
+    llm_overrides: dict[str, Any] | None = None,
+) -> Agent:
+    """Create the example solver agent that provides step-by-step problem solutions."""
+    return Agent(
+        **example_solver_agent_kwargs(tools), llm=build_crewai_llm(**(llm_overrides or {}))
+    )
@@ -3,7 +3,7 @@
 # Agent 2: Notes Generator
 from __future__ import annotations
 
-from typing import Any, Iterable, Optional
+from typing import Any, Dict, Iterable, Optional
 
 from crewai import Agent
 
@@ -17,12 +17,11 @@ SYSTEM_PROMPT = (
 )
 
 
-def create_notes_generator_agent(
+def notes_generator_agent_kwargs(
     tools: Optional[Iterable[object]] = None,
-    llm_overrides: dict[str, Any] | None = None,
-) -> Agent:
-    """Create the notes generator agent that produces bullet-point notes and summaries."""
-    return Agent(
+) -> Dict[str, Any]:
+    """Constructor arguments of the notes generator agent (without the LLM)."""
+    return dict(
         name="Notes Generator",
         role="Educational Content Synthesizer and Note Creator",
         goal="Generate clear, bullet-point notes and concise summaries that make complex topics easy to understand",
@@ -33,9 +32,18 @@ def create_notes_generator_agent(
             "grasp even the most challenging subjects. You understand different learning styles and create notes "
             "that work for visual, textual, and logical learners alike."
         ),
-        llm=build_crewai_llm(**(llm_overrides or {})),
         allow_delegation=False,
         verbose=True,
         system_prompt=SYSTEM_PROMPT,
         tools=list(tools or []),
     )
+
+
+def create_notes_generator_agent(
+    tools: Optional[Iterable[object]] = None,
+    llm_overrides: dict[str, Any] | None = None,
+) -> Agent:
+    """Create the notes generator agent that produces bullet-point notes and summaries."""
+    return Agent(
+        **notes_generator_agent_kwargs(tools), llm=build_crewai_llm(**(llm_overrides or {}))
+    )
@@ -3,7 +3,7 @@
 # Agent 4: Quiz Maker
 from __future__ import annotations
 
-from typing import Any, Iterable, Optional
+from typing import Any, Dict, Iterable, Optional
 
 from crewai import Agent
 
@@ -18,12 +18,11 @@ SYSTEM_PROMPT = (
 )
 
 
-def create_quiz_maker_agent(
+def quiz_maker_agent_kwargs(
     tools: Optional[Iterable[object]] = None,
-    llm_overrides: dict[str, Any] | None = None,
-) -> Agent:
-    """Create the quiz maker agent that generates practice questions and answer keys."""
-    return Agent(
+) -> Dict[str, Any]:
+    """Constructor arguments of the quiz maker agent (without the LLM)."""
+    return dict(
         name="Quiz Maker",
         role="Assessment Designer and Question Creator",
         goal="Create comprehensive practice questions including MCQs, short answers, and detailed answer keys",
@@ -34,9 +33,18 @@ def create_quiz_maker_agent(
             "assessments are learning opportunities, not just evaluation tools. Your answer keys don't just provide "
             "correct answers—they explain why answers are correct and help students understand common misconceptions."
         ),
-        llm=build_crewai_llm(**(llm_overrides or {})),
         allow_delegation=False,
         verbose=True,
         system_prompt=SYSTEM_PROMPT,
         tools=list(tools or []),
     )
+
+
+def create_quiz_maker_agent(
+    tools: Optional[Iterable[object]] = None,
+    llm_overrides: dict[str, Any] | None = None,
+) -> Agent:
+    """Create the quiz maker agent that generates practice questions and answer keys."""
+    return Agent(
+        **quiz_maker_agent_kwargs(tools), llm=build_crewai_llm(**(llm_overrides or {}))
+    )
@@ -3,7 +3,7 @@
 # Agent 1: Study Manager
 from __future__ import annotations
 
-from typing import Any, Iterable, Optional
+from typing import Any, Dict, Iterable, Optional
 
 from crewai import Agent
 
@@ -18,12 +18,11 @@ SYSTEM_PROMPT = (
 )
 
 
-def create_study_manager_agent(
+def study_manager_agent_kwargs(
     tools: Optional[Iterable[object]] = None,
-    llm_overrides: dict[str, Any] | None = None,
-) -> Agent:
-    """Create the study manager agent that orchestrates the educational workflow."""
-    return Agent(
+) -> Dict[str, Any]:
+    """Constructor arguments of the study manager agent (without the LLM)."""
+    return dict(
         name="Study Manager",
         role="Educational Workflow Coordinator and Study Plan Architect",
         goal="Orchestrate the creation of comprehensive study materials and define the learning plan and structure",
@@ -33,9 +32,18 @@ def create_study_manager_agent(
             "specialized agents to create cohesive study materials. Your attention to detail and organizational skills "
             "make you perfect for managing the entire educational workflow from planning to final integration."
         ),
-        llm=build_crewai_llm(**(llm_overrides or {})),
         allow_delegation=False,
         verbose=True,
         system_prompt=SYSTEM_PROMPT,
         tools=list(tools or []),
     )
+
+
+def create_study_manager_agent(
+    tools: Optional[Iterable[object]] = None,
+    llm_overrides: dict[str, Any] | None = None,
+) -> Agent:
+    """Create the study manager agent that orchestrates the educational workflow."""
+    return Agent(
+        **study_manager_agent_kwargs(tools), llm=build_crewai_llm(**(llm_overrides or {}))
+    )
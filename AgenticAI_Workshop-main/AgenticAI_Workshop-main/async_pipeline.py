@@ -0,0 +1,187 @@
+"""Async API for serving many concurrent study-pack requests from one event loop.
+
+Requests wait for admission on an asyncio semaphore, so hundreds of queued requests cost
+only coroutines; each admitted run executes the (thread-based) pipeline on a bounded
+executor. Cancelling the awaiting coroutine (e.g. the client disconnected) or running
+past the timeout sets the run's cancel event, and its agents stop at their next step.
+
+    result = await agenerate_study_pack("Photosynthesis", timeout=600)
+    async for event in astream_study_pack("Photosynthesis"):
+        ...
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Optional
+
+from config.settings import MAX_CONCURRENT_RUNS, REQUEST_TIMEOUT_SECONDS
+from pipeline_events import PIPELINE_COMPLETED, PIPELINE_FAILED, PipelineEvent, emit
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionLimiter:
+    """Cap on pipelines running at once; the slot is held until the run's thread finishes.
+
+    A cancelled run keeps its slot until it has actually stopped, so cancellations cannot
+    push more concurrent runs onto the LLM provider than ``max_concurrent``.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_RUNS) -> None:
+        self.max_concurrent = max(1, max_concurrent)
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrent, thread_name_prefix="study-pack"
+        )
+        # asyncio primitives belong to one loop; each loop gets its own semaphore.
+        self._semaphores: weakref.WeakKeyDictionary[Any, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.running = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrent)
+            return semaphore
+
+    async def acquire(self) -> asyncio.Semaphore:
+        """Wait for a slot; pass the returned semaphore to :meth:`release`."""
+        semaphore = self._semaphore()
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        return semaphore
+
+    def release(self, semaphore: asyncio.Semaphore) -> None:
+        self.running -= 1
+        semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": self.running,
+            "waiting": self.waiting,
+        }
+
+
+_limiter: Optional[AdmissionLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_admission_limiter() -> AdmissionLimiter:
+    """Return the process-wide limiter (STUDY_COMPANION_MAX_CONCURRENT_RUNS)."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = AdmissionLimiter()
+        return _limiter
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+async def agenerate_study_pack(
+    topic: str,
+    *,
+    timeout: Optional[float] = REQUEST_TIMEOUT_SECONDS,
+    limiter: Optional[AdmissionLimiter] = None,
+    **kwargs: Any,
+) -> Any:
+    """Await a StudyPackResult; keyword arguments are forwarded to generate_study_pack.
+
+    ``timeout`` (seconds, None or 0 for none) covers waiting for admission and the run
+    itself; on expiry TimeoutError is raised and the run is cancelled. Cancelling the
+    calling task cancels the run as well.
+    """
+    from crew import generate_study_pack
+
+    limiter = limiter or get_admission_limiter()
+    deadline = time.monotonic() + timeout if timeout else None
+    cancel = threading.Event()
+    loop = asyncio.get_running_loop()
+
+    try:
+        slot = await asyncio.wait_for(limiter.acquire(), _remaining(deadline))
+    except asyncio.TimeoutError:
+        raise TimeoutError(
+            f"Study pack for '{topic}' was not admitted within {timeout}s"
+        ) from None
+
+    run = functools.partial(generate_study_pack, topic, cancel=cancel, **kwargs)
+    future = loop.run_in_executor(limiter.executor, contextvars.copy_context().run, run)
+
+    def _finished(done: "asyncio.Future[Any]") -> None:
+        limiter.release(slot)
+        if not done.cancelled():
+            # Marks the error as retrieved when nobody awaits a cancelled run any more.
+            done.exception()
+
+    future.add_done_callback(_finished)
+    try:
+        # Shielded so that cancelling the caller only signals the run; the slot is
+        # released once the run's thread has really stopped.
+        return await asyncio.wait_for(asyncio.shield(future), _remaining(deadline))
+    except asyncio.TimeoutError:
+        cancel.set()
+        logger.warning("Study pack for '%s' timed out after %ss; cancelling", topic, timeout)
+        raise TimeoutError(f"Study pack for '{topic}' not ready within {timeout}s") from None
+    except asyncio.CancelledError:
+        cancel.set()
+        logger.info("Study pack request for '%s' cancelled by the caller", topic)
+        raise
+
+
+async def astream_study_pack(
+    topic: str,
+    *,
+    timeout: Optional[float] = REQUEST_TIMEOUT_SECONDS,
+    limiter: Optional[AdmissionLimiter] = None,
+    **kwargs: Any,
+) -> AsyncIterator[PipelineEvent]:
+    """Yield PipelineEvents as the run progresses, ending with PIPELINE_COMPLETED/FAILED.
+
+    Closing the iterator early (e.g. the client disconnected) cancels the run.
+    """
+    loop = asyncio.get_running_loop()
+    events: "asyncio.Queue[PipelineEvent]" = asyncio.Queue()
+
+    def _on_event(event: PipelineEvent) -> None:
+        loop.call_soon_threadsafe(events.put_nowait, event)
+
+    async def _run() -> None:
+        try:
+            result = await agenerate_study_pack(
+                topic, timeout=timeout, limiter=limiter, on_event=_on_event, **kwargs
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            emit(events.put_nowait, PIPELINE_FAILED, text=str(exc), error=exc)
+        else:
+            emit(events.put_nowait, PIPELINE_COMPLETED, text=result.output, result=result)
+
+    runner = asyncio.ensure_future(_run())
+    try:
+        while True:
+            event = await events.get()
+            yield event
+            if event.type in (PIPELINE_COMPLETED, PIPELINE_FAILED):
+                return
+    finally:
+        if not runner.done():
+            runner.cancel()
@@ -0,0 +1,216 @@
+"""Batch study-pack generation for whole course catalogues."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, List
+from urllib.parse import urlparse
+
+from config.rate_limit import get_rate_limiter
+from config.settings import OpenRouterLLMConfig, get_openrouter_config
+from failover import FailoverPolicy
+
+if TYPE_CHECKING:  # pragma: no cover - typing helpers only
+    from crew import StudyPackResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = Path(__file__).resolve().parent / "outputs"
+
+
+@dataclass
+class BatchSummary:
+    """Aggregate throughput numbers for a batch run."""
+
+    completed: int = 0
+    # Completed topics served whole from the result cache; they used no tokens.
+    cached: int = 0
+    skipped: int = 0
+    failed: List[str] = field(default_factory=list)
+    total_tokens: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def topics_per_hour(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.completed * 3600.0 / self.elapsed_seconds
+
+    @property
+    def tokens_per_topic(self) -> float:
+        """Average tokens of the topics that were actually generated."""
+        generated = self.completed - self.cached
+        return self.total_tokens / generated if generated else 0.0
+
+    def format(self) -> str:
+        return (
+            f"Completed {self.completed} topic(s) ({self.cached} from cache), "
+            f"skipped {self.skipped}, failed {len(self.failed)} "
+            f"in {self.elapsed_seconds:.1f}s | {self.topics_per_hour:.1f} topics/hour | "
+            f"{self.tokens_per_topic:.0f} tokens/topic"
+        )
+
+
+def load_topics(topics_file: Path) -> List[str]:
+    """Read topics from a newline-delimited or JSONL file (``{"topic": ...}`` per line).
+
+    Blank lines and lines starting with ``#`` are ignored; duplicates are dropped.
+    """
+    topics: List[str] = []
+    for line_number, line in enumerate(topics_file.read_text(encoding="utf-8").splitlines(), start=1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("{"):
+            try:
+                record = json.loads(stripped)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"Invalid JSON on line {line_number} of {topics_file}: {exc}") from exc
+            topic = str(record.get("topic", "")).strip()
+            if not topic:
+                raise ValueError(f"Missing 'topic' on line {line_number} of {topics_file}")
+        else:
+            topic = stripped
+        topics.append(topic)
+    return list(dict.fromkeys(topics))
+
+
+def topic_slug(topic: str) -> str:
+    """Return a stable, filesystem-safe file stem for a topic."""
+    readable = re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-")[:60] or "topic"
+    digest = hashlib.sha1(topic.encode("utf-8")).hexdigest()[:8]
+    return f"{readable}-{digest}"
+
+
+def _output_paths(output_dir: Path, topic: str) -> tuple[Path, Path]:
+    stem = topic_slug(topic)
+    return output_dir / f"{stem}.md", output_dir / f"{stem}.json"
+
+
+def is_completed(output_dir: Path, topic: str) -> bool:
+    """True if a finished pack (markdown plus completion metadata) already exists."""
+    pack_path, meta_path = _output_paths(output_dir, topic)
+    if not (pack_path.exists() and meta_path.exists()):
+        return False
+    try:
+        return json.loads(meta_path.read_text(encoding="utf-8")).get("status") == "completed"
+    except (OSError, json.JSONDecodeError):
+        return False
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def _write_pack(output_dir: Path, topic: str, result: StudyPackResult) -> Path:
+    pack_path, meta_path = _output_paths(output_dir, topic)
+    _atomic_write(pack_path, result.output)
+    # Metadata is written last so its presence marks the pack as complete for resumption.
+    metadata = {
+        "topic": topic,
+        "status": "completed",
+        "execution_mode": result.execution_mode,
+        "total_seconds": round(result.total_seconds, 3),
+        "token_usage": result.token_usage,
+        "task_token_usage": result.task_token_usage,
+        "task_timings": {name: round(seconds, 3) for name, seconds in result.task_timings.items()},
+    }
+    _atomic_write(meta_path, json.dumps(metadata, indent=2, ensure_ascii=False))
+    return pack_path
+
+
+def _provider_key(config: OpenRouterLLMConfig) -> str:
+    return urlparse(config.base_url).netloc or config.base_url
+
+
+def run_batch(
+    topics: Iterable[str],
+    *,
+    output_dir: Path = DEFAULT_OUTPUT_DIR,
+    concurrency: int = 2,
+    rate_limit_per_minute: float = 0.0,
+    execution_mode: str | None = None,
+    cache_mode: str = "use",
+    failover: FailoverPolicy | None = None,
+) -> BatchSummary:
+    """Generate study packs for many topics concurrently, skipping already completed ones.
+
+    ``concurrency`` caps simultaneous pipeline runs and ``rate_limit_per_minute`` caps
+    how many runs may start per minute against the configured provider (0 disables it).
+    All runs use the process-wide shared toolkit, so the embedding model, FAISS index,
+    web search session and query caches are loaded once and shared with other callers.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    from crew import generate_study_pack
+    from tools import get_shared_toolkit
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    summary = BatchSummary()
+    pending: List[str] = []
+    for topic in topics:
+        if is_completed(output_dir, topic):
+            summary.skipped += 1
+            logger.info("Skipping already completed topic: %s", topic)
+        else:
+            pending.append(topic)
+
+    config = get_openrouter_config()
+    limiter = (
+        get_rate_limiter(("batch", _provider_key(config)), rate_limit_per_minute)
+        if rate_limit_per_minute > 0
+        else None
+    )
+    shared_tools = get_shared_toolkit()
+
+    def _run_one(topic: str) -> StudyPackResult:
+        if limiter is not None:
+            waited = limiter.acquire()
+            if waited:
+                logger.info("Rate limiter delayed '%s' by %.1fs", topic, waited)
+        result = generate_study_pack(
+            topic,
+            execution_mode=execution_mode,
+            tools=shared_tools,
+            cache_mode=cache_mode,
+            failover=failover,
+        )
+        pack_path = _write_pack(output_dir, topic, result)
+        logger.info("Wrote study pack for '%s' to %s", topic, pack_path)
+        return result
+
+    logger.info(
+        "Batch started: %d pending, %d already completed, concurrency=%d",
+        len(pending),
+        summary.skipped,
+        concurrency,
+    )
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as executor:
+        futures = {executor.submit(_run_one, topic): topic for topic in pending}
+        for future in as_completed(futures):
+            topic = futures[future]
+            try:
+                result = future.result()
+            except Exception:
+                summary.failed.append(topic)
+                logger.exception("Batch generation failed for topic: %s", topic)
+                continue
+            summary.completed += 1
+            if result.from_cache:
+                summary.cached += 1
+            else:
+                summary.total_tokens += result.token_usage
+    summary.elapsed_seconds = time.perf_counter() - started
+
+    logger.info("Batch finished: %s", summary.format())
+    return summary
+
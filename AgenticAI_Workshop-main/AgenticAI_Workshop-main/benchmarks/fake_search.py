@@ -0,0 +1,62 @@
+"""Fixture-backed stand-in for ``duckduckgo_search.DDGS`` used by offline benchmarks."""
+from __future__ import annotations
+
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+FIXTURE_FILE = Path(__file__).resolve().parent / "fixtures" / "search_results.json"
+
+
+class FakeDDGS:
+    """Answer text/news/images searches from a JSON fixture after ``latency_ms``."""
+
+    latency_ms: float = 150.0
+    fixture_file: Path = FIXTURE_FILE
+    calls: int = 0
+
+    def __init__(self, *_args: Any, **_kwargs: Any) -> None:
+        self._templates: List[Dict[str, str]] = json.loads(
+            Path(self.fixture_file).read_text(encoding="utf-8")
+        )
+
+    def __enter__(self) -> "FakeDDGS":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        pass
+
+    def _results(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        type(self).calls += 1
+        time.sleep(self.latency_ms / 1000)
+        slug = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-")
+        return [
+            {key: value.format(query=query, slug=slug) for key, value in template.items()}
+            for template in self._templates[:max_results]
+        ]
+
+    def text(self, query: str, max_results: int = 5, **_kwargs: Any) -> List[Dict[str, str]]:
+        return self._results(query, max_results)
+
+    def news(self, query: str, max_results: int = 5, **_kwargs: Any) -> List[Dict[str, str]]:
+        return [
+            {"title": item["title"], "url": item["href"], "body": item["body"]}
+            for item in self._results(query, max_results)
+        ]
+
+    def images(self, query: str, max_results: int = 5, **_kwargs: Any) -> List[Dict[str, str]]:
+        return [
+            {"title": item["title"], "url": item["href"], "image": item["href"] + ".png"}
+            for item in self._results(query, max_results)
+        ]
+
+
+def install_fake_search(*, latency_ms: float = 150.0) -> None:
+    """Route EducationalWebSearch through FakeDDGS for the rest of the process."""
+    from tools import web_search
+
+    FakeDDGS.latency_ms = latency_ms
+    FakeDDGS.calls = 0
+    web_search.DDGS = FakeDDGS
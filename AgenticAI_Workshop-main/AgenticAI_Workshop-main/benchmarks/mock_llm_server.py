@@ -0,0 +1,247 @@
+"""Local OpenAI-compatible chat completions stub for offline benchmarks.
+
+Replies follow CrewAI's "Final Answer:" format so agents finish after one call. Latency,
+token rate and error injection are configurable:
+
+    python benchmarks/mock_llm_server.py --port 8765 --latency-ms 200 --tokens-per-second 80 \
+        --error-rate 0.05
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+_FILLER = (
+    "Photosynthesis converts light energy into chemical energy stored in glucose. "
+    "Key steps include the light-dependent reactions and the Calvin cycle. "
+    "Practice by explaining each stage in your own words and checking the summary. "
+)
+
+
+@dataclass
+class MockLLMConfig:
+    """Behaviour of the stub: fixed latency plus streaming-rate-bound generation time."""
+
+    latency_ms: float = 100.0
+    tokens_per_second: float = 0.0
+    completion_tokens: int = 300
+    error_rate: float = 0.0
+    # Share of injected errors that are 429s (with Retry-After); the rest are 500s.
+    rate_limit_share: float = 0.7
+    retry_after_seconds: float = 1.0
+    seed: Optional[int] = None
+
+
+class MockLLMServer:
+    """Threaded HTTP server answering /chat/completions and /v1/chat/completions."""
+
+    def __init__(self, config: MockLLMConfig, *, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.config = config
+        self._random = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="mock-llm", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, *_exc: object) -> None:
+        self.stop()
+
+    def _next_error(self) -> Optional[int]:
+        with self._lock:
+            self.requests += 1
+            if self._random.random() >= self.config.error_rate:
+                return None
+            self.errors += 1
+            return 429 if self._random.random() < self.config.rate_limit_share else 500
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *_args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(200, {"data": [{"id": "mock/mock-model", "object": "model"}]})
+                else:
+                    self._send_json(404, {"error": {"message": "not found"}})
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", "0") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+
+                config = server.config
+                time.sleep(config.latency_ms / 1000)
+                status = server._next_error()
+                if status == 429:
+                    self._send_json(
+                        429,
+                        {"error": {"message": "Rate limit exceeded (mock)", "code": 429}},
+                        headers={"Retry-After": f"{config.retry_after_seconds:g}"},
+                    )
+                    return
+                if status is not None:
+                    self._send_json(status, {"error": {"message": "Injected failure (mock)"}})
+                    return
+
+                requested = int(body.get("max_tokens") or config.completion_tokens)
+                completion_tokens = min(config.completion_tokens, requested)
+                if config.tokens_per_second > 0:
+                    time.sleep(completion_tokens / config.tokens_per_second)
+                text = _completion_text(completion_tokens)
+                messages = body.get("messages", [])
+                prompt_tokens = sum(len(str(item.get("content", ""))) // 4 for item in messages)
+                if body.get("stream"):
+                    self._send_stream(body, text, prompt_tokens, completion_tokens)
+                else:
+                    self._send_json(200, _completion(body, text, prompt_tokens, completion_tokens))
+
+            def _send_json(
+                self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None
+            ) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(
+                self, body: Dict[str, Any], text: str, prompt_tokens: int, completion_tokens: int
+            ) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+                words = text.split(" ")
+                for index in range(0, len(words), 8):
+                    piece = " ".join(words[index : index + 8]) + " "
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": body.get("model", "mock"),
+                        "choices": [
+                            {"index": 0, "delta": {"content": piece}, "finish_reason": None}
+                        ],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                final = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": body.get("model", "mock"),
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                    "usage": _usage(prompt_tokens, completion_tokens),
+                }
+                self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+                self.close_connection = True
+
+        return _Handler
+
+
+def _completion_text(tokens: int) -> str:
+    words_needed = max(8, int(tokens * 0.75))
+    words = (_FILLER * (words_needed // len(_FILLER.split()) + 1)).split()[:words_needed]
+    return "Thought: I now know the final answer\nFinal Answer: " + " ".join(words)
+
+
+def _usage(prompt_tokens: int, completion_tokens: int) -> Dict[str, int]:
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _completion(
+    body: Dict[str, Any], text: str, prompt_tokens: int, completion_tokens: int
+) -> Dict[str, Any]:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": _usage(prompt_tokens, completion_tokens),
+    }
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the mock OpenAI-compatible LLM server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="0 = instant")
+    parser.add_argument("--completion-tokens", type=int, default=300)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    mock = MockLLMServer(
+        MockLLMConfig(
+            latency_ms=args.latency_ms,
+            tokens_per_second=args.tokens_per_second,
+            completion_tokens=args.completion_tokens,
+            error_rate=args.error_rate,
+            retry_after_seconds=args.retry_after,
+            seed=args.seed,
+        ),
+        host=args.host,
+        port=args.port,
+    )
+    print(f"Mock LLM listening on {mock.base_url} (Ctrl+C to stop)")
+    try:
+        mock.serve_forever()
+    except KeyboardInterrupt:
+        mock.stop()
@@ -0,0 +1,426 @@
+"""Offline benchmarks of the pipeline, the knowledge retriever and the vector store builder.
+
+OpenRouter is replaced by a local mock server (benchmarks/mock_llm_server.py) and DuckDuckGo
+by a fixture-backed fake (benchmarks/fake_search.py), so runs are repeatable and free:
+
+    python benchmarks/run_benchmarks.py --scenarios pipeline --topics 8 --concurrency 1,4
+    python benchmarks/run_benchmarks.py --scenarios build retriever --corpus-sizes 200,2000
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --tolerance 0.15
+
+Each scenario reports throughput, latency percentiles and peak RSS. With ``--baseline``
+the run exits with status 1 when a metric regresses by more than the tolerance.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+for path in (PROJECT_ROOT, BENCHMARKS_DIR):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+from mock_llm_server import MockLLMConfig, MockLLMServer
+
+SCENARIOS = ("pipeline", "build", "retriever")
+SAMPLE_TOPICS = (
+    "Photosynthesis",
+    "Newton's laws of motion",
+    "Quadratic equations",
+    "The French Revolution",
+    "Python list comprehensions",
+    "Cell division",
+    "Supply and demand",
+    "The water cycle",
+)
+# Metrics where a higher value is better; every other numeric metric is lower-is-better.
+HIGHER_IS_BETTER = {"throughput_per_min", "queries_per_second", "chunks_per_second"}
+COMPARED_METRICS = (
+    "throughput_per_min",
+    "queries_per_second",
+    "chunks_per_second",
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "peak_rss_mb",
+)
+
+_WORDS = (
+    "energy cell matrix vector force motion equation function variable photosynthesis "
+    "chlorophyll revolution economy market demand supply protein enzyme gradient derivative "
+    "integral theorem proof algorithm list loop recursion molecule atom electron orbit climate"
+).split()
+
+
+@dataclass
+class BenchmarkResult:
+    """Metrics for one scenario at one setting (concurrency, corpus size)."""
+
+    scenario: str
+    label: str
+    operations: int
+    errors: int
+    seconds: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    peak_rss_mb: float
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return f"{self.scenario}/{self.label}"
+
+    def values(self) -> Dict[str, float]:
+        return {
+            "p50_ms": self.p50_ms,
+            "p95_ms": self.p95_ms,
+            "p99_ms": self.p99_ms,
+            "peak_rss_mb": self.peak_rss_mb,
+            **self.metrics,
+        }
+
+
+def reset_peak_rss() -> None:
+    """Reset the kernel's peak-RSS counter (Linux only) so each scenario is measured alone."""
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process and its finished children, in MB."""
+    status = Path("/proc/self/status")
+    own_kb = 0.0
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                own_kb = float(line.split()[1])
+    if not own_kb:
+        own_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            own_kb /= 1024
+    children_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    if sys.platform == "darwin":
+        children_kb /= 1024
+    return max(own_kb, children_kb) / 1024
+
+
+def _timed_calls(
+    operations: Sequence[Callable[[], object]], concurrency: int
+) -> tuple[List[float], int, float]:
+    """Run ``operations`` on ``concurrency`` threads; return latencies (ms), errors, seconds."""
+    latencies: List[float] = []
+    errors = 0
+
+    def _one(operation: Callable[[], object]) -> Optional[float]:
+        started = time.perf_counter()
+        try:
+            operation()
+        except Exception as exc:  # pragma: no cover - reported, not raised
+            print(f"  operation failed: {type(exc).__name__}: {exc}")
+            return None
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for latency in executor.map(_one, operations):
+            if latency is None:
+                errors += 1
+            else:
+                latencies.append(latency)
+    return latencies, errors, time.perf_counter() - started
+
+
+def configure_environment(llm_base_url: str, workdir: Path, *, llm_rate_limit: float) -> None:
+    """Point settings at the mock LLM and keep caches/traces out of the real project dirs.
+
+    Must run before anything imports ``config.settings``.
+    """
+    os.environ["OPENROUTER_BASE_URL"] = llm_base_url
+    os.environ.setdefault("OPENROUTER_API_KEY", "sk-mock-benchmark")
+    os.environ["OPENROUTER_FALLBACK_BASE_URLS"] = ""
+    os.environ["OPENROUTER_FALLBACK_MODELS"] = ""
+    os.environ["STUDY_COMPANION_LLM_RATE_LIMIT"] = str(llm_rate_limit)
+    os.environ["STUDY_COMPANION_CACHE_DIR"] = str(workdir / "results")
+    os.environ["STUDY_COMPANION_WEB_CACHE_PATH"] = str(workdir / "web_search.sqlite")
+    os.environ["STUDY_COMPANION_TRACE_FILE"] = str(workdir / "traces.jsonl")
+
+
+def bench_pipeline(
+    server: MockLLMServer, *, topics: int, concurrency: int, execution_mode: str
+) -> BenchmarkResult:
+    from crew import generate_study_pack
+    from tools import get_default_toolkit
+    from tracing import percentile
+
+    shared_tools = get_default_toolkit()
+    names = [
+        f"{SAMPLE_TOPICS[index % len(SAMPLE_TOPICS)]} #{index}" for index in range(topics)
+    ]
+    operations = [
+        lambda topic=topic: generate_study_pack(
+            topic, execution_mode=execution_mode, tools=shared_tools, cache_mode="off"
+        )
+        for topic in names
+    ]
+    requests_before = server.requests
+    reset_peak_rss()
+    latencies, errors, seconds = _timed_calls(operations, concurrency)
+    completed = len(latencies)
+    return BenchmarkResult(
+        scenario="pipeline",
+        label=f"{execution_mode} c={concurrency}",
+        operations=topics,
+        errors=errors,
+        seconds=seconds,
+        p50_ms=percentile(latencies, 50),
+        p95_ms=percentile(latencies, 95),
+        p99_ms=percentile(latencies, 99),
+        peak_rss_mb=peak_rss_mb(),
+        metrics={
+            "throughput_per_min": completed / seconds * 60 if seconds else 0.0,
+            "llm_requests": float(server.requests - requests_before),
+        },
+    )
+
+
+def write_synthetic_corpus(directory: Path, documents: int, *, seed: int = 0) -> None:
+    """Write ``documents`` text files of random study-like prose (about 2-3 chunks each)."""
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    for index in range(documents):
+        paragraphs = []
+        for _ in range(rng.randint(3, 6)):
+            sentences = [
+                " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 16))).capitalize() + "."
+                for _ in range(rng.randint(3, 6))
+            ]
+            paragraphs.append(" ".join(sentences))
+        (directory / f"doc_{index:05d}.txt").write_text("\n\n".join(paragraphs), encoding="utf-8")
+
+
+def bench_build(workdir: Path, documents: int, *, workers: int) -> tuple[BenchmarkResult, Path]:
+    from rag.build_vector_db import build_vector_store
+
+    corpus_dir = workdir / f"corpus_{documents}"
+    store_dir = workdir / f"store_{documents}"
+    write_synthetic_corpus(corpus_dir, documents)
+    reset_peak_rss()
+    started = time.perf_counter()
+    stats = build_vector_store(
+        corpus_dir, vectorstore_dir=store_dir, workers=workers, full_rebuild=True
+    )
+    seconds = time.perf_counter() - started
+    result = BenchmarkResult(
+        scenario="build",
+        label=f"docs={documents} workers={workers}",
+        operations=stats.chunks_added,
+        errors=0,
+        seconds=seconds,
+        p50_ms=0.0,
+        p95_ms=0.0,
+        p99_ms=0.0,
+        peak_rss_mb=peak_rss_mb(),
+        metrics={"chunks_per_second": stats.chunks_added / seconds if seconds else 0.0},
+    )
+    return result, store_dir
+
+
+def bench_retriever(
+    store_dir: Path, documents: int, *, queries: int, concurrency: int, retrieval_mode: str
+) -> BenchmarkResult:
+    from tools.rag_tool import EducationalKnowledgeRetriever
+    from tracing import percentile
+
+    # No result cache: every query must hit the index.
+    retriever = EducationalKnowledgeRetriever(
+        vectorstore_path=store_dir, cache_size=0, retrieval_mode=retrieval_mode
+    )
+    retriever._run("warm up the embedding model and index")
+    rng = random.Random(1)
+    texts = [
+        " ".join(rng.choice(_WORDS) for _ in range(rng.randint(2, 6))) for _ in range(queries)
+    ]
+    operations = [lambda text=text: retriever._run(text) for text in texts]
+    reset_peak_rss()
+    latencies, errors, seconds = _timed_calls(operations, concurrency)
+    return BenchmarkResult(
+        scenario="retriever",
+        label=f"{retrieval_mode} docs={documents} c={concurrency}",
+        operations=queries,
+        errors=errors,
+        seconds=seconds,
+        p50_ms=percentile(latencies, 50),
+        p95_ms=percentile(latencies, 95),
+        p99_ms=percentile(latencies, 99),
+        peak_rss_mb=peak_rss_mb(),
+        metrics={"queries_per_second": len(latencies) / seconds if seconds else 0.0},
+    )
+
+
+def format_results(results: Sequence[BenchmarkResult]) -> str:
+    header = (
+        f"{'benchmark':<42} {'ops':>6} {'errors':>6} {'rate':>12} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'RSS MB':>8}"
+    )
+    units = {"throughput_per_min": "/min", "queries_per_second": "/s", "chunks_per_second": " ch/s"}
+    lines = [header, "-" * len(header)]
+    for result in results:
+        rate_name = next((name for name in units if name in result.metrics), "")
+        rate = f"{result.metrics.get(rate_name, 0.0):.1f}{units.get(rate_name, '')}"
+        lines.append(
+            f"{result.key[:42]:<42} {result.operations:>6} {result.errors:>6} {rate:>12} "
+            f"{result.p50_ms:>9.1f} {result.p95_ms:>9.1f} {result.p99_ms:>9.1f} "
+            f"{result.peak_rss_mb:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+def compare_to_baseline(
+    results: Sequence[BenchmarkResult], baseline: Dict[str, Dict[str, float]], tolerance: float
+) -> List[str]:
+    """Print per-metric changes against the baseline and return the regressions."""
+    regressions: List[str] = []
+    print(f"\nComparison with baseline (tolerance {tolerance:.0%}):")
+    for result in results:
+        previous = baseline.get(result.key)
+        if previous is None:
+            print(f"  {result.key}: not in baseline")
+            continue
+        for metric, value in result.values().items():
+            old = previous.get(metric)
+            if metric not in COMPARED_METRICS or not old:
+                continue
+            change = (value - old) / old
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = "REGRESSION" if worse > tolerance else ""
+            print(
+                f"  {result.key:<42} {metric:<20} {old:>10.1f} -> {value:>10.1f} "
+                f"({change:+.1%}) {flag}"
+            )
+            if flag:
+                regressions.append(f"{result.key} {metric} {change:+.1%}")
+    return regressions
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Offline benchmarks with a mock LLM and fake search."
+    )
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--topics", type=int, default=8, help="Pipeline runs per concurrency level")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 4])
+    parser.add_argument("--execution-mode", choices=("parallel", "sequential"), default="parallel")
+    parser.add_argument("--corpus-sizes", type=_int_list, default=[200, 1000], help="Documents")
+    parser.add_argument("--queries", type=int, default=200, help="Retriever queries per setting")
+    parser.add_argument("--retrieval-mode", choices=("dense", "hybrid"), default="hybrid")
+    parser.add_argument("--build-workers", type=int, default=1)
+
+    mock = parser.add_argument_group("mock services")
+    mock.add_argument("--llm-latency-ms", type=float, default=200.0)
+    mock.add_argument("--llm-tokens-per-second", type=float, default=0.0, help="0 = instant")
+    mock.add_argument("--llm-error-rate", type=float, default=0.0)
+    mock.add_argument(
+        "--llm-rate-limit", type=float, default=0.0, help="Client-side limit per minute (0 = off)"
+    )
+    mock.add_argument("--search-latency-ms", type=float, default=150.0)
+
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--save-baseline", type=Path, help="Store results as the new baseline")
+    parser.add_argument("--baseline", type=Path, help="Compare against a stored baseline")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.10, help="Allowed regression (0.10 = 10%%)"
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = _parse_args()
+    workdir = Path(tempfile.mkdtemp(prefix="study-companion-bench-"))
+    server = MockLLMServer(
+        MockLLMConfig(
+            latency_ms=args.llm_latency_ms,
+            tokens_per_second=args.llm_tokens_per_second,
+            error_rate=args.llm_error_rate,
+            seed=0,
+        )
+    ).start()
+    configure_environment(server.base_url, workdir, llm_rate_limit=args.llm_rate_limit)
+    from fake_search import install_fake_search
+
+    install_fake_search(latency_ms=args.search_latency_ms)
+    print(f"Mock LLM at {server.base_url}; working directory {workdir}")
+
+    results: List[BenchmarkResult] = []
+    try:
+        if "pipeline" in args.scenarios:
+            for concurrency in args.concurrency:
+                print(f"Pipeline: {args.topics} topics at concurrency {concurrency}...")
+                results.append(
+                    bench_pipeline(
+                        server,
+                        topics=args.topics,
+                        concurrency=concurrency,
+                        execution_mode=args.execution_mode,
+                    )
+                )
+        if "build" in args.scenarios or "retriever" in args.scenarios:
+            for documents in args.corpus_sizes:
+                print(f"Building vector store over {documents} documents...")
+                build_result, store_dir = bench_build(
+                    workdir, documents, workers=args.build_workers
+                )
+                if "build" in args.scenarios:
+                    results.append(build_result)
+                if "retriever" in args.scenarios:
+                    for concurrency in args.concurrency:
+                        print(f"Retriever: {args.queries} queries at concurrency {concurrency}...")
+                        results.append(
+                            bench_retriever(
+                                store_dir,
+                                documents,
+                                queries=args.queries,
+                                concurrency=concurrency,
+                                retrieval_mode=args.retrieval_mode,
+                            )
+                        )
+    finally:
+        server.stop()
+
+    print()
+    print(format_results(results))
+    payload = {result.key: {**asdict(result), **result.values()} for result in results}
+    if args.output:
+        args.output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"\nBaseline saved to {args.save_baseline}")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
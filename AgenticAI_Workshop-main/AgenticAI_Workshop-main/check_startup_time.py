@@ -0,0 +1,113 @@
+"""Check that the CLI and the Streamlit frontend start without importing heavy backends.
+
+Fails (exit status 1) when a cold ``python main.py --help`` takes longer than the budget,
+or when importing the modules the frontend needs pulls in CrewAI, LangChain, FAISS,
+DuckDuckGo or sentence-transformers:
+
+    python check_startup_time.py
+    python check_startup_time.py --budget 1.0 --runs 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+DEFAULT_BUDGET_SECONDS = float(os.getenv("STUDY_COMPANION_STARTUP_BUDGET_SECONDS", "1.5"))
+# Modules that must only be imported once a pipeline, tool or LLM is actually used.
+HEAVY_MODULES = (
+    "crewai",
+    "litellm",
+    "langchain_openai",
+    "langchain_community",
+    "duckduckgo_search",
+    "sentence_transformers",
+    "torch",
+    "faiss",
+    "httpx",
+)
+# What frontend/app.py imports before its first render, plus packages that must stay
+# cheap to import (the tools package loads its tool modules lazily).
+FRONTEND_IMPORTS = ("main", "pipeline_events", "tasks", "tools")
+
+_PROBE = """
+import json, sys
+for name in {modules!r}:
+    __import__(name)
+heavy = sorted({{name.split(".")[0] for name in sys.modules}} & set({heavy!r}))
+print(json.dumps(heavy))
+"""
+
+
+def time_help(runs: int) -> list[float]:
+    """Wall-clock seconds of ``python main.py --help`` in fresh interpreters."""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "main.py", "--help"],
+            cwd=PROJECT_ROOT,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def heavy_modules_loaded(modules: tuple[str, ...] = FRONTEND_IMPORTS) -> list[str]:
+    """Heavy top-level packages present after importing ``modules`` (the frontend's)."""
+    probe = _PROBE.format(modules=modules, heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=PROJECT_ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET_SECONDS,
+        help="Maximum median seconds for a cold 'python main.py --help'",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Cold starts to measure")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    failed = False
+
+    print("🔍 Checking imports needed before the first frontend render...")
+    heavy = heavy_modules_loaded()
+    if heavy:
+        print(f"❌ Imported eagerly: {', '.join(heavy)}")
+        failed = True
+    else:
+        print("✓ No heavy backends imported")
+
+    print(f"\n⏱️  Timing {args.runs} cold run(s) of 'python main.py --help'...")
+    timings = time_help(max(1, args.runs))
+    median = statistics.median(timings)
+    print(f"   runs: {', '.join(f'{seconds:.2f}s' for seconds in timings)}")
+    if median > args.budget:
+        print(f"❌ Median {median:.2f}s is over the {args.budget:.2f}s budget")
+        failed = True
+    else:
+        print(f"✓ Median {median:.2f}s is within the {args.budget:.2f}s budget")
+
+    print("\n" + "=" * 60)
+    print("❌ Startup check failed" if failed else "✅ Startup check passed")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
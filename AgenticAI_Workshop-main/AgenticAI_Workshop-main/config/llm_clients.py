@@ -0,0 +1,155 @@
+"""Process-wide registry of LLM clients sharing keep-alive HTTP connection pools."""
+from __future__ import annotations
+
+import importlib.util
+import json
+import logging
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Hashable, Tuple, TypeVar
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional ``h2`` package (``pip install httpx[http2]``)."""
+    return importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class ConnectionStats:
+    """Requests sent versus connections opened for one origin."""
+
+    requests: int = 0
+    connections_opened: int = 0
+    tls_handshakes: int = 0
+
+    @property
+    def reuse_rate(self) -> float:
+        """Share of requests that went over an already open connection."""
+        if not self.requests:
+            return 0.0
+        return max(0.0, 1.0 - self.connections_opened / self.requests)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {**asdict(self), "reuse_rate": self.reuse_rate}
+
+
+class _CountingTransport(httpx.HTTPTransport):
+    """HTTP transport that records, per origin, how often a request needed a new connection."""
+
+    def __init__(
+        self, stats: Dict[str, ConnectionStats], lock: threading.Lock, **kwargs: Any
+    ) -> None:
+        super().__init__(**kwargs)
+        self._stats = stats
+        self._lock = lock
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        origin = f"{request.url.scheme}://{request.url.netloc.decode('ascii')}"
+        with self._lock:
+            stats = self._stats.setdefault(origin, ConnectionStats())
+            stats.requests += 1
+
+        # httpcore reports connection set-up through the "trace" request extension.
+        previous = request.extensions.get("trace")
+
+        def _trace(event: str, info: Dict[str, Any]) -> None:
+            if event == "connection.connect_tcp.complete":
+                with self._lock:
+                    stats.connections_opened += 1
+            elif event == "connection.start_tls.complete":
+                with self._lock:
+                    stats.tls_handshakes += 1
+            if previous is not None:
+                previous(event, info)
+
+        request.extensions["trace"] = _trace
+        return super().handle_request(request)
+
+
+class LLMClientRegistry:
+    """Build stateless LLM clients once per (provider, base_url, model) and share HTTP pools.
+
+    One pooled ``httpx.Client`` serves every client of a provider; httpx keeps a separate
+    keep-alive pool per origin, so each base URL reuses its own connections. CrewAI ``LLM``
+    objects are not cached here: they carry per-run state (stop words, callbacks, token
+    usage), so each agent builds its own on top of the shared pool.
+    """
+
+    def __init__(self, *, pool_size: int = 20, http2: bool = True) -> None:
+        self.pool_size = max(1, pool_size)
+        self.http2 = http2 and http2_available()
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._http_clients: Dict[str, httpx.Client] = {}
+        self._clients: Dict[Hashable, Any] = {}
+        self._stats: Dict[str, ConnectionStats] = {}
+
+    def http_client(self, provider: str) -> httpx.Client:
+        """Return the pooled HTTP client used for every ``provider`` request."""
+        with self._lock:
+            client = self._http_clients.get(provider)
+            if client is None:
+                limits = httpx.Limits(
+                    max_connections=self.pool_size, max_keepalive_connections=self.pool_size
+                )
+                transport = _CountingTransport(
+                    self._stats, self._stats_lock, http2=self.http2, limits=limits
+                )
+                client = httpx.Client(
+                    transport=transport, timeout=httpx.Timeout(120.0, connect=10.0)
+                )
+                self._http_clients[provider] = client
+                logger.info(
+                    "Opened %s HTTP pool (size %d, HTTP/2 %s)",
+                    provider,
+                    self.pool_size,
+                    "on" if self.http2 else "off",
+                )
+            return client
+
+    def get_or_create(
+        self, key: Tuple[str, str, str], options: Dict[str, Any], factory: Callable[[], T]
+    ) -> T:
+        """Return the client cached for (provider, base_url, model) plus ``options``."""
+        cache_key = (*key, json.dumps(options, sort_keys=True, default=repr))
+        with self._lock:
+            client = self._clients.get(cache_key)
+        if client is not None:
+            return client
+        created = factory()
+        with self._lock:
+            return self._clients.setdefault(cache_key, created)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Connection reuse statistics per origin (e.g. ``https://openrouter.ai``)."""
+        with self._stats_lock:
+            return {origin: stats.as_dict() for origin, stats in self._stats.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            for client in self._http_clients.values():
+                client.close()
+            self._http_clients.clear()
+            self._clients.clear()
+        with self._stats_lock:
+            self._stats.clear()
+
+
+_registry: LLMClientRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_llm_client_registry(*, pool_size: int = 20, http2: bool = True) -> LLMClientRegistry:
+    """Return the process-wide registry; the options only apply on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = LLMClientRegistry(pool_size=pool_size, http2=http2)
+        return _registry
+
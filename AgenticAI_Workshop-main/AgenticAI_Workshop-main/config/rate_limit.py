@@ -0,0 +1,181 @@
+"""Thread-safe token-bucket rate limiting and 429-aware retries shared across the process."""
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate_per_minute`` tokens refill continuously up to ``burst``."""
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        *,
+        burst: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(1, int(rate_per_minute // 60)))
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_second)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available; otherwise return the seconds to wait before retrying."""
+        with self._lock:
+            now = self._clock()
+            if now < self._paused_until:
+                return self._paused_until - now
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate_per_second
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for ``seconds`` (e.g. a server's Retry-After) and drop saved-up burst."""
+        with self._lock:
+            now = self._clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until tokens are available and return the total time spent waiting."""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(tokens)
+            if delay <= 0:
+                return waited
+            self._sleep(delay)
+            waited += delay
+
+
+_BUCKETS: Dict[Hashable, TokenBucket] = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(key: Hashable, rate_per_minute: float, *, burst: int | None = None) -> TokenBucket:
+    """Return the process-wide bucket for ``key``, creating it on first use."""
+    with _BUCKETS_LOCK:
+        bucket = _BUCKETS.get(key)
+        if bucket is None:
+            bucket = TokenBucket(rate_per_minute, burst=burst)
+            _BUCKETS[key] = bucket
+        return bucket
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    for candidate in (exc, getattr(exc, "response", None)):
+        code = getattr(candidate, "status_code", None)
+        if isinstance(code, int):
+            return code
+    return None
+
+
+def _error_chain(exc: BaseException) -> Iterator[BaseException]:
+    seen = set()
+    current: Optional[BaseException] = exc
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        yield current
+        current = current.__cause__ or current.__context__
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """True for HTTP 429 / provider rate-limit errors, including wrapped ones."""
+    for error in _error_chain(exc):
+        if _status_code(error) == 429 or type(error).__name__ == "RateLimitError":
+            return True
+    return False
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Read ``Retry-After`` / ``retry-after-ms`` from the HTTP response attached to ``exc``."""
+    for error in _error_chain(exc):
+        headers: Any = getattr(getattr(error, "response", None), "headers", None)
+        if not headers:
+            continue
+        millis = headers.get("retry-after-ms")
+        if millis:
+            try:
+                return max(0.0, float(millis) / 1000.0)
+            except ValueError:
+                pass
+        value = headers.get("retry-after")
+        if not value:
+            continue
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                continue
+    return None
+
+
+def backoff_delay(attempt: int, *, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0.0, min(cap, base * (2 ** attempt)))
+
+
+def call_with_rate_limit(
+    fn: Callable[[], T],
+    bucket: Optional[TokenBucket],
+    *,
+    max_retries: int,
+    backoff_base: float,
+    backoff_max: float,
+    label: str = "request",
+    sleep: Callable[[float], None] = time.sleep,
+) -> T:
+    """Run ``fn`` under ``bucket``, retrying rate-limit errors with jittered backoff.
+
+    A server-provided Retry-After pauses the shared bucket, so every caller of the same
+    model backs off together instead of each discovering the limit with its own 429.
+    """
+    attempt = 0
+    while True:
+        if bucket is not None:
+            waited = bucket.acquire()
+            if waited > 1.0:
+                logger.info("Rate limiter delayed %s by %.1fs", label, waited)
+        try:
+            return fn()
+        except Exception as exc:
+            if attempt >= max_retries or not is_rate_limit_error(exc):
+                raise
+            retry_after = retry_after_seconds(exc)
+            if retry_after is not None:
+                delay = min(retry_after, backoff_max) + random.uniform(0.0, backoff_base)
+                if bucket is not None:
+                    bucket.pause(delay)
+            else:
+                delay = backoff_delay(attempt, base=backoff_base, cap=backoff_max)
+            attempt += 1
+            logger.warning(
+                "%s was rate limited; retry %d/%d in %.1fs", label, attempt, max_retries, delay
+            )
+            if bucket is None or retry_after is None:
+                sleep(delay)
@@ -3,20 +3,26 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
 from typing import Dict, Any, TYPE_CHECKING
 
-from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from crewai.llm import LLM
+from config.rate_limit import call_with_rate_limit, get_rate_limiter
 
 if TYPE_CHECKING:  # pragma: no cover - typing helpers only
+    from crewai.llm import LLM
+    from langchain_openai import ChatOpenAI
     from openai import OpenAI
 
-# Ensure environment variables from a local .env file are available during development.
-load_dotenv()
+    from config.llm_clients import LLMClientRegistry
+
+# Importing this module must stay cheap (``python main.py --help``, the first Streamlit
+# render): CrewAI, LangChain and httpx are imported on first use, and .env files are
+# loaded by the entry points (main.py, frontend/app.py) before they import settings.
 
 MODEL_NAME = "meta-llama/llama-3.3-70b-instruct:free"
-OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+# Overridable so benchmarks and tests can point the pipeline at a local OpenAI-compatible server.
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
 OPENROUTER_DEFAULT_HEADERS = {
     "HTTP-Referer": "https://github.com/study-companion/ai-education",
     "X-Title": "Study Companion - AI Educational System",
@@ -25,6 +31,132 @@ OPENROUTER_DEFAULT_HEADERS = {
 # Get API key from environment (Streamlit injects it from secrets)
 API_KEY = os.getenv("OPENROUTER_API_KEY", "")
 
+# "parallel" runs notes/examples/quiz concurrently once the study plan exists;
+# "sequential" keeps CrewAI's Process.sequential behaviour.
+EXECUTION_MODES = ("parallel", "sequential")
+EXECUTION_MODE = os.getenv("STUDY_COMPANION_EXECUTION_MODE", "parallel").strip().lower()
+
+# Content-addressed cache of study packs and per-task outputs (see result_cache.py).
+RESULT_CACHE_DIR = Path(
+    os.getenv("STUDY_COMPANION_CACHE_DIR", "")
+    or Path(__file__).resolve().parents[1] / ".cache" / "results"
+)
+RESULT_CACHE_MAX_BYTES = int(float(os.getenv("STUDY_COMPANION_CACHE_MAX_MB", "200")) * 1024 * 1024)
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("STUDY_COMPANION_CACHE_TTL_HOURS", "168")) * 3600
+
+# How fallback LLM attempts are scheduled (see failover.py): "sequential" tries them one
+# by one, "hedged" starts the next one when the current one is slow, "race" runs several.
+FALLBACK_STRATEGIES = ("sequential", "hedged", "race")
+FALLBACK_STRATEGY = os.getenv("STUDY_COMPANION_FALLBACK_STRATEGY", "sequential").strip().lower()
+HEDGE_DELAY_SECONDS = float(os.getenv("STUDY_COMPANION_HEDGE_DELAY_SECONDS", "45"))
+RACE_WIDTH = int(os.getenv("STUDY_COMPANION_RACE_WIDTH", "2"))
+# Hedged and racing attempts beyond the first still running in this process, counted
+# until their thread has really stopped (cancelled losers finish their current step).
+MAX_SPECULATIVE_ATTEMPTS = int(os.getenv("STUDY_COMPANION_MAX_SPECULATIVE_ATTEMPTS", "4"))
+
+# On-disk DuckDuckGo result cache shared by every crew and batch run (tools/search_cache.py).
+# Offline mode serves web searches from this cache only, so tests and replays need no network.
+WEB_SEARCH_CACHE_PATH = Path(
+    os.getenv("STUDY_COMPANION_WEB_CACHE_PATH", "")
+    or Path(__file__).resolve().parents[1] / ".cache" / "web_search.sqlite"
+)
+WEB_SEARCH_CACHE_TTL_SECONDS = float(os.getenv("STUDY_COMPANION_WEB_CACHE_TTL_HOURS", "24")) * 3600
+WEB_SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("STUDY_COMPANION_WEB_CACHE_MAX_ENTRIES", "5000"))
+WEB_SEARCH_OFFLINE = os.getenv("STUDY_COMPANION_WEB_SEARCH_OFFLINE", "").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+
+# Fan each web search out to these DuckDuckGo backends and to this many rewritten query
+# variants in parallel; whatever has arrived when the deadline passes is returned.
+WEB_SEARCH_BACKENDS = [
+    name.strip()
+    for name in os.getenv("STUDY_COMPANION_WEB_SEARCH_BACKENDS", "text").split(",")
+    if name.strip()
+]
+WEB_SEARCH_QUERY_VARIANTS = int(os.getenv("STUDY_COMPANION_WEB_SEARCH_QUERY_VARIANTS", "0"))
+WEB_SEARCH_DEADLINE_SECONDS = float(os.getenv("STUDY_COMPANION_WEB_SEARCH_DEADLINE_SECONDS", "15"))
+
+# Before notes/examples/quiz start, search the knowledge base for every subtopic of the
+# study plan in one batch and hand the passages to those tasks (see prefetch.py).
+KNOWLEDGE_PREFETCH = os.getenv("STUDY_COMPANION_KNOWLEDGE_PREFETCH", "1").strip().lower() not in (
+    "0",
+    "false",
+    "no",
+    "off",
+)
+
+# Client-side request budget per (model, base URL), shared by every crew in the process.
+# OpenRouter's free tier allows roughly 20 requests per minute; 0 disables the limiter.
+LLM_RATE_LIMIT_PER_MINUTE = float(os.getenv("STUDY_COMPANION_LLM_RATE_LIMIT", "20"))
+LLM_RATE_LIMIT_BURST = int(os.getenv("STUDY_COMPANION_LLM_RATE_BURST", "3"))
+# 429 responses are retried in place (honouring Retry-After) before failover kicks in.
+LLM_MAX_RETRIES = int(os.getenv("STUDY_COMPANION_LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("STUDY_COMPANION_LLM_BACKOFF_BASE_SECONDS", "2"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("STUDY_COMPANION_LLM_BACKOFF_MAX_SECONDS", "60"))
+
+# Opt-in spans for each run, task, tool call and LLM request (see tracing.py), appended as
+# JSONL. The file rolls over to TRACE_BACKUPS numbered backups once it reaches the size limit.
+# Set STUDY_COMPANION_TRACE_OTEL=1 to mirror them to OpenTelemetry as well.
+TRACING_ENABLED = os.getenv("STUDY_COMPANION_TRACING", "").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+TRACE_FILE = Path(
+    os.getenv("STUDY_COMPANION_TRACE_FILE", "")
+    or Path(__file__).resolve().parents[1] / "logs" / "traces.jsonl"
+)
+TRACE_MAX_BYTES = int(float(os.getenv("STUDY_COMPANION_TRACE_MAX_MB", "50")) * 1024 * 1024)
+TRACE_BACKUPS = int(os.getenv("STUDY_COMPANION_TRACE_BACKUPS", "3"))
+TRACE_OTEL = os.getenv("STUDY_COMPANION_TRACE_OTEL", "").strip().lower() in ("1", "true", "yes", "on")
+
+# Keep-alive connections per LLM origin, shared by every client built in this process.
+# HTTP/2 is used when the optional h2 package is installed.
+LLM_HTTP_POOL_SIZE = int(os.getenv("STUDY_COMPANION_LLM_POOL_SIZE", "20"))
+LLM_HTTP2 = os.getenv("STUDY_COMPANION_LLM_HTTP2", "1").strip().lower() not in (
+    "0",
+    "false",
+    "no",
+    "off",
+)
+
+# Load the embedding model and index and open LLM connections in a background thread when
+# the Streamlit app (or a worker) starts, so the first request does not pay for it (warmup.py).
+WARMUP_ENABLED = os.getenv("STUDY_COMPANION_WARMUP", "1").strip().lower() not in (
+    "0",
+    "false",
+    "no",
+    "off",
+)
+
+# Async API (async_pipeline.py): pipelines running at once per process (further requests
+# wait without holding a thread) and the default per-request timeout (0 = no timeout).
+MAX_CONCURRENT_RUNS = int(os.getenv("STUDY_COMPANION_MAX_CONCURRENT_RUNS", "4"))
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("STUDY_COMPANION_REQUEST_TIMEOUT_SECONDS", "900"))
+
+# Durable job queue (jobs.py): the frontend submits topics instead of running them inline
+# when enabled, and `python main.py --worker` starts JOB_WORKERS worker processes per host.
+JOB_QUEUE_ENABLED = os.getenv("STUDY_COMPANION_JOB_QUEUE", "").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+JOB_DB_PATH = Path(
+    os.getenv("STUDY_COMPANION_JOB_DB", "")
+    or Path(__file__).resolve().parents[1] / ".cache" / "jobs.sqlite"
+)
+JOB_WORKERS = int(os.getenv("STUDY_COMPANION_JOB_WORKERS", "2"))
+JOB_POLL_SECONDS = float(os.getenv("STUDY_COMPANION_JOB_POLL_SECONDS", "2"))
+# A running job whose worker has not sent a heartbeat for this long is queued again, up
+# to JOB_MAX_ATTEMPTS claims in total.
+JOB_LEASE_SECONDS = float(os.getenv("STUDY_COMPANION_JOB_LEASE_SECONDS", "120"))
+JOB_MAX_ATTEMPTS = int(os.getenv("STUDY_COMPANION_JOB_MAX_ATTEMPTS", "3"))
+
 LLM_CONFIG: Dict[str, object] = {
     "model": MODEL_NAME,
     "openrouter_api_key": API_KEY,
@@ -60,49 +192,134 @@ class OpenRouterLLMConfig:
     )
 
 
-def get_openrouter_client() -> "OpenAI":
-    """Instantiate an OpenAI-compatible client configured for OpenRouter."""
-    from openai import OpenAI
+@lru_cache(maxsize=1)
+def get_openrouter_config() -> OpenRouterLLMConfig:
+    """Return the process-wide OpenRouter config, parsed from the environment once."""
+    return OpenRouterLLMConfig()
+
+
+def get_llm_clients() -> "LLMClientRegistry":
+    """Return the shared LLM client registry (pooled HTTP connections and reuse stats)."""
+    from config.llm_clients import get_llm_client_registry
+
+    return get_llm_client_registry(pool_size=LLM_HTTP_POOL_SIZE, http2=LLM_HTTP2)
+
 
-    config = OpenRouterLLMConfig()
+def _require_api_key(config: OpenRouterLLMConfig) -> None:
     if not config.api_key:
         raise ValueError(
             "OPENROUTER_API_KEY is missing. Set it in your environment or .env file."
         )
-    return OpenAI(
-        base_url=config.base_url,
-        api_key=config.api_key,
-        default_headers=config.headers,
+
+
+def get_openrouter_client() -> "OpenAI":
+    """Return the shared OpenAI-compatible client configured for OpenRouter."""
+    from openai import OpenAI
+
+    config = get_openrouter_config()
+    _require_api_key(config)
+    registry = get_llm_clients()
+    return registry.get_or_create(
+        ("openai", config.base_url, ""),
+        {},
+        lambda: OpenAI(
+            base_url=config.base_url,
+            api_key=config.api_key,
+            default_headers=config.headers,
+            http_client=registry.http_client("openai"),
+        ),
     )
 
 
-def build_openrouter_chat_llm(**overrides: Any) -> ChatOpenAI:
+def build_openrouter_chat_llm(**overrides: Any) -> "ChatOpenAI":
     """Return a LangChain ChatOpenAI client configured for OpenRouter usage."""
+    from langchain_openai import ChatOpenAI
 
-    config = OpenRouterLLMConfig()
-    if not config.api_key:
-        raise ValueError(
-            "OPENROUTER_API_KEY is missing. Set it in your environment or .env file."
-        )
+    config = get_openrouter_config()
+    _require_api_key(config)
 
-    return ChatOpenAI(
-        model=overrides.get("model", config.model),
-        api_key=config.api_key,
-        base_url=config.base_url,
-        temperature=overrides.get("temperature", config.temperature),
-        max_tokens=overrides.get("max_tokens", config.max_tokens),
-        default_headers=config.headers,
+    model = overrides.get("model", config.model)
+    temperature = overrides.get("temperature", config.temperature)
+    max_tokens = overrides.get("max_tokens", config.max_tokens)
+    registry = get_llm_clients()
+    return registry.get_or_create(
+        ("langchain", config.base_url, model),
+        {"temperature": temperature, "max_tokens": max_tokens},
+        lambda: ChatOpenAI(
+            model=model,
+            api_key=config.api_key,
+            base_url=config.base_url,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            default_headers=config.headers,
+            http_client=registry.http_client("openai"),
+        ),
     )
 
 
-def build_crewai_llm(**overrides: Any) -> LLM:
-    """Return a CrewAI LLM instance configured for OpenRouter via LiteLLM."""
+@lru_cache(maxsize=1)
+def _rate_limited_llm_class() -> type:
+    """Define RateLimitedLLM on first use, so importing settings does not import CrewAI."""
+    from crewai.llm import LLM
 
-    config = OpenRouterLLMConfig()
-    if not config.api_key:
-        raise ValueError(
-            "OPENROUTER_API_KEY is missing. Set it in your environment or .env file."
-        )
+    class RateLimitedLLM(LLM):
+        """CrewAI LLM whose calls share a token bucket per (model, base URL) and retry 429s."""
+
+        def call(self, *args: Any, **kwargs: Any) -> Any:
+            from tracing import LLM as LLM_SPAN, span
+
+            model = str(getattr(self, "model", ""))
+            base_url = str(
+                getattr(self, "base_url", None) or getattr(self, "api_base", None) or ""
+            )
+            bucket = (
+                get_rate_limiter(
+                    ("llm", model, base_url), LLM_RATE_LIMIT_PER_MINUTE, burst=LLM_RATE_LIMIT_BURST
+                )
+                if LLM_RATE_LIMIT_PER_MINUTE > 0
+                else None
+            )
+            tries = 0
+
+            def _call() -> Any:
+                nonlocal tries
+                tries += 1
+                return super(RateLimitedLLM, self).call(*args, **kwargs)
+
+            with span(LLM_SPAN, model, base_url=base_url) as llm_span:
+                try:
+                    response = call_with_rate_limit(
+                        _call,
+                        bucket,
+                        max_retries=LLM_MAX_RETRIES,
+                        backoff_base=LLM_BACKOFF_BASE_SECONDS,
+                        backoff_max=LLM_BACKOFF_MAX_SECONDS,
+                        label=f"LLM call to {model}",
+                    )
+                finally:
+                    llm_span.set(rate_limit_retries=max(0, tries - 1))
+                llm_span.set(response_chars=len(response) if isinstance(response, str) else 0)
+                return response
+
+    return RateLimitedLLM
+
+
+def __getattr__(name: str) -> Any:
+    # ``from config.settings import RateLimitedLLM`` keeps working without an eager CrewAI import.
+    if name == "RateLimitedLLM":
+        return _rate_limited_llm_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def build_crewai_llm(**overrides: Any) -> "LLM":
+    """Return a new CrewAI LLM configured for OpenRouter via LiteLLM.
+
+    Each agent needs its own instance: CrewAI keeps stop words, callbacks and token usage
+    on the LLM object. Only the underlying keep-alive HTTP pool is shared.
+    """
+
+    config = get_openrouter_config()
+    _require_api_key(config)
 
     raw_model = overrides.get("model", config.model)
     provider_override = overrides.get("provider")
@@ -142,4 +359,13 @@ def build_crewai_llm(**overrides: Any) -> LLM:
     # Allow callers to extend with LiteLLM-specific parameters.
     llm_kwargs.update(overrides.get("litellm_params", {}))
 
-    return LLM(**llm_kwargs)
+    _use_pooled_litellm_session(get_llm_clients())
+    return _rate_limited_llm_class()(**llm_kwargs)
+
+
+def _use_pooled_litellm_session(registry: "LLMClientRegistry") -> None:
+    """Route LiteLLM's OpenAI-compatible calls through the shared keep-alive pool."""
+    import litellm
+
+    if getattr(litellm, "client_session", None) is None:
+        litellm.client_session = registry.http_client("litellm")
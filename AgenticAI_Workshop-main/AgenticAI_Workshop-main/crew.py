@@ -2,44 +2,108 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
-
-from crewai import Crew, Process
-
-from agents import (
-    create_study_manager_agent,
-    create_notes_generator_agent,
-    create_example_solver_agent,
-    create_quiz_maker_agent,
+import queue
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+from crewai import Crew, Process, Task
+from crewai.tools import BaseTool
+
+from agents.example_solver import SYSTEM_PROMPT as EXAMPLE_SOLVER_PROMPT
+from agents.notes_generator import SYSTEM_PROMPT as NOTES_GENERATOR_PROMPT
+from agents.quiz_maker import SYSTEM_PROMPT as QUIZ_MAKER_PROMPT
+from agents.study_manager import SYSTEM_PROMPT as STUDY_MANAGER_PROMPT
+from config.settings import (
+    EXECUTION_MODE,
+    EXECUTION_MODES,
+    KNOWLEDGE_PREFETCH,
+    OpenRouterLLMConfig,
+    get_llm_clients,
+    get_openrouter_config,
+)
+from crew_factory import build_task, build_tasks
+from failover import (
+    AttemptControl,
+    FailoverPolicy,
+    cancellable_run,
+    cancellation_check,
+    check_run_cancelled,
+    run_with_failover,
+)
+from pipeline_events import (
+    ATTEMPT_FAILED,
+    PIPELINE_COMPLETED,
+    PIPELINE_FAILED,
+    TASK_COMPLETED,
+    TASK_STARTED,
+    EventCallback,
+    PipelineEvent,
+    bind_tasks,
+    emit,
+    unbind_tasks,
+)
+from prefetch import PlanPrefetcher
+from result_cache import ResultCache, content_key, get_result_cache, normalize_topic
+from scheduler import TaskRunResult, agent_usage, execute_crewai_task, run_task_graph
+from tasks import (
+    EXAMPLES_TASK,
+    NOTES_TASK,
+    QUIZ_TASK,
+    STUDY_PLAN_TASK,
+    TASK_DEPENDENCIES,
 )
-from config.settings import OpenRouterLLMConfig
-from tasks import build_educational_tasks
-from tools import get_default_toolkit
+from token_budget import get_token_budgets
+from tracing import ATTEMPT, RUN, TASK, get_tracer, span
+from tools import get_shared_toolkit
 
 logger = logging.getLogger(__name__)
 
-
-def create_educational_crew(llm_overrides: dict[str, Any] | None = None) -> Crew:
-    """Instantiate educational workflow crew with all 4 specialized agents."""
-    tools = get_default_toolkit()
-    
-    # Create all 4 educational agents
-    study_manager = create_study_manager_agent(tools=tools, llm_overrides=llm_overrides)
-    notes_generator = create_notes_generator_agent(tools=tools, llm_overrides=llm_overrides)
-    example_solver = create_example_solver_agent(tools=tools, llm_overrides=llm_overrides)
-    quiz_maker = create_quiz_maker_agent(tools=tools, llm_overrides=llm_overrides)
-    
-    # Create tasks for all agents
-    tasks = build_educational_tasks(
-        study_manager,
-        notes_generator,
-        example_solver,
-        quiz_maker,
-        tools=tools
-    )
+# "use" reads and writes the result cache, "refresh" only writes, "off" bypasses it.
+CACHE_MODES = ("use", "refresh", "off")
+
+# Agent system prompts are part of each task's cache key, so editing one agent's
+# prompt only invalidates that agent's task (and the tasks downstream of it).
+_TASK_SYSTEM_PROMPTS: Dict[str, str] = {
+    STUDY_PLAN_TASK: STUDY_MANAGER_PROMPT,
+    NOTES_TASK: NOTES_GENERATOR_PROMPT,
+    EXAMPLES_TASK: EXAMPLE_SOLVER_PROMPT,
+    QUIZ_TASK: QUIZ_MAKER_PROMPT,
+}
+
+
+@dataclass
+class StudyPackResult:
+    """Merged study pack text plus per-task outputs and wall-clock timings."""
+
+    output: str
+    task_outputs: Dict[str, str] = field(default_factory=dict)
+    task_timings: Dict[str, float] = field(default_factory=dict)
+    total_seconds: float = 0.0
+    token_usage: int = 0
+    # Per task: prompt_tokens, completion_tokens and total_tokens (empty for cached tasks).
+    task_token_usage: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    execution_mode: str = EXECUTION_MODE
+    from_cache: bool = False
+
+
+def create_educational_crew(
+    llm_overrides: dict[str, Any] | None = None,
+    *,
+    tools: Sequence[BaseTool] | None = None,
+) -> Crew:
+    """Instantiate educational workflow crew with all 4 specialized agents.
+
+    Agents, tasks and LLMs are built fresh for each crew (see crew_factory.py); only the
+    tools are shared.
+    """
+    tools = list(tools) if tools is not None else get_shared_toolkit()
+    tasks = build_tasks(llm_overrides, tools)
 
     return Crew(
-        agents=[study_manager, notes_generator, example_solver, quiz_maker],
+        agents=[task.agent for task in tasks],
         tasks=tasks,
         process=Process.sequential,
         verbose=True,
@@ -99,10 +163,327 @@ def _sanitize_overrides(overrides: dict[str, Any]) -> dict[str, Any]:
     return sanitized
 
 
+def _resolve_execution_mode(execution_mode: str | None) -> str:
+    mode = (execution_mode or EXECUTION_MODE).strip().lower()
+    if mode not in EXECUTION_MODES:
+        raise ValueError(
+            f"Unknown execution mode '{mode}'. Expected one of: {', '.join(EXECUTION_MODES)}"
+        )
+    return mode
+
+
+def _merge_task_outputs(task_outputs: Dict[str, str]) -> str:
+    """Combine per-task outputs into a single markdown study pack."""
+    sections = [
+        f"## {name}\n\n{text.strip()}" for name, text in task_outputs.items() if text.strip()
+    ]
+    return "\n\n---\n\n".join(sections)
+
+
+def _crew_output_text(result: Any) -> str:
+    if isinstance(result, str):
+        return result
+    candidate = (
+        getattr(result, "raw", None)
+        or getattr(result, "raw_output", None)
+        or getattr(result, "output", None)
+    )
+    return str(candidate) if candidate else str(result)
+
+
+def _crew_token_usage(crew: Crew) -> int:
+    """Best-effort total token count reported by the crew's agents."""
+    metrics: Any = None
+    calculate = getattr(crew, "calculate_usage_metrics", None)
+    if calculate is not None:
+        try:
+            metrics = calculate()
+        except Exception:  # pragma: no cover - depends on CrewAI internals
+            logger.debug("Unable to calculate crew usage metrics", exc_info=True)
+    if metrics is None:
+        metrics = getattr(crew, "usage_metrics", None)
+    if isinstance(metrics, dict):
+        return int(metrics.get("total_tokens", 0) or 0)
+    return int(getattr(metrics, "total_tokens", 0) or 0)
+
+
+def _kickoff_sequential(
+    crew: Crew,
+    topic: str,
+    *,
+    on_event: Optional[EventCallback] = None,
+    progressed: Optional[threading.Event] = None,
+) -> StudyPackResult:
+    """Run the crew with Process.sequential, timing each task from its completion callback.
+
+    ``progressed`` is set once the first task has completed (see FailoverPolicy hedging).
+    """
+    timings: Dict[str, float] = {}
+    task_names = [task.name for task in crew.tasks]
+    last_mark = time.perf_counter()
+
+    def _record_task_completion(task_output: Any) -> None:
+        nonlocal last_mark
+        now = time.perf_counter()
+        index = len(timings)
+        name = getattr(task_output, "name", None) or task_names[index]
+        timings[str(name)] = now - last_mark
+        last_mark = now
+        if progressed is not None:
+            progressed.set()
+        get_tracer().record(TASK, str(name), timings[str(name)])
+        emit(
+            on_event,
+            TASK_COMPLETED,
+            task=str(name),
+            text=_crew_output_text(task_output),
+            seconds=timings[str(name)],
+            cached=False,
+        )
+        if index + 1 < len(task_names):
+            emit(on_event, TASK_STARTED, task=task_names[index + 1])
+
+    crew.task_callback = _record_task_completion
+    bind_tasks(crew.tasks, on_event)
+    emit(on_event, TASK_STARTED, task=task_names[0])
+    try:
+        result = crew.kickoff(inputs={"topic": topic})
+    finally:
+        unbind_tasks(crew.tasks)
+
+    task_outputs = {
+        task.name: _crew_output_text(task.output)
+        for task in crew.tasks
+        if getattr(task, "output", None)
+    }
+    return StudyPackResult(
+        output=_crew_output_text(result),
+        task_outputs=task_outputs,
+        task_timings=timings,
+        execution_mode="sequential",
+    )
+
+
+class _AttemptEventGate:
+    """Forward streaming events from one attempt at a time so hedged attempts don't interleave.
+
+    The first attempt to emit an event becomes the leader; if it fails, the next attempt
+    to emit takes over.
+    """
+
+    def __init__(self, on_event: Optional[EventCallback], task: Optional[str] = None) -> None:
+        self._on_event = on_event
+        self._task = task
+        self._leader: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def for_attempt(self, attempt: int) -> Optional[EventCallback]:
+        if self._on_event is None:
+            return None
+
+        def _forward(event: PipelineEvent) -> None:
+            with self._lock:
+                if self._leader is None:
+                    self._leader = attempt
+                if self._leader != attempt:
+                    return
+            self._on_event(event)
+
+        return _forward
+
+    def is_leader(self, attempt: int) -> bool:
+        with self._lock:
+            return self._leader == attempt
+
+    def failed(self, attempt: int, exc: Exception) -> None:
+        with self._lock:
+            was_leader = self._leader == attempt
+            if was_leader:
+                self._leader = None
+        emit(
+            self._on_event,
+            ATTEMPT_FAILED,
+            task=self._task,
+            text=str(exc),
+            attempt=attempt,
+            reset=was_leader,
+        )
+
+
+def _with_streaming(overrides: dict[str, Any], on_event: Optional[EventCallback]) -> dict[str, Any]:
+    """Enable LLM streaming when someone listens; CrewAI only emits token chunks then."""
+    if on_event is None:
+        return overrides
+    return {
+        **overrides,
+        "litellm_params": {**overrides.get("litellm_params", {}), "stream": True},
+    }
+
+
+def _build_single_task(
+    name: str, overrides: dict[str, Any], tools: Sequence[BaseTool]
+) -> Task:
+    """Build one task and its agent, e.g. to retry just that task with a fallback LLM."""
+    return build_task(name, overrides, tools)
+
+
+def _task_cache_keys(
+    tasks: Sequence[Task], topic: str, overrides: dict[str, Any], config: OpenRouterLLMConfig
+) -> Dict[str, str]:
+    """Derive a content hash per task from its prompts, model settings and upstream keys.
+
+    Keys describe the requested (primary) model configuration, so an output produced by a
+    fallback model is stored under the same key. They also cover the knowledge-base build
+    the tasks' tools read and whether plan prefetching is on, so a rebuilt knowledge base
+    or a toggled prefetch does not serve outputs grounded in other passages.
+    """
+    model = overrides.get("model", config.model)
+    temperature = overrides.get("temperature", config.temperature)
+    normalized_topic = normalize_topic(topic)
+    knowledge = _knowledge_versions(tasks)
+    keys: Dict[str, str] = {}
+    # Tasks are ordered so that dependencies always precede their dependents.
+    for task in tasks:
+        agent = task.agent
+        keys[task.name] = content_key(
+            "task",
+            normalized_topic,
+            task.name,
+            task.description,
+            task.expected_output,
+            getattr(agent, "role", None),
+            getattr(agent, "goal", None),
+            getattr(agent, "backstory", None),
+            _TASK_SYSTEM_PROMPTS.get(task.name),
+            model,
+            temperature,
+            KNOWLEDGE_PREFETCH,
+            knowledge,
+            [keys[dep] for dep in TASK_DEPENDENCIES.get(task.name, ())],
+        )
+    return keys
+
+
+def _knowledge_versions(tasks: Sequence[Task]) -> list[list[Any]]:
+    """Return the live build of every vector store the tasks' tools search."""
+    paths = sorted(
+        {
+            str(tool.vectorstore_path)
+            for task in tasks
+            for tool in [*(task.tools or []), *(getattr(task.agent, "tools", None) or [])]
+            if getattr(tool, "vectorstore_path", None) is not None
+        }
+    )
+    if not paths:
+        return []
+    from tools.vectorstore_registry import store_version
+
+    return [[path, list(store_version(Path(path)))] for path in paths]
+
+
+def _cached_task_outputs(cache: ResultCache, task_keys: Dict[str, str]) -> Dict[str, str]:
+    """Return the outputs of the tasks whose per-task cache entry is present."""
+    outputs: Dict[str, str] = {}
+    for name, key in task_keys.items():
+        entry = cache.get(key)
+        if entry is not None:
+            outputs[name] = entry["output"]
+    return outputs
+
+
+def _log_result(result: StudyPackResult) -> None:
+    for name, text in result.task_outputs.items():
+        logger.info(
+            "Task '%s' output (%.2fs):\n%s", name, result.task_timings.get(name, 0.0), text
+        )
+    for name, usage in result.task_token_usage.items():
+        logger.info(
+            "Task '%s' used %d prompt + %d completion tokens",
+            name,
+            usage.get("prompt_tokens", 0),
+            usage.get("completion_tokens", 0),
+        )
+    logger.info(
+        "Crew completed in %.2fs with final output length=%d characters (%d tokens)",
+        result.total_seconds,
+        len(result.output),
+        result.token_usage,
+    )
+
+
+def _log_tool_cache_stats(tools: Sequence[BaseTool]) -> None:
+    """Log cumulative hit rates of tools that keep a query cache (e.g. the knowledge retriever)."""
+    for tool in tools:
+        cache_stats = getattr(tool, "cache_stats", None)
+        stats = cache_stats() if callable(cache_stats) else None
+        if stats:
+            logger.info(
+                "%s cache so far: %d exact + %d semantic hits, %d misses (hit rate %.0f%%)",
+                tool.name,
+                stats["exact_hits"],
+                stats["semantic_hits"],
+                stats["misses"],
+                stats["hit_rate"] * 100,
+            )
+
+
+def _log_connection_stats() -> None:
+    """Log how many LLM requests reused a pooled keep-alive connection."""
+    for origin, stats in get_llm_clients().stats().items():
+        logger.info(
+            "LLM connections to %s so far: %d requests over %d connections (reuse %.0f%%)",
+            origin,
+            stats["requests"],
+            stats["connections_opened"],
+            stats["reuse_rate"] * 100,
+        )
+
+
 def _execute_crew(
-    topic: str, overrides: dict[str, Any], config: OpenRouterLLMConfig
-) -> str:
-    crew = create_educational_crew(llm_overrides=overrides)
+    topic: str,
+    overrides: dict[str, Any],
+    config: OpenRouterLLMConfig,
+    *,
+    tools: Sequence[BaseTool] | None = None,
+    cache: ResultCache | None = None,
+    read_cache: bool = True,
+    cache_overrides: dict[str, Any] | None = None,
+    on_event: Optional[EventCallback] = None,
+    control: Optional[AttemptControl] = None,
+) -> StudyPackResult:
+    """Run one whole-crew attempt with Process.sequential."""
+    crew = create_educational_crew(llm_overrides=_with_streaming(overrides, on_event), tools=tools)
+    task_keys = _task_cache_keys(
+        crew.tasks, topic, overrides if cache_overrides is None else cache_overrides, config
+    )
+    pack_key = content_key("pack", "sequential", list(task_keys.values()))
+
+    if cache is not None and read_cache:
+        cached_pack = cache.get(pack_key)
+        if cached_pack is not None:
+            logger.info("Study pack for topic '%s' served from result cache", topic)
+            cached_result = StudyPackResult(**{**cached_pack, "from_cache": True})
+            for name, text in cached_result.task_outputs.items():
+                emit(on_event, TASK_COMPLETED, task=name, text=text, seconds=0.0, cached=True)
+            return cached_result
+        # One kickoff runs every task, so per-task entries (e.g. written by a parallel run)
+        # are only reused here when all of them are present; partial reuse is parallel-only.
+        cached_outputs = _cached_task_outputs(cache, task_keys)
+        if len(cached_outputs) == len(crew.tasks):
+            logger.info("Study pack for topic '%s' assembled from cached task outputs", topic)
+            for name, text in cached_outputs.items():
+                emit(on_event, TASK_COMPLETED, task=name, text=text, seconds=0.0, cached=True)
+            return StudyPackResult(
+                output=cached_outputs[crew.tasks[-1].name],
+                task_outputs=cached_outputs,
+                execution_mode="sequential",
+                from_cache=True,
+            )
+
+    if control is not None:
+        for agent in crew.agents:
+            agent.step_callback = cancellation_check(control.cancel)
+
     provider_label = overrides.get("provider", "openrouter-liteLLM")
     model_label = overrides.get("model", config.model)
     base_url_label = overrides.get("base_url", config.base_url)
@@ -113,39 +494,52 @@ def _execute_crew(
         model_label,
         base_url_label,
     )
-    result = crew.kickoff(inputs={"topic": topic})
-
+    started = time.perf_counter()
+    result = _kickoff_sequential(
+        crew,
+        topic,
+        on_event=on_event,
+        progressed=control.progressed if control is not None else None,
+    )
+    result.total_seconds = time.perf_counter() - started
+    result.token_usage = _crew_token_usage(crew)
+    budgets = get_token_budgets()
     for task in crew.tasks:
-        task_output = getattr(task, "output", None)
-        if task_output:
-            logger.info("Task '%s' output:\n%s", task.name, task_output)
-
-    if isinstance(result, str):
-        logger.info("Crew completed with final output length=%d characters", len(result))
-        return result
-
-    candidate = getattr(result, "raw_output", None) or getattr(result, "output", None)
-    if candidate:
-        output_text = str(candidate)
-        logger.info("Crew completed with final output length=%d characters", len(output_text))
-        return output_text
-
-    output_text = str(result)
-    logger.info("Crew completed with final output length=%d characters", len(output_text))
-    return output_text
-
-
-def run_educational_pipeline(topic: str) -> str:
-    """Run the educational crew for a given study topic with OpenRouter fallback attempts."""
-
-    config = OpenRouterLLMConfig()
-    attempts = _build_llm_attempts(config)
-
-    last_error: Exception | None = None
+        usage = agent_usage(task.agent)
+        budgets.record(task.name, usage.completion_tokens, usage.requests)
+        result.task_token_usage[task.name] = {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens,
+        }
+
+    # A losing hedged/racing attempt may still finish; only the winner writes the cache.
+    if cache is not None and not (control is not None and control.cancel.is_set()):
+        for name, text in result.task_outputs.items():
+            if name in task_keys:
+                cache.put(task_keys[name], {"output": text})
+        cache.put(pack_key, asdict(result))
+    _log_result(result)
+    return result
+
+
+def _run_sequential(
+    topic: str,
+    attempts: list[dict[str, Any]],
+    config: OpenRouterLLMConfig,
+    policy: FailoverPolicy,
+    *,
+    tools: Sequence[BaseTool],
+    cache: ResultCache | None,
+    read_cache: bool,
+    on_event: Optional[EventCallback],
+) -> StudyPackResult:
+    """Run whole-crew attempts (Process.sequential) under the failover policy."""
     total_attempts = len(attempts)
+    gate = _AttemptEventGate(on_event)
 
-    for index, overrides in enumerate(attempts, start=1):
-        try:
+    def _attempt(index: int, overrides: dict[str, Any]) -> Callable[[AttemptControl], StudyPackResult]:
+        def _run(control: AttemptControl) -> StudyPackResult:
             if overrides:
                 logger.info(
                     "Attempt %d/%d using overrides: %s",
@@ -153,23 +547,303 @@ def run_educational_pipeline(topic: str) -> str:
                     total_attempts,
                     _sanitize_overrides(overrides),
                 )
-            result = _execute_crew(topic, overrides, config)
-            if index > 1:
-                logger.info(
-                    "Fallback succeeded on attempt %d/%d with overrides: %s",
-                    index,
-                    total_attempts,
-                    _sanitize_overrides(overrides),
+            with span(
+                ATTEMPT, "crew", attempt=index, model=overrides.get("model", config.model)
+            ) as attempt_span:
+                result = _execute_crew(
+                    topic,
+                    overrides,
+                    config,
+                    tools=tools,
+                    cache=cache,
+                    read_cache=read_cache,
+                    cache_overrides=attempts[0],
+                    on_event=gate.for_attempt(index),
+                    control=control,
                 )
+                attempt_span.set(total_tokens=result.token_usage, cached=result.from_cache)
             return result
-        except Exception as exc:  # pragma: no cover - runtime resilience path
-            last_error = exc
-            logger.exception(
-                "Crew run failed on attempt %d/%d with overrides %s",
+
+        return _run
+
+    def _failed(index: int, exc: Exception) -> None:  # pragma: no cover - runtime resilience path
+        logger.error(
+            "Crew run failed on attempt %d/%d with overrides %s",
+            index,
+            total_attempts,
+            _sanitize_overrides(attempts[index - 1]),
+            exc_info=exc,
+        )
+        gate.failed(index, exc)
+
+    started = time.perf_counter()
+    result, winner = run_with_failover(
+        [_attempt(index, overrides) for index, overrides in enumerate(attempts, start=1)],
+        policy,
+        label="Educational crew",
+        on_failure=_failed,
+    )
+    if winner > 1:
+        logger.info(
+            "Fallback succeeded on attempt %d/%d with overrides: %s",
+            winner,
+            total_attempts,
+            _sanitize_overrides(attempts[winner - 1]),
+        )
+    if not gate.is_leader(winner):
+        # The streamed events came from a losing attempt; replay the winner's sections.
+        for name, text in result.task_outputs.items():
+            emit(
+                on_event,
+                TASK_COMPLETED,
+                task=name,
+                text=text,
+                seconds=result.task_timings.get(name, 0.0),
+                cached=result.from_cache,
+            )
+    if not result.from_cache:
+        result.total_seconds = time.perf_counter() - started
+    return result
+
+
+def _run_parallel(
+    topic: str,
+    attempts: list[dict[str, Any]],
+    config: OpenRouterLLMConfig,
+    policy: FailoverPolicy,
+    *,
+    tools: Sequence[BaseTool],
+    cache: ResultCache | None,
+    read_cache: bool,
+    on_event: Optional[EventCallback],
+) -> StudyPackResult:
+    """Run the task graph with per-task failover, keeping every completed task output.
+
+    Notes, examples and quiz start concurrently once the study plan exists, with
+    knowledge-base passages for the plan's subtopics prefetched into their context. If
+    a task fails, only that task is retried with the next LLM attempt.
+    """
+    task_names = list(TASK_DEPENDENCIES)
+    total_attempts = len(attempts)
+    primary = attempts[0]
+    # Tasks for the primary attempt are built up front: they supply the cache keys and
+    # are reused for each task's first attempt.
+    primary_tasks = {
+        name: _build_single_task(name, _with_streaming(primary, on_event), tools)
+        for name in task_names
+    }
+    task_keys = _task_cache_keys(list(primary_tasks.values()), topic, primary, config)
+    pack_key = content_key("pack", "parallel", list(task_keys.values()))
+
+    cached_outputs: Dict[str, str] = {}
+    if cache is not None and read_cache:
+        cached_pack = cache.get(pack_key)
+        if cached_pack is not None:
+            logger.info("Study pack for topic '%s' served from result cache", topic)
+            cached_result = StudyPackResult(**{**cached_pack, "from_cache": True})
+            for name, text in cached_result.task_outputs.items():
+                emit(on_event, TASK_COMPLETED, task=name, text=text, seconds=0.0, cached=True)
+            return cached_result
+        cached_outputs = _cached_task_outputs(cache, task_keys)
+
+    prefetcher = PlanPrefetcher(topic, tools) if KNOWLEDGE_PREFETCH else None
+    graph_cancel = threading.Event()
+
+    def _execute(name: str, context: str) -> TaskRunResult:
+        gate = _AttemptEventGate(on_event, task=name)
+        if prefetcher is not None and STUDY_PLAN_TASK in TASK_DEPENDENCIES[name]:
+            context = prefetcher.augment(context)
+
+        def _attempt(index: int, overrides: dict[str, Any]) -> Callable[[AttemptControl], TaskRunResult]:
+            def _run(control: AttemptControl) -> TaskRunResult:
+                task = primary_tasks.pop(name, None) if index == 1 else None
+                if task is None:
+                    logger.info(
+                        "Task '%s' attempt %d/%d using overrides: %s",
+                        name,
+                        index,
+                        total_attempts,
+                        _sanitize_overrides(overrides),
+                    )
+                    task = _build_single_task(name, _with_streaming(overrides, on_event), tools)
+                # A single-task attempt has progressed once its agent completed a step.
+                # It also stops once a sibling task has failed and the graph is aborted.
+                task.agent.step_callback = cancellation_check(
+                    control.cancel, progressed=control.progressed, graph_cancel=graph_cancel
+                )
+                with span(
+                    ATTEMPT, name, attempt=index, model=overrides.get("model", config.model)
+                ) as attempt_span:
+                    result = execute_crewai_task(
+                        task, {"topic": topic}, context, on_event=gate.for_attempt(index)
+                    )
+                    attempt_span.set(total_tokens=result.token_usage)
+                return result
+
+            return _run
+
+        def _failed(index: int, exc: Exception) -> None:  # pragma: no cover - runtime resilience path
+            logger.error(
+                "Task '%s' failed on attempt %d/%d with overrides %s",
+                name,
                 index,
                 total_attempts,
-                _sanitize_overrides(overrides),
+                _sanitize_overrides(attempts[index - 1]),
+                exc_info=exc,
             )
+            gate.failed(index, exc)
+
+        result, winner = run_with_failover(
+            [_attempt(index, overrides) for index, overrides in enumerate(attempts, start=1)],
+            policy,
+            label=f"Task '{name}'",
+            on_failure=_failed,
+        )
+        result.attempt = winner
+        get_token_budgets().record(name, result.completion_tokens, result.llm_requests)
+        return result
+
+    def _store_task(task_result: TaskRunResult) -> None:
+        if cache is not None:
+            cache.put(task_keys[task_result.name], {"output": task_result.output})
+
+    logger.info(
+        "Educational task graph started for topic: %s (model=%s base_url=%s strategy=%s)",
+        topic,
+        primary.get("model", config.model),
+        primary.get("base_url", config.base_url),
+        policy.strategy,
+    )
+    started = time.perf_counter()
+    results = run_task_graph(
+        task_names,
+        TASK_DEPENDENCIES,
+        _execute,
+        completed=cached_outputs,
+        on_task_complete=_store_task,
+        on_event=on_event,
+        cancel=graph_cancel,
+    )
+    task_outputs = {name: result.output for name, result in results.items()}
+    result = StudyPackResult(
+        output=_merge_task_outputs(task_outputs),
+        task_outputs=task_outputs,
+        task_timings={name: task_result.seconds for name, task_result in results.items()},
+        total_seconds=time.perf_counter() - started,
+        token_usage=sum(task_result.token_usage for task_result in results.values()),
+        task_token_usage={
+            name: {
+                "prompt_tokens": task_result.prompt_tokens,
+                "completion_tokens": task_result.completion_tokens,
+                "total_tokens": task_result.token_usage,
+            }
+            for name, task_result in results.items()
+            if not task_result.cached
+        },
+        execution_mode="parallel",
+    )
+    if cache is not None:
+        cache.put(pack_key, asdict(result))
+    _log_result(result)
+    return result
+
+
+def run_educational_pipeline(
+    topic: str,
+    *,
+    execution_mode: str | None = None,
+    tools: Sequence[BaseTool] | None = None,
+    cache_mode: str = "use",
+    on_event: Optional[EventCallback] = None,
+    failover: FailoverPolicy | None = None,
+) -> str:
+    """Run the educational crew for a given study topic with OpenRouter fallback attempts.
+
+    ``on_event`` receives PipelineEvent updates (task start, tool call, token delta,
+    task completion) while the crew runs.
+    """
+    return generate_study_pack(
+        topic,
+        execution_mode=execution_mode,
+        tools=tools,
+        cache_mode=cache_mode,
+        on_event=on_event,
+        failover=failover,
+    ).output
+
 
-    assert last_error is not None  # defensive: should be set if all attempts failed
-    raise last_error
+def stream_educational_pipeline(topic: str, **kwargs: Any) -> Iterator[PipelineEvent]:
+    """Yield PipelineEvents as the pipeline runs in a background thread.
+
+    The last event is PIPELINE_COMPLETED (``data["result"]`` holds the StudyPackResult)
+    or PIPELINE_FAILED (``data["error"]`` holds the exception). Keyword arguments are
+    forwarded to generate_study_pack.
+    """
+    events: "queue.Queue[PipelineEvent]" = queue.Queue()
+
+    def _run() -> None:
+        try:
+            result = generate_study_pack(topic, on_event=events.put, **kwargs)
+        except Exception as exc:
+            emit(events.put, PIPELINE_FAILED, text=str(exc), error=exc)
+        else:
+            emit(events.put, PIPELINE_COMPLETED, text=result.output, result=result)
+
+    threading.Thread(target=_run, name="study-pack-stream", daemon=True).start()
+    while True:
+        event = events.get()
+        yield event
+        if event.type in (PIPELINE_COMPLETED, PIPELINE_FAILED):
+            return
+
+
+def generate_study_pack(
+    topic: str,
+    *,
+    execution_mode: str | None = None,
+    tools: Sequence[BaseTool] | None = None,
+    cache_mode: str = "use",
+    on_event: Optional[EventCallback] = None,
+    failover: FailoverPolicy | None = None,
+    cancel: Optional[threading.Event] = None,
+) -> StudyPackResult:
+    """Run the educational pipeline and return the merged pack with per-task timings.
+
+    Pass ``tools`` to reuse one toolkit across many runs (e.g. batch generation); by
+    default the process-wide shared toolkit is used.
+    ``cache_mode`` is one of CACHE_MODES and controls the on-disk result cache.
+    ``failover`` selects how fallback LLM attempts are scheduled; in parallel mode
+    failover happens per task, so completed task outputs are kept. Setting ``cancel``
+    stops the run at the agents' next step with PipelineCancelled.
+    """
+
+    mode = _resolve_execution_mode(execution_mode)
+    if cache_mode not in CACHE_MODES:
+        raise ValueError(
+            f"Unknown cache mode '{cache_mode}'. Expected one of: {', '.join(CACHE_MODES)}"
+        )
+    cache = get_result_cache() if cache_mode != "off" else None
+    policy = failover or FailoverPolicy()
+    config = get_openrouter_config()
+    attempts = _build_llm_attempts(config)
+    shared_tools = list(tools) if tools is not None else get_shared_toolkit()
+
+    run = _run_parallel if mode == "parallel" else _run_sequential
+    with cancellable_run(cancel), span(
+        RUN, topic, execution_mode=mode, cache_mode=cache_mode, strategy=policy.strategy
+    ) as run_span:
+        check_run_cancelled()
+        result = run(
+            topic,
+            attempts,
+            config,
+            policy,
+            tools=shared_tools,
+            cache=cache,
+            read_cache=cache_mode == "use",
+            on_event=on_event,
+        )
+        run_span.set(total_tokens=result.token_usage, cached=result.from_cache)
+    _log_tool_cache_stats(shared_tools)
+    _log_connection_stats()
+    return result
@@ -0,0 +1,66 @@
+"""Agent and task construction for one run, sharing only the toolkit.
+
+Every run gets fresh Agent, Task and LLM objects, so no output, context, callback or
+token count leaks from one run into the next; only the tools and the pooled HTTP
+connections are shared. (CrewAI's own ``copy()`` helpers differ between versions: some
+deep-copy the tools or drop the LLM, so constructed objects are not cached and copied.)
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from agents import (
+    example_solver_agent_kwargs,
+    notes_generator_agent_kwargs,
+    quiz_maker_agent_kwargs,
+    study_manager_agent_kwargs,
+)
+from config.settings import build_crewai_llm
+from tasks import (
+    EXAMPLES_TASK,
+    NOTES_TASK,
+    QUIZ_TASK,
+    STUDY_PLAN_TASK,
+    TASK_DEPENDENCIES,
+    example_solving_task_kwargs,
+    notes_generation_task_kwargs,
+    quiz_making_task_kwargs,
+    study_management_task_kwargs,
+    wire_task_context,
+)
+from token_budget import with_task_budget
+
+if TYPE_CHECKING:  # pragma: no cover - typing helpers only
+    from crewai import Task
+    from crewai.tools import BaseTool
+
+# Agent and task constructor arguments per task.
+TASK_KWARGS: Dict[str, Tuple[Callable[..., Dict[str, Any]], Callable[..., Dict[str, Any]]]] = {
+    STUDY_PLAN_TASK: (study_manager_agent_kwargs, study_management_task_kwargs),
+    NOTES_TASK: (notes_generator_agent_kwargs, notes_generation_task_kwargs),
+    EXAMPLES_TASK: (example_solver_agent_kwargs, example_solving_task_kwargs),
+    QUIZ_TASK: (quiz_maker_agent_kwargs, quiz_making_task_kwargs),
+}
+
+
+def build_task(
+    name: str, llm_overrides: Optional[Mapping[str, Any]], tools: Sequence["BaseTool"]
+) -> "Task":
+    """A fresh task (with its own agent and LLM) for one run.
+
+    The task's current token budget is applied to ``llm_overrides`` first.
+    """
+    from crewai import Agent, Task
+
+    agent_kwargs, task_kwargs = TASK_KWARGS[name]
+    overrides = with_task_budget(name, llm_overrides)
+    agent = Agent(**agent_kwargs(tools=tools), llm=build_crewai_llm(**overrides))
+    return Task(**task_kwargs(tools=tools), agent=agent)
+
+
+def build_tasks(
+    llm_overrides: Optional[Mapping[str, Any]], tools: Sequence["BaseTool"]
+) -> List["Task"]:
+    """Fresh tasks for every agent, in TASK_DEPENDENCIES order and wired as context."""
+    tasks = [build_task(name, llm_overrides, tools) for name in TASK_DEPENDENCIES]
+    return wire_task_context(tasks)
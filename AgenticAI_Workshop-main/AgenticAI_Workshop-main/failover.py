@@ -0,0 +1,242 @@
+"""Fallback strategies across LLM attempts: sequential, hedged and racing."""
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple, TypeVar
+
+from config.settings import (
+    FALLBACK_STRATEGIES,
+    FALLBACK_STRATEGY,
+    HEDGE_DELAY_SECONDS,
+    MAX_SPECULATIVE_ATTEMPTS,
+    RACE_WIDTH,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AttemptControl:
+    """Signals shared between run_with_failover and one running attempt."""
+
+    def __init__(self) -> None:
+        # Set once another attempt has won (or the run was cancelled).
+        self.cancel = threading.Event()
+        # Set by the attempt once it made progress (e.g. finished its first task); no
+        # hedge is started while any running attempt has progressed.
+        self.progressed = threading.Event()
+
+
+Attempt = Callable[[AttemptControl], T]
+
+# Hedged/racing attempts that have not stopped yet, across every run in the process.
+_speculative_slots = threading.BoundedSemaphore(max(1, MAX_SPECULATIVE_ATTEMPTS))
+
+
+class AttemptCancelled(RuntimeError):
+    """Raised inside a losing attempt once another attempt has already succeeded."""
+
+
+class PipelineCancelled(RuntimeError):
+    """Raised inside a run whose caller cancelled it (disconnect, timeout)."""
+
+
+class TaskGraphAborted(RuntimeError):
+    """Raised inside a task whose task graph is being aborted because another task failed."""
+
+
+# Cancel event of the whole run, if its caller can cancel it (see async_pipeline.py). Every
+# worker pool submits through contextvars.copy_context(), so task threads see it too.
+_RUN_CANCEL: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "study_companion_run_cancel", default=None
+)
+
+
+@contextlib.contextmanager
+def cancellable_run(cancel: Optional[threading.Event]) -> Iterator[None]:
+    """Make ``cancel`` abort every attempt and task started inside this block."""
+    token = _RUN_CANCEL.set(cancel)
+    try:
+        yield
+    finally:
+        _RUN_CANCEL.reset(token)
+
+
+def check_run_cancelled() -> None:
+    """Raise PipelineCancelled if the current run's caller has cancelled it."""
+    cancel = _RUN_CANCEL.get()
+    if cancel is not None and cancel.is_set():
+        raise PipelineCancelled("The study pack request was cancelled")
+
+
+@dataclass(frozen=True)
+class FailoverPolicy:
+    """How fallback attempts are scheduled.
+
+    ``sequential`` tries attempts one after another. ``hedged`` starts the next attempt
+    when no running attempt has made progress (finished its first task) within
+    ``hedge_delay`` seconds of the latest launch, up to ``race_width`` attempts at once.
+    ``race`` keeps ``race_width`` attempts running at once. Failures always start the next
+    attempt.
+    """
+
+    strategy: str = FALLBACK_STRATEGY
+    hedge_delay: float = HEDGE_DELAY_SECONDS
+    race_width: int = RACE_WIDTH
+
+    def __post_init__(self) -> None:
+        if self.strategy not in FALLBACK_STRATEGIES:
+            raise ValueError(
+                f"Unknown fallback strategy '{self.strategy}'. "
+                f"Expected one of: {', '.join(FALLBACK_STRATEGIES)}"
+            )
+        if self.hedge_delay <= 0:
+            raise ValueError("hedge_delay must be positive")
+        if self.race_width < 1:
+            raise ValueError("race_width must be at least 1")
+
+
+def cancellation_check(
+    cancel: threading.Event,
+    *,
+    progressed: Optional[threading.Event] = None,
+    graph_cancel: Optional[threading.Event] = None,
+) -> Callable[[Any], None]:
+    """Return an agent step_callback that aborts the attempt once ``cancel`` is set.
+
+    The callback also stops the attempt when the whole run is cancelled, or when
+    ``graph_cancel`` is set (a sibling task failed, see scheduler.run_task_graph). If
+    given, ``progressed`` is set after the first completed agent step.
+    """
+
+    def _check(_step: Any = None) -> None:
+        check_run_cancelled()
+        if graph_cancel is not None and graph_cancel.is_set():
+            raise TaskGraphAborted("Another task of this study pack failed")
+        if cancel.is_set():
+            raise AttemptCancelled("Another fallback attempt already succeeded")
+        if progressed is not None:
+            progressed.set()
+
+    return _check
+
+
+def run_with_failover(
+    attempts: Sequence[Attempt[T]],
+    policy: FailoverPolicy,
+    *,
+    label: str = "pipeline",
+    on_failure: Optional[Callable[[int, Exception], None]] = None,
+) -> Tuple[T, int]:
+    """Run attempts according to ``policy`` and return (first successful result, 1-based index).
+
+    Losing attempts are cancelled cooperatively: their cancel Event is set and they are
+    expected to stop at their next step. Attempts started while another one is running
+    are speculative and each takes one of MAX_SPECULATIVE_ATTEMPTS process-wide slots
+    until its thread stops; without a free slot none is started. If every attempt fails
+    the last error is raised. A cancelled run raises PipelineCancelled (an aborted task
+    graph TaskGraphAborted) instead of falling back to the next attempt.
+    """
+    if not attempts:
+        raise ValueError("At least one attempt is required")
+
+    width = policy.race_width if policy.strategy == "race" else 1
+    hedging = policy.strategy == "hedged"
+    executor = ThreadPoolExecutor(max_workers=len(attempts), thread_name_prefix="attempt")
+    running: Dict[Future[T], Tuple[int, AttemptControl]] = {}
+    next_index = 0
+    last_launch = time.monotonic()
+    last_error: Exception | None = None
+
+    def _launch() -> bool:
+        nonlocal next_index, last_launch
+        check_run_cancelled()
+        speculative = bool(running)
+        if speculative and not _speculative_slots.acquire(blocking=False):
+            logger.info(
+                "%s: %d speculative attempts already running in this process; "
+                "not starting attempt %d/%d yet",
+                label,
+                MAX_SPECULATIVE_ATTEMPTS,
+                next_index + 1,
+                len(attempts),
+            )
+            return False
+        control = AttemptControl()
+        future = executor.submit(contextvars.copy_context().run, attempts[next_index], control)
+        if speculative:
+            future.add_done_callback(lambda _future: _speculative_slots.release())
+        running[future] = (next_index, control)
+        next_index += 1
+        last_launch = time.monotonic()
+        return True
+
+    def _progressed() -> bool:
+        return any(control.progressed.is_set() for _index, control in running.values())
+
+    try:
+        while True:
+            while next_index < len(attempts) and len(running) < width:
+                if not _launch():
+                    break
+            if not running:
+                break
+
+            timeout: Optional[float] = None
+            if hedging and next_index < len(attempts) and len(running) < policy.race_width:
+                if _progressed():
+                    # A running attempt is making progress; duplicating it only costs.
+                    hedging = False
+                else:
+                    timeout = max(0.0, last_launch + policy.hedge_delay - time.monotonic())
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                if _progressed():
+                    hedging = False
+                    continue
+                logger.info(
+                    "%s: no attempt made progress within %.1fs; hedging with attempt %d/%d",
+                    label,
+                    policy.hedge_delay,
+                    next_index + 1,
+                    len(attempts),
+                )
+                if not _launch():
+                    # Try again after another hedge_delay instead of spinning.
+                    last_launch = time.monotonic()
+                continue
+
+            for future in done:
+                index, _control = running.pop(future)
+                try:
+                    result = future.result()
+                except (PipelineCancelled, TaskGraphAborted):
+                    raise
+                except Exception as exc:
+                    last_error = exc
+                    if on_failure is not None:
+                        on_failure(index + 1, exc)
+                    continue
+                if running:
+                    logger.info(
+                        "%s: attempt %d/%d won; cancelling %d other attempt(s)",
+                        label,
+                        index + 1,
+                        len(attempts),
+                        len(running),
+                    )
+                return result, index + 1
+    finally:
+        for _index, control in running.values():
+            control.cancel.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    assert last_error is not None  # defensive: should be set if all attempts failed
+    raise last_error
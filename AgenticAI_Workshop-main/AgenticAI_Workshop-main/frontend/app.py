@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import sys
 import os
+import time
 from pathlib import Path
 from datetime import datetime
 
@@ -56,7 +57,158 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
-from main import run_pipeline  # noqa: E402
+from config.settings import JOB_QUEUE_ENABLED  # noqa: E402
+from jobs import CANCELLED, FAILED, QUEUED, SUCCEEDED, get_job_queue  # noqa: E402
+from main import stream_pipeline  # noqa: E402
+from pipeline_events import (  # noqa: E402
+    ATTEMPT_FAILED,
+    PIPELINE_COMPLETED,
+    PIPELINE_FAILED,
+    TASK_COMPLETED,
+    TASK_STARTED,
+    TOKEN,
+    TOOL_CALL,
+)
+from tasks import EXAMPLES_TASK, NOTES_TASK, QUIZ_TASK, STUDY_PLAN_TASK  # noqa: E402
+from warmup import DISABLED, READY, WARMING, start_warmup  # noqa: E402
+
+TASK_LABELS = {
+    STUDY_PLAN_TASK: "📋 Study Manager",
+    NOTES_TASK: "📝 Notes Generator",
+    EXAMPLES_TASK: "🔢 Example Solver",
+    QUIZ_TASK: "✅ Quiz Maker",
+}
+# Minimum seconds between re-renders of a section while tokens stream in.
+RENDER_INTERVAL = 0.2
+# How often the sidebar refreshes the warm-up status.
+READINESS_REFRESH_SECONDS = 2
+# How often a page following a queued job polls its status.
+JOB_REFRESH_SECONDS = 2
+
+# Modules survive Streamlit reruns, so this loads the models, index and LLM connections
+# once per server process, in the background, while the first page renders.
+warmer = start_warmup()
+_fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
+
+@_fragment(run_every=READINESS_REFRESH_SECONDS)
+def show_readiness():
+    """Sidebar line telling whether models and connections are loaded yet."""
+    state = warmer.state()
+    if state.status == READY:
+        st.caption(f"🟢 Ready (warmed up in {state.seconds:.1f}s)")
+    elif state.status == WARMING:
+        st.caption(f"🟡 Warming up: {state.current_step or 'starting'}... (you can already generate)")
+    elif state.status != DISABLED:
+        failed = ", ".join(step.name for step in state.steps if step.status == "failed")
+        st.caption(f"🟠 Partly warmed up; {failed} will load on first use")
+
+
+def show_study_pack(topic, output):
+    """Success message, download button and the rendered study pack."""
+    st.success("🎉 Your study pack is ready!")
+    
+    # Display output
+    st.markdown("---")
+    st.markdown("### 📚 Your Complete Study Pack")
+    
+    # Add download button
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"study_pack_{topic[:30].replace(' ', '_')}_{timestamp}.md"
+    
+    st.download_button(
+        label="📥 Download Study Pack",
+        data=output,
+        file_name=filename,
+        mime="text/markdown",
+        use_container_width=True
+    )
+    
+    st.markdown("---")
+    
+    # Display the content in an expandable section
+    with st.expander("📖 View Study Pack Content", expanded=True):
+        st.markdown(output)
+
+
+def show_error(error_msg):
+    """Explain a failed generation; authentication errors get API key instructions."""
+    # Check if it's an API key error
+    if "401" in error_msg or "User not found" in error_msg:
+        st.error("❌ **API Key Error: Authentication Failed**")
+        st.warning("""
+        **Your OpenRouter API key is invalid or missing.**
+        
+        **To fix this on Streamlit Cloud:**
+        1. Go to your app settings (⋮ menu)
+        2. Click "Secrets" tab
+        3. Add/Update this line:
+        ```
+        OPENROUTER_API_KEY = "your-actual-api-key"
+        ```
+        4. Get your key from: https://openrouter.ai/keys
+        5. Make sure to use the FREE model: `meta-llama/llama-3.3-70b-instruct:free`
+        
+        **For Local Development:**
+        - Create `.env` file with: `OPENROUTER_API_KEY=your-key`
+        """)
+    else:
+        st.error(f"❌ Error generating study pack: {error_msg}")
+        st.markdown("""
+        **Troubleshooting:**
+        - Ensure vector store is built: `python rag\\build_vector_db.py`
+        - Verify internet connection
+        - Try a simpler topic
+        - Check the logs for details
+        """)
+
+
+@_fragment(run_every=JOB_REFRESH_SECONDS)
+def follow_job(job_id):
+    """Poll a queued job's progress; the whole page reruns once the job has finished."""
+    job = get_job_queue().get(job_id)
+    if job is None or job.finished:
+        st.rerun()
+    completed = job.progress.get("completed", {})
+    if job.status == QUEUED:
+        st.info(f"🕒 Waiting for a free worker to start on: **{job.topic}**")
+    else:
+        st.info(f"🤖 AI agents are creating your study pack for: **{job.topic}**")
+    st.markdown("You can refresh or close this page; its address brings you back to this job.")
+    st.progress(int(100 * len(completed) / len(TASK_LABELS)))
+    st.text(job.progress.get("message", "Waiting for a worker..."))
+    for task_name, label in TASK_LABELS.items():
+        if task_name in completed:
+            with st.expander(f"{label} — {task_name}", expanded=False):
+                st.markdown(completed[task_name])
+    if st.button("🛑 Cancel", key=f"cancel_{job_id}"):
+        get_job_queue().cancel(job_id)
+        st.rerun()
+
+
+def run_with_job_queue(generate, topic):
+    """Submit the topic as a job and follow the job whose id is in the page URL."""
+    if generate:
+        if not topic.strip():
+            st.error("⚠️ Please enter a study topic!")
+            return
+        # The id goes into the URL, so a refresh or a shared link finds the job again.
+        st.query_params["job"] = get_job_queue().submit(topic).id
+    job_id = st.query_params.get("job")
+    if not job_id:
+        return
+    job = get_job_queue().get(job_id)
+    if job is None:
+        st.warning(f"No study pack job with id {job_id}.")
+    elif job.status == SUCCEEDED:
+        show_study_pack(job.topic, job.output)
+    elif job.status == CANCELLED:
+        st.warning(f"🛑 The study pack for **{job.topic}** was cancelled.")
+    elif job.status == FAILED:
+        show_error(job.error or "unknown error")
+    else:
+        follow_job(job_id)
+
 
 st.set_page_config(
     page_title="Study Companion - AI Study Pack Generator",
@@ -128,6 +280,7 @@ with st.sidebar:
     st.markdown("---")
     
     generate_button = st.button("🚀 Generate Study Pack", type="primary", use_container_width=True)
+    show_readiness()
     
     st.markdown("---")
     st.caption("💡 **Tip**: The more specific your topic, the better the results!")
@@ -179,7 +332,9 @@ with feat_col4:
 st.markdown("---")
 
 # Generation logic
-if generate_button:
+if JOB_QUEUE_ENABLED:
+    run_with_job_queue(generate_button, topic)
+elif generate_button:
     if not topic.strip():
         st.error("⚠️ Please enter a study topic!")
     else:
@@ -188,83 +343,61 @@ if generate_button:
         
         progress_bar = st.progress(0)
         status_text = st.empty()
-        
-        # Simulate progress
         status_text.text("📋 Study Manager: Planning learning objectives...")
-        progress_bar.progress(25)
+
+        # Live sections are filled in as each agent streams its output.
+        live_sections = {}
+        for task_name, label in TASK_LABELS.items():
+            with st.expander(f"{label} — {task_name}", expanded=True):
+                live_sections[task_name] = st.empty()
+        buffers = {task_name: "" for task_name in TASK_LABELS}
+        last_render = {task_name: 0.0 for task_name in TASK_LABELS}
+        completed_tasks = set()
+        output = ""
         
         try:
-            status_text.text("📝 Notes Generator: Creating study notes...")
-            progress_bar.progress(40)
-            
-            output = run_pipeline(topic)
-            
-            status_text.text("🔢 Example Solver: Solving practice problems...")
-            progress_bar.progress(65)
-            
-            status_text.text("✅ Quiz Maker: Generating practice questions...")
-            progress_bar.progress(85)
-            
-            status_text.text("✨ Finalizing your study pack...")
+            for event in stream_pipeline(topic):
+                label = TASK_LABELS.get(event.task, "🤖 Agents")
+                if event.type == TOKEN and event.task in live_sections:
+                    buffers[event.task] += event.text
+                    now = time.monotonic()
+                    if now - last_render[event.task] >= RENDER_INTERVAL:
+                        live_sections[event.task].markdown(buffers[event.task] + " ▌")
+                        last_render[event.task] = now
+                elif event.type == TASK_STARTED:
+                    status_text.text(f"{label}: working on {event.task}...")
+                elif event.type == TOOL_CALL:
+                    status_text.text(f"{label}: using {event.text}...")
+                elif event.type == TASK_COMPLETED and event.task in live_sections:
+                    buffers[event.task] = event.text
+                    live_sections[event.task].markdown(event.text)
+                    completed_tasks.add(event.task)
+                    progress_bar.progress(int(100 * len(completed_tasks) / len(TASK_LABELS)))
+                    status_text.text(f"{label}: finished {event.task}")
+                elif event.type == ATTEMPT_FAILED:
+                    # Only clear what the failed attempt was streaming; other finished tasks are kept.
+                    if event.data.get("reset"):
+                        reset_tasks = [event.task] if event.task else list(live_sections)
+                        for task_name in reset_tasks:
+                            completed_tasks.discard(task_name)
+                            buffers[task_name] = ""
+                            live_sections[task_name].empty()
+                        progress_bar.progress(int(100 * len(completed_tasks) / len(TASK_LABELS)))
+                    status_text.text("⚠️ Model attempt failed, retrying with a fallback model...")
+                elif event.type == PIPELINE_FAILED:
+                    raise event.data["error"]
+                elif event.type == PIPELINE_COMPLETED:
+                    output = event.text
+
             progress_bar.progress(100)
+            status_text.text("✨ Your study pack is complete!")
             
-            st.success("🎉 Your study pack is ready!")
-            
-            # Display output
-            st.markdown("---")
-            st.markdown("### 📚 Your Complete Study Pack")
-            
-            # Add download button
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"study_pack_{topic[:30].replace(' ', '_')}_{timestamp}.md"
-            
-            st.download_button(
-                label="📥 Download Study Pack",
-                data=output,
-                file_name=filename,
-                mime="text/markdown",
-                use_container_width=True
-            )
-            
-            st.markdown("---")
-            
-            # Display the content in an expandable section
-            with st.expander("📖 View Study Pack Content", expanded=True):
-                st.markdown(output)
-            
+            show_study_pack(topic, output)
+
         except Exception as exc:
             progress_bar.empty()
             status_text.empty()
-            error_msg = str(exc)
-            
-            # Check if it's an API key error
-            if "401" in error_msg or "User not found" in error_msg:
-                st.error("❌ **API Key Error: Authentication Failed**")
-                st.warning("""
-                **Your OpenRouter API key is invalid or missing.**
-                
-                **To fix this on Streamlit Cloud:**
-                1. Go to your app settings (⋮ menu)
-                2. Click "Secrets" tab
-                3. Add/Update this line:
-                ```
-                OPENROUTER_API_KEY = "your-actual-api-key"
-                ```
-                4. Get your key from: https://openrouter.ai/keys
-                5. Make sure to use the FREE model: `meta-llama/llama-3.3-70b-instruct:free`
-                
-                **For Local Development:**
-                - Create `.env` file with: `OPENROUTER_API_KEY=your-key`
-                """)
-            else:
-                st.error(f"❌ Error generating study pack: {error_msg}")
-                st.markdown("""
-                **Troubleshooting:**
-                - Ensure vector store is built: `python rag\\build_vector_db.py`
-                - Verify internet connection
-                - Try a simpler topic
-                - Check the logs for details
-                """)
+            show_error(str(exc))
 
 # Footer
 st.markdown("---")
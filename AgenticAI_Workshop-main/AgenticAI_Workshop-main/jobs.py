@@ -0,0 +1,545 @@
+"""Durable study-pack jobs: a SQLite queue and a pool of worker processes.
+
+Submitting a topic returns a job id at once. Worker processes (``python main.py --worker``,
+``--workers`` per host) claim queued jobs, run the pipeline and store the result. The
+frontend polls for it and keeps the job id in the page URL, so a refresh loses nothing.
+A topic that is already queued or running with the same options is not queued twice,
+and a job whose worker stops sending heartbeats is queued again.
+"""
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from config.settings import (
+    JOB_DB_PATH,
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_POLL_SECONDS,
+    JOB_WORKERS,
+)
+from pipeline_events import ATTEMPT_FAILED, TASK_COMPLETED, TASK_STARTED, PipelineEvent
+from result_cache import content_key, normalize_topic
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+# generate_study_pack keyword arguments a job may carry; they must be JSON-serializable.
+JOB_OPTIONS = ("execution_mode", "cache_mode")
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        topic TEXT NOT NULL,
+        dedupe_key TEXT NOT NULL,
+        options TEXT NOT NULL,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        worker TEXT,
+        cancel_requested INTEGER NOT NULL DEFAULT 0,
+        progress TEXT NOT NULL DEFAULT '{}',
+        result TEXT,
+        error TEXT,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        heartbeat_at REAL,
+        finished_at REAL
+    )
+    """,
+    # At most one pending job per topic and options; finished jobs do not count.
+    "CREATE UNIQUE INDEX IF NOT EXISTS jobs_pending_key ON jobs (dedupe_key) "
+    "WHERE status IN ('queued', 'running')",
+    "CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)",
+)
+_COLUMNS = (
+    "id, topic, status, options, attempts, worker, progress, result, error, "
+    "created_at, started_at, finished_at"
+)
+
+
+@dataclass
+class Job:
+    """Snapshot of one job as stored in the queue."""
+
+    id: str
+    topic: str
+    status: str
+    options: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+    worker: Optional[str] = None
+    # "message" plus the "completed" task outputs so far, while the job runs.
+    progress: Dict[str, Any] = field(default_factory=dict)
+    # asdict(StudyPackResult) once the job succeeded.
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def output(self) -> Optional[str]:
+        return self.result["output"] if self.result else None
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        return cls(
+            id=row["id"],
+            topic=row["topic"],
+            status=row["status"],
+            options=json.loads(row["options"]),
+            attempts=row["attempts"],
+            worker=row["worker"],
+            progress=json.loads(row["progress"]),
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            created_at=row["created_at"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def job_dedupe_key(topic: str, options: Dict[str, Any]) -> str:
+    return content_key("job", normalize_topic(topic), options)
+
+
+class JobQueue:
+    """Jobs in a SQLite file shared by the frontend and every worker process on the host."""
+
+    def __init__(
+        self,
+        path: Path = JOB_DB_PATH,
+        *,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+    ) -> None:
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit; writes that read first take the write lock up front (BEGIN IMMEDIATE),
+        # so two processes can never claim or submit the same job.
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def submit(self, topic: str, **options: Any) -> Job:
+        """Queue ``topic``, or return the pending job that already covers it."""
+        unknown = sorted(set(options) - set(JOB_OPTIONS))
+        if unknown:
+            raise ValueError(
+                f"Unsupported job option(s): {', '.join(unknown)}. "
+                f"Expected any of: {', '.join(JOB_OPTIONS)}"
+            )
+        options = {name: value for name, value in options.items() if value is not None}
+        key = job_dedupe_key(topic, options)
+        with self._transaction() as conn:
+            row = conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE dedupe_key = ? AND status IN (?, ?)",
+                (key, QUEUED, RUNNING),
+            ).fetchone()
+            if row is not None:
+                logger.info("Topic '%s' is already pending as job %s", topic, row["id"])
+                return Job.from_row(row)
+            job = Job(
+                id=uuid.uuid4().hex,
+                topic=topic,
+                status=QUEUED,
+                options=options,
+                created_at=time.time(),
+            )
+            conn.execute(
+                "INSERT INTO jobs (id, topic, dedupe_key, options, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job.id, topic, key, json.dumps(options, sort_keys=True), QUEUED, job.created_at),
+            )
+        logger.info("Queued job %s for topic '%s'", job.id, topic)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return Job.from_row(row) if row is not None else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 20) -> List[Job]:
+        """Most recently created jobs first, optionally only those in ``status``."""
+        query = f"SELECT {_COLUMNS} FROM jobs"
+        params: List[Any] = []
+        if status is not None:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [Job.from_row(row) for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        return {status: count for status, count in rows}
+
+    def claim(self, worker: str) -> Optional[Job]:
+        """Mark the oldest queued job as running on ``worker`` and return it."""
+        now = time.time()
+        with self._transaction() as conn:
+            self._expire_leases(conn, now)
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, "
+                "started_at = ?, heartbeat_at = ? WHERE id = ?",
+                (RUNNING, worker, now, now, row["id"]),
+            )
+            claimed = conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (row["id"],)
+            ).fetchone()
+        return Job.from_row(claimed)
+
+    def _expire_leases(self, conn: sqlite3.Connection, now: float) -> None:
+        """Queue again (or fail, after max_attempts) running jobs whose worker went silent.
+
+        Jobs whose cancellation was requested are marked cancelled instead of rerun.
+        """
+        stale = now - self.lease_seconds
+        cancelled = conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ?, worker = NULL "
+            "WHERE status = ? AND heartbeat_at < ? AND cancel_requested = 1",
+            (CANCELLED, "Cancelled", now, RUNNING, stale),
+        ).rowcount
+        failed = conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ?, worker = NULL "
+            "WHERE status = ? AND heartbeat_at < ? AND attempts >= ?",
+            (FAILED, "Worker stopped responding", now, RUNNING, stale, self.max_attempts),
+        ).rowcount
+        requeued = conn.execute(
+            "UPDATE jobs SET status = ?, worker = NULL, progress = '{}' "
+            "WHERE status = ? AND heartbeat_at < ? AND cancel_requested = 0",
+            (QUEUED, RUNNING, stale),
+        ).rowcount
+        if cancelled or failed or requeued:
+            logger.warning(
+                "Expired job leases: %d job(s) queued again, %d failed, %d cancelled",
+                requeued,
+                failed,
+                cancelled,
+            )
+
+    def heartbeat(
+        self, job_id: str, worker: str, progress: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Extend the lease (and store ``progress``); False if the job should stop.
+
+        That is the case once cancellation was requested, or when the lease already
+        expired and the job was handed to another worker.
+        """
+        payload = json.dumps(progress, ensure_ascii=False) if progress is not None else None
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE jobs SET heartbeat_at = ?, progress = COALESCE(?, progress) "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (time.time(), payload, job_id, worker, RUNNING),
+            ).rowcount
+            if not updated:
+                return False
+            row = self._conn.execute(
+                "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return not row["cancel_requested"]
+
+    def finish(
+        self,
+        job_id: str,
+        worker: str,
+        status: str,
+        *,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        """Record the outcome of a running job; False if ``worker`` no longer owns it."""
+        if status not in FINISHED_STATUSES:
+            raise ValueError(f"Not a final job status: '{status}'")
+        payload = json.dumps(result, ensure_ascii=False) if result is not None else None
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (status, payload, error, time.time(), job_id, worker, RUNNING),
+            ).rowcount
+        return bool(updated)
+
+    def release(self, job_id: str, worker: str) -> bool:
+        """Put a running job back in the queue (worker shutdown); the claim is not counted.
+
+        Returns False, leaving the job alone, if it is no longer ours or was cancelled.
+        """
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, progress = '{}', "
+                "attempts = MAX(attempts - 1, 0) "
+                "WHERE id = ? AND worker = ? AND status = ? AND cancel_requested = 0",
+                (QUEUED, job_id, worker, RUNNING),
+            ).rowcount
+        return bool(updated)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job now, or ask the worker running it to stop."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, QUEUED),
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+                (job_id, RUNNING),
+            )
+        return self.get(job_id)
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide queue at STUDY_COMPANION_JOB_DB."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class _JobProgress:
+    """Collect task-level pipeline events into the job's progress record."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.message = "Starting"
+        self.completed: Dict[str, str] = {}
+
+    def update(self, event: PipelineEvent) -> bool:
+        """Apply ``event``; True if it changed the progress."""
+        with self._lock:
+            if event.type == TASK_STARTED:
+                self.message = f"Working on {event.task}"
+            elif event.type == TASK_COMPLETED and event.task:
+                self.completed[event.task] = event.text
+                self.message = f"Finished {event.task}"
+            elif event.type == ATTEMPT_FAILED:
+                if event.data.get("reset"):
+                    if event.task is None:
+                        self.completed.clear()
+                    else:
+                        self.completed.pop(event.task, None)
+                self.message = "Model attempt failed, retrying with a fallback model"
+            else:
+                return False
+            return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"message": self.message, "completed": dict(self.completed)}
+
+
+def run_job(
+    queue: JobQueue,
+    job: Job,
+    worker: str,
+    *,
+    stop: Optional[Any] = None,
+    poll_seconds: float = JOB_POLL_SECONDS,
+) -> str:
+    """Run one claimed job and record its outcome; returns the job's new status.
+
+    If ``stop`` (an Event) is set meanwhile, the run is cancelled and the job released
+    back to the queue, so shutting a worker down loses no submitted work.
+    """
+    from crew import generate_study_pack
+    from failover import PipelineCancelled
+
+    cancel = threading.Event()
+    done = threading.Event()
+    progress = _JobProgress()
+    heartbeat_interval = max(poll_seconds, queue.lease_seconds / 4)
+
+    def _on_event(event: PipelineEvent) -> None:
+        if progress.update(event) and not queue.heartbeat(job.id, worker, progress.snapshot()):
+            cancel.set()
+
+    def _keep_alive() -> None:
+        last_beat = time.monotonic()
+        while not done.wait(poll_seconds):
+            if stop is not None and stop.is_set():
+                cancel.set()
+            elif time.monotonic() - last_beat >= heartbeat_interval:
+                last_beat = time.monotonic()
+                if not queue.heartbeat(job.id, worker):
+                    cancel.set()
+
+    keeper = threading.Thread(target=_keep_alive, name=f"job-{job.id[:8]}", daemon=True)
+    keeper.start()
+    logger.info("Worker %s running job %s ('%s')", worker, job.id, job.topic)
+    try:
+        result = generate_study_pack(job.topic, cancel=cancel, on_event=_on_event, **job.options)
+    except PipelineCancelled:
+        if stop is not None and stop.is_set() and queue.release(job.id, worker):
+            logger.info("Released job %s back to the queue on shutdown", job.id)
+            return QUEUED
+        queue.finish(job.id, worker, CANCELLED, error="Cancelled")
+        logger.info("Job %s cancelled", job.id)
+        return CANCELLED
+    except Exception as exc:
+        logger.exception("Job %s failed", job.id)
+        queue.finish(job.id, worker, FAILED, error=f"{type(exc).__name__}: {exc}")
+        return FAILED
+    finally:
+        done.set()
+        keeper.join()
+    queue.finish(job.id, worker, SUCCEEDED, result=asdict(result))
+    logger.info("Job %s finished in %.1fs", job.id, result.total_seconds)
+    return SUCCEEDED
+
+
+def run_worker(
+    stop: Optional[Any] = None,
+    *,
+    db_path: Optional[Path] = None,
+    poll_seconds: float = JOB_POLL_SECONDS,
+) -> None:
+    """Claim and run jobs until ``stop`` is set; the target of each worker process."""
+    from config.logging_config import configure_logging
+    from warmup import start_warmup
+
+    configure_logging()
+    if stop is not None:
+        # The pool's parent handles Ctrl+C and sets ``stop``; finish or release cleanly.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    queue = JobQueue(db_path) if db_path is not None else get_job_queue()
+    worker = worker_id()
+    start_warmup()
+    logger.info("Job worker %s polling %s", worker, queue.path)
+    while stop is None or not stop.is_set():
+        job = queue.claim(worker)
+        if job is None:
+            if stop is not None:
+                stop.wait(poll_seconds)
+            else:
+                time.sleep(poll_seconds)
+            continue
+        run_job(queue, job, worker, stop=stop, poll_seconds=poll_seconds)
+    logger.info("Job worker %s stopped", worker)
+
+
+class WorkerPool:
+    """Worker processes on this host; crashed workers are restarted."""
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        *,
+        db_path: Optional[Path] = None,
+        poll_seconds: float = JOB_POLL_SECONDS,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.db_path = db_path
+        self.poll_seconds = poll_seconds
+        # Spawned, not forked: the parent may already hold threads and SQLite handles.
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._processes: List[Any] = []
+
+    def _spawn(self, index: int) -> Any:
+        process = self._context.Process(
+            target=run_worker,
+            args=(self._stop,),
+            kwargs={"db_path": self.db_path, "poll_seconds": self.poll_seconds},
+            name=f"study-pack-worker-{index}",
+        )
+        process.start()
+        return process
+
+    def start(self) -> "WorkerPool":
+        self._processes = [self._spawn(index) for index in range(self.workers)]
+        logger.info("Started %d job worker process(es)", self.workers)
+        return self
+
+    def stop(self, timeout: Optional[float] = 60.0) -> None:
+        """Ask workers to release their jobs and exit; terminate those that do not."""
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning("Terminating job worker %s", process.name)
+                process.terminate()
+                process.join()
+
+    def run_forever(self) -> None:
+        """Start the pool and keep it at full size until interrupted (Ctrl+C)."""
+        self.start()
+        try:
+            while True:
+                time.sleep(self.poll_seconds)
+                for index, process in enumerate(self._processes):
+                    if not process.is_alive():
+                        logger.warning(
+                            "Job worker %s exited with code %s; restarting",
+                            process.name,
+                            process.exitcode,
+                        )
+                        self._processes[index] = self._spawn(index)
+        except KeyboardInterrupt:
+            logger.info("Stopping job workers; running jobs go back to the queue")
+        finally:
+            self.stop()
@@ -5,15 +5,42 @@ import argparse
 import logging
 import os
 import sys
+from pathlib import Path
+from typing import Iterator
 
 from dotenv import load_dotenv
 
-from crew import run_educational_pipeline
-from config.logging_config import configure_logging
+# Settings read the environment when imported, so .env has to be loaded first. The crew
+# (CrewAI, LangChain, FAISS, DuckDuckGo) is imported only once a pipeline actually runs,
+# which keeps ``--help`` and the first Streamlit render fast (see check_startup_time.py).
+load_dotenv()
 
+from config.logging_config import configure_logging  # noqa: E402
+from config.settings import (  # noqa: E402
+    EXECUTION_MODE,
+    EXECUTION_MODES,
+    FALLBACK_STRATEGIES,
+    FALLBACK_STRATEGY,
+    HEDGE_DELAY_SECONDS,
+    JOB_WORKERS,
+    RACE_WIDTH,
+)
+from failover import FailoverPolicy  # noqa: E402
+from batch import DEFAULT_OUTPUT_DIR, load_topics, run_batch  # noqa: E402
+from pipeline_events import (  # noqa: E402
+    ATTEMPT_FAILED,
+    PIPELINE_COMPLETED,
+    PIPELINE_FAILED,
+    TASK_COMPLETED,
+    TASK_STARTED,
+    TOKEN,
+    TOOL_CALL,
+    PipelineEvent,
+)
 
-def run_pipeline(topic: str) -> str:
-    """Run the configured educational crew against the provided study topic."""
+
+def _prepare_environment() -> None:
+    """Load .env, validate the API key and configure logging."""
     load_dotenv()
     
     # Validate API key is present
@@ -30,8 +57,88 @@ def run_pipeline(topic: str) -> str:
         raise ValueError("OPENROUTER_API_KEY is missing")
     
     configure_logging()
+
+
+def run_pipeline(
+    topic: str,
+    *,
+    execution_mode: str | None = None,
+    cache_mode: str = "use",
+    failover: FailoverPolicy | None = None,
+) -> str:
+    """Run the configured educational crew against the provided study topic."""
+    _prepare_environment()
+    from crew import run_educational_pipeline
+
     logging.getLogger(__name__).info("Starting Study Companion for topic: %s", topic)
-    return run_educational_pipeline(topic)
+    return run_educational_pipeline(
+        topic, execution_mode=execution_mode, cache_mode=cache_mode, failover=failover
+    )
+
+
+def stream_pipeline(
+    topic: str,
+    *,
+    execution_mode: str | None = None,
+    cache_mode: str = "use",
+    failover: FailoverPolicy | None = None,
+) -> Iterator[PipelineEvent]:
+    """Like run_pipeline, but yield progress and token events as they are produced."""
+    _prepare_environment()
+    from crew import stream_educational_pipeline
+
+    logging.getLogger(__name__).info("Starting Study Companion (streaming) for topic: %s", topic)
+    return stream_educational_pipeline(
+        topic, execution_mode=execution_mode, cache_mode=cache_mode, failover=failover
+    )
+
+
+class _StreamPrinter:
+    """Print streamed tokens for one task at a time; other tasks are buffered and flushed whole."""
+
+    def __init__(self) -> None:
+        self.active: str | None = None
+        self.buffers: dict[str, str] = {}
+        self.printed: set[str] = set()
+
+    def _write(self, text: str) -> None:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    def handle(self, event: PipelineEvent) -> None:
+        if event.type == TASK_STARTED:
+            self._write(f"\n▶️  {event.task} started\n")
+        elif event.type == TOOL_CALL:
+            self._write(f"\n🔧 {event.task}: using {event.text}\n")
+        elif event.type == TOKEN and event.task:
+            if self.active is None:
+                self.active = event.task
+                self._write(f"\n## {event.task}\n\n{self.buffers.pop(event.task, '')}")
+            if event.task == self.active:
+                self._write(event.text)
+            else:
+                self.buffers[event.task] = self.buffers.get(event.task, "") + event.text
+        elif event.type == TASK_COMPLETED and event.task:
+            if event.task == self.active:
+                self.active = None
+            elif event.task not in self.printed:
+                self._write(f"\n## {event.task}\n\n{event.text}")
+            self.buffers.pop(event.task, None)
+            self.printed.add(event.task)
+            source = "cache" if event.data.get("cached") else f"{event.data.get('seconds', 0.0):.1f}s"
+            self._write(f"\n\n✅ {event.task} complete ({source})\n")
+        elif event.type == ATTEMPT_FAILED:
+            scope = f" for {event.task}" if event.task else ""
+            if event.data.get("reset"):
+                if event.task is None:
+                    self.active = None
+                    self.buffers.clear()
+                    self.printed.clear()
+                elif event.task == self.active:
+                    self.active = None
+            self._write(
+                f"\n⚠️  Attempt {event.data.get('attempt')}{scope} failed: {event.text}. Retrying...\n"
+            )
 
 
 def _parse_args() -> argparse.Namespace:
@@ -43,18 +150,217 @@ def _parse_args() -> argparse.Namespace:
         default="Introduction to Python Programming",
         help="Study topic to generate educational materials for (e.g., 'Calculus: Derivatives and Integration')",
     )
+    parser.add_argument(
+        "--execution-mode",
+        choices=EXECUTION_MODES,
+        default=EXECUTION_MODE,
+        help="'parallel' runs notes, examples and quiz concurrently after the study plan; "
+        "'sequential' runs all four tasks one after another",
+    )
+    failover_group = parser.add_argument_group("fallback models")
+    failover_group.add_argument(
+        "--fallback-strategy",
+        choices=FALLBACK_STRATEGIES,
+        default=FALLBACK_STRATEGY,
+        help="'sequential' tries fallback models one by one, 'hedged' starts the next one when "
+        "the current attempt is slow, 'race' runs several attempts at once",
+    )
+    failover_group.add_argument(
+        "--hedge-delay",
+        type=float,
+        default=HEDGE_DELAY_SECONDS,
+        help="Seconds an attempt may go without finishing its first task (in parallel mode: "
+        "its first agent step) before the next one is started alongside it",
+    )
+    failover_group.add_argument(
+        "--race-width",
+        type=int,
+        default=RACE_WIDTH,
+        help="Number of attempts kept running at once with --fallback-strategy race",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print notes, examples and quiz text incrementally as the agents produce it",
+    )
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument(
+        "--no-cache",
+        dest="cache_mode",
+        action="store_const",
+        const="off",
+        default="use",
+        help="Neither read from nor write to the on-disk result cache",
+    )
+    cache_group.add_argument(
+        "--refresh",
+        dest="cache_mode",
+        action="store_const",
+        const="refresh",
+        help="Ignore cached results but store the freshly generated ones",
+    )
+    batch_group = parser.add_argument_group("batch mode")
+    batch_group.add_argument(
+        "--topics-file",
+        type=Path,
+        help="Generate a pack for every topic in this file (one topic per line, or JSONL with a 'topic' key)",
+    )
+    batch_group.add_argument(
+        "--output-dir",
+        type=Path,
+        default=DEFAULT_OUTPUT_DIR,
+        help="Directory for generated packs; topics with completed outputs here are skipped",
+    )
+    batch_group.add_argument(
+        "--concurrency",
+        type=int,
+        default=2,
+        help="Maximum number of study packs generated at the same time",
+    )
+    batch_group.add_argument(
+        "--rate-limit",
+        type=float,
+        default=0.0,
+        help="Maximum pipeline runs started per minute against the LLM provider (0 = unlimited)",
+    )
+    job_group = parser.add_argument_group("job queue")
+    job_group.add_argument(
+        "--submit",
+        action="store_true",
+        help="Queue --topic for the job workers and print its job id instead of running it here",
+    )
+    job_group.add_argument(
+        "--job",
+        metavar="JOB_ID",
+        help="Print the status of a queued job, and its study pack once it has finished",
+    )
+    job_group.add_argument(
+        "--worker",
+        action="store_true",
+        help="Run job worker processes on this host until interrupted",
+    )
+    job_group.add_argument(
+        "--workers",
+        type=int,
+        default=JOB_WORKERS,
+        help="Number of worker processes started by --worker",
+    )
     return parser.parse_args()
 
 
+def _failover_policy(args: argparse.Namespace) -> FailoverPolicy:
+    return FailoverPolicy(
+        strategy=args.fallback_strategy,
+        hedge_delay=args.hedge_delay,
+        race_width=args.race_width,
+    )
+
+
+def _run_batch_cli(args: argparse.Namespace) -> int:
+    """Run batch mode; returns the exit status (1 if any topic failed)."""
+    _prepare_environment()
+    topics = load_topics(args.topics_file)
+    print(f"\n📦 Batch mode: {len(topics)} topic(s) from {args.topics_file}")
+    print(f"📁 Writing packs to: {args.output_dir}\n")
+    summary = run_batch(
+        topics,
+        output_dir=args.output_dir,
+        concurrency=args.concurrency,
+        rate_limit_per_minute=args.rate_limit,
+        execution_mode=args.execution_mode,
+        cache_mode=args.cache_mode,
+        failover=_failover_policy(args),
+    )
+    print("\n" + "="*70)
+    print(f"📊 {summary.format()}")
+    for topic in summary.failed:
+        print(f"❌ Failed: {topic}")
+    print("="*70 + "\n")
+    return 1 if summary.failed else 0
+
+
+def _run_workers_cli(args: argparse.Namespace) -> None:
+    _prepare_environment()
+    from jobs import WorkerPool
+
+    print(f"\n👷 Starting {args.workers} job worker(s); press Ctrl+C to stop\n")
+    WorkerPool(args.workers).run_forever()
+
+
+def _submit_job_cli(args: argparse.Namespace) -> None:
+    from jobs import get_job_queue
+
+    job = get_job_queue().submit(
+        args.topic, execution_mode=args.execution_mode, cache_mode=args.cache_mode
+    )
+    print(f"\n📨 Job {job.id} is {job.status}: {job.topic}")
+    print(f"🔎 Check on it with: python main.py --job {job.id}\n")
+
+
+def _show_job_cli(args: argparse.Namespace) -> None:
+    from jobs import SUCCEEDED, get_job_queue
+
+    job = get_job_queue().get(args.job)
+    if job is None:
+        print(f"❌ No job with id {args.job}", file=sys.stderr)
+        sys.exit(1)
+    print(f"\n📨 Job {job.id} is {job.status}: {job.topic}")
+    if job.status == SUCCEEDED:
+        print("\n" + "="*70 + "\n")
+        print(job.output)
+    elif job.error:
+        print(f"❌ {job.error}")
+    elif job.progress:
+        done = ", ".join(job.progress.get("completed", {})) or "none yet"
+        print(f"⏳ {job.progress.get('message', '')} (finished: {done})")
+    print()
+
+
 if __name__ == "__main__":
     args = _parse_args()
     print("\n" + "="*70)
     print("📚 Study Companion - AI-Powered Study Pack Generator")
     print("="*70)
+
+    if args.topics_file:
+        sys.exit(_run_batch_cli(args))
+    if args.worker:
+        _run_workers_cli(args)
+        sys.exit(0)
+    if args.submit:
+        _submit_job_cli(args)
+        sys.exit(0)
+    if args.job:
+        _show_job_cli(args)
+        sys.exit(0)
+
     print(f"\n🎯 Generating study materials for: {args.topic}")
     print("\n⏳ This may take 2-5 minutes. AI agents are working...\n")
     
-    output = run_pipeline(args.topic)
+    if args.stream:
+        printer = _StreamPrinter()
+        output: str | None = None
+        for event in stream_pipeline(
+            args.topic,
+            execution_mode=args.execution_mode,
+            cache_mode=args.cache_mode,
+            failover=_failover_policy(args),
+        ):
+            if event.type == PIPELINE_FAILED:
+                raise event.data.get("error") or RuntimeError(event.text)
+            if event.type == PIPELINE_COMPLETED:
+                output = event.text
+            else:
+                printer.handle(event)
+        if output is None:
+            raise RuntimeError(f"Study pack stream for '{args.topic}' ended without a result")
+    else:
+        output = run_pipeline(
+            args.topic,
+            execution_mode=args.execution_mode,
+            cache_mode=args.cache_mode,
+            failover=_failover_policy(args),
+        )
     
     print("\n" + "="*70)
     print("✅ Study Pack Generated Successfully!")
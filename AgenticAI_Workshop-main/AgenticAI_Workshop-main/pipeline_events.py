@@ -0,0 +1,118 @@
+"""Pipeline progress events streamed to the CLI and Streamlit frontend."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+TASK_STARTED = "task_started"
+TOOL_CALL = "tool_call"
+TOKEN = "token"
+TASK_COMPLETED = "task_completed"
+ATTEMPT_FAILED = "attempt_failed"
+PIPELINE_COMPLETED = "pipeline_completed"
+PIPELINE_FAILED = "pipeline_failed"
+
+
+@dataclass
+class PipelineEvent:
+    """A single progress update: task lifecycle, tool call, token delta or final result."""
+
+    type: str
+    task: Optional[str] = None
+    text: str = ""
+    data: Dict[str, Any] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+
+
+EventCallback = Callable[[PipelineEvent], None]
+
+# CrewAI emits LLM/tool events on a process-wide bus; they are routed back to the
+# run that owns the task through the task's unique id.
+_TASK_ROUTES: Dict[str, tuple[str, EventCallback]] = {}
+_ROUTES_LOCK = threading.Lock()
+_LISTENERS_INSTALLED = False
+
+
+def emit(callback: Optional[EventCallback], event_type: str, task: Optional[str] = None, text: str = "", **data: Any) -> None:
+    """Deliver an event to ``callback`` if one is registered; never let a UI error break a run."""
+    if callback is None:
+        return
+    try:
+        callback(PipelineEvent(type=event_type, task=task, text=text, data=data))
+    except Exception:  # pragma: no cover - defensive layer around user callbacks
+        logger.exception("Pipeline event callback failed for %s", event_type)
+
+
+def bind_tasks(tasks: Iterable[Any], callback: Optional[EventCallback]) -> None:
+    """Route CrewAI token and tool events for ``tasks`` to ``callback``."""
+    if callback is None:
+        return
+    _install_crewai_listeners()
+    with _ROUTES_LOCK:
+        for task in tasks:
+            _TASK_ROUTES[str(task.id)] = (task.name, callback)
+
+
+def unbind_tasks(tasks: Iterable[Any]) -> None:
+    with _ROUTES_LOCK:
+        for task in tasks:
+            _TASK_ROUTES.pop(str(task.id), None)
+
+
+def _route(event: Any) -> Optional[tuple[str, EventCallback]]:
+    task_id = getattr(event, "task_id", None)
+    if not task_id:
+        return None
+    with _ROUTES_LOCK:
+        return _TASK_ROUTES.get(str(task_id))
+
+
+def _on_stream_chunk(source: Any, event: Any) -> None:
+    route = _route(event)
+    if route is not None and getattr(event, "chunk", ""):
+        task_name, callback = route
+        emit(callback, TOKEN, task=task_name, text=event.chunk)
+
+
+def _on_tool_started(source: Any, event: Any) -> None:
+    route = _route(event)
+    if route is not None:
+        task_name, callback = route
+        emit(
+            callback,
+            TOOL_CALL,
+            task=task_name,
+            text=str(getattr(event, "tool_name", "")),
+            tool_args=getattr(event, "tool_args", None),
+        )
+
+
+def _install_crewai_listeners() -> None:
+    global _LISTENERS_INSTALLED
+    with _ROUTES_LOCK:
+        if _LISTENERS_INSTALLED:
+            return
+        _LISTENERS_INSTALLED = True
+
+    try:
+        from crewai.events import LLMStreamChunkEvent, ToolUsageStartedEvent, crewai_event_bus
+    except ImportError:
+        try:
+            from crewai.utilities.events import (  # type: ignore[no-redef]
+                LLMStreamChunkEvent,
+                ToolUsageStartedEvent,
+                crewai_event_bus,
+            )
+        except ImportError:
+            logger.warning(
+                "This CrewAI version has no event bus; only task-level progress will be streamed."
+            )
+            return
+
+    crewai_event_bus.on(LLMStreamChunkEvent)(_on_stream_chunk)
+    crewai_event_bus.on(ToolUsageStartedEvent)(_on_tool_started)
@@ -0,0 +1,132 @@
+"""Prefetch knowledge-base passages for every subtopic of the study plan in one batched search."""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from typing import Dict, List, Sequence
+
+from crewai.tools import BaseTool
+
+from tools.rag_tool import EducationalKnowledgeRetriever
+
+logger = logging.getLogger(__name__)
+
+MAX_SUBTOPICS = 20
+PASSAGES_PER_SUBTOPIC = 2
+# Upper bound on the prefetched block so it cannot crowd out the plan in the prompt.
+MAX_PREFETCH_CHARS = 6000
+
+_LIST_ITEM = re.compile(r"^\s*(?:#{1,6}\s+|[-*+•]\s+|\d+[.)]\s+)(.+?)\s*$")
+_MARKUP = re.compile(r"[*_`#>\[\]]")
+# Section headings every plan contains; searching for them would only add noise.
+_GENERIC_HEADINGS = {
+    "learning objectives",
+    "objectives",
+    "key topics",
+    "key topics and subtopics",
+    "subtopics",
+    "key concepts",
+    "coordination guidelines",
+    "quality criteria",
+    "final study pack structure",
+    "study pack structure",
+    "overview",
+    "introduction",
+    "summary",
+}
+
+
+def extract_subtopics(plan: str, *, limit: int = MAX_SUBTOPICS) -> List[str]:
+    """Pull short headings and list items out of a markdown study plan."""
+    subtopics: List[str] = []
+    seen: set[str] = set()
+    for line in plan.splitlines():
+        match = _LIST_ITEM.match(line)
+        if not match:
+            continue
+        text = _MARKUP.sub("", match.group(1)).strip(" :-–")
+        key = text.lower()
+        if not 1 <= len(text.split()) <= 12 or key in seen or key in _GENERIC_HEADINGS:
+            continue
+        seen.add(key)
+        subtopics.append(text)
+        if len(subtopics) >= limit:
+            break
+    return subtopics
+
+
+def prefetch_context(plan: str, topic: str, tools: Sequence[BaseTool]) -> str:
+    """Search the knowledge base for all plan subtopics at once and format the hits as context.
+
+    Returns an empty string when there is no retriever, no subtopic or the search fails.
+    """
+    retriever = next((tool for tool in tools if isinstance(tool, EducationalKnowledgeRetriever)), None)
+    subtopics = extract_subtopics(plan)
+    if retriever is None or not subtopics:
+        return ""
+
+    queries = [
+        subtopic if topic.lower() in subtopic.lower() else f"{topic}: {subtopic}"
+        for subtopic in subtopics
+    ]
+    started = time.perf_counter()
+    try:
+        results = retriever.search_many(queries)
+    except Exception:  # pragma: no cover - a missing store must not fail the pipeline
+        logger.warning("Knowledge prefetch failed; agents will query the tool instead", exc_info=True)
+        return ""
+
+    sections: List[str] = []
+    seen: set[str] = set()
+    used = 0
+    for subtopic, docs in zip(subtopics, results):
+        passages = []
+        for doc in docs:
+            key = doc.metadata.get("chunk_hash") or doc.page_content
+            if key in seen:
+                continue
+            seen.add(key)
+            passages.append(doc.page_content.strip())
+            if len(passages) >= PASSAGES_PER_SUBTOPIC:
+                break
+        if not passages:
+            continue
+        section = f"### {subtopic}\n" + "\n\n".join(passages)
+        if used + len(section) > MAX_PREFETCH_CHARS:
+            break
+        sections.append(section)
+        used += len(section)
+
+    logger.info(
+        "Prefetched knowledge for %d/%d plan subtopics in %.2fs",
+        len(sections),
+        len(subtopics),
+        time.perf_counter() - started,
+    )
+    if not sections:
+        return ""
+    return (
+        "Knowledge base passages already retrieved for the study plan's subtopics "
+        "(use these before searching again):\n\n" + "\n\n".join(sections)
+    )
+
+
+class PlanPrefetcher:
+    """Compute the prefetched block once per plan, however many tasks ask for it concurrently."""
+
+    def __init__(self, topic: str, tools: Sequence[BaseTool]) -> None:
+        self.topic = topic
+        self.tools = list(tools)
+        self._lock = threading.Lock()
+        self._blocks: Dict[str, str] = {}
+
+    def augment(self, plan_context: str) -> str:
+        """Return ``plan_context`` followed by the prefetched passages for its subtopics."""
+        with self._lock:
+            block = self._blocks.get(plan_context)
+            if block is None:
+                block = prefetch_context(plan_context, self.topic, self.tools)
+                self._blocks[plan_context] = block
+        return f"{plan_context}\n\n{block}" if block else plan_context
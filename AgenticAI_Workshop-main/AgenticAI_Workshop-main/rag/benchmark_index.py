@@ -0,0 +1,170 @@
+"""Recall-vs-latency benchmark of the FAISS index types on our own knowledge base.
+
+A sample of chunks is held out as queries; every candidate index is built over the
+remaining vectors and compared against exact search on recall@k, per-query latency,
+build time and index size:
+
+    python rag/benchmark_index.py --queries 200 --k 4
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from tools.ann_index import INDEX_TYPES, IndexSpec, build_ann_index, search_parameters
+from tools.mapped_vectorstore import open_vectors
+from rag.build_vector_db import VECTORSTORE_DIR
+
+NPROBE_SWEEP = (1, 4, 16, 64)
+EF_SEARCH_SWEEP = (16, 32, 64, 128)
+
+
+@dataclass
+class BenchmarkRow:
+    label: str
+    recall: float
+    p50_ms: float
+    p95_ms: float
+    build_seconds: float
+    size_mb: float
+
+
+def load_exact_vectors(vectorstore_dir: Path, max_vectors: int = 0) -> np.ndarray:
+    """Return the raw chunk vectors of a built vector store, loaded into memory."""
+    vectors = open_vectors(vectorstore_dir)
+    count = min(len(vectors), max_vectors) if max_vectors else len(vectors)
+    return np.array(vectors[:count], dtype=np.float32)
+
+
+def _flat_index(vectors: np.ndarray) -> faiss.Index:
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+    return index
+
+
+def _measure(
+    label: str,
+    index: faiss.Index,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    k: int,
+    build_seconds: float,
+    params: Optional[faiss.SearchParameters] = None,
+) -> BenchmarkRow:
+    # One query at a time, like the retriever, so latency reflects a single lookup.
+    latencies: List[float] = []
+    hits = 0
+    for row, query in enumerate(queries):
+        started = time.perf_counter()
+        _, found = index.search(query[None, :], k, params=params)
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += len(set(found[0]) & set(truth[row]))
+    return BenchmarkRow(
+        label=label,
+        recall=hits / (len(queries) * k),
+        p50_ms=float(np.percentile(latencies, 50)),
+        p95_ms=float(np.percentile(latencies, 95)),
+        build_seconds=build_seconds,
+        size_mb=len(faiss.serialize_index(index)) / (1024 * 1024),
+    )
+
+
+def _sweep(spec: IndexSpec, index: faiss.Index) -> Iterable[Tuple[str, Optional[faiss.SearchParameters]]]:
+    if spec.type in ("ivf", "ivfpq"):
+        nlist = faiss.extract_index_ivf(index).nlist
+        for nprobe in NPROBE_SWEEP:
+            if nprobe <= nlist:
+                yield f"nprobe={nprobe}", search_parameters(index, nprobe=nprobe)
+    elif spec.type == "hnsw":
+        for ef_search in EF_SEARCH_SWEEP:
+            yield f"efSearch={ef_search}", search_parameters(index, ef_search=ef_search)
+    else:
+        yield "", None
+
+
+def run_benchmark(
+    vectors: np.ndarray,
+    specs: Sequence[IndexSpec],
+    *,
+    query_count: int = 200,
+    k: int = 4,
+    seed: int = 0,
+) -> List[BenchmarkRow]:
+    """Hold out ``query_count`` vectors as queries and benchmark each index spec on the rest."""
+    if len(vectors) <= query_count + k:
+        raise ValueError(f"Need more than {query_count + k} vectors to benchmark, found {len(vectors)}")
+    order = np.random.default_rng(seed).permutation(len(vectors))
+    queries = np.ascontiguousarray(vectors[order[:query_count]])
+    base = np.ascontiguousarray(vectors[order[query_count:]])
+
+    exact = _flat_index(base)
+    _, truth = exact.search(queries, k)
+
+    rows: List[BenchmarkRow] = []
+    for spec in specs:
+        started = time.perf_counter()
+        try:
+            index = build_ann_index(base, spec)
+        except ValueError as exc:
+            print(f"Skipping {spec.type}: {exc}")
+            continue
+        build_seconds = time.perf_counter() - started
+        for knob, params in _sweep(spec, index):
+            label = f"{spec.type} {knob}".strip()
+            rows.append(_measure(label, index, queries, truth, k, build_seconds, params))
+    return rows
+
+
+def format_rows(rows: Sequence[BenchmarkRow], k: int) -> str:
+    header = f"{'index':<22} {f'recall@{k}':>9} {'p50 ms':>8} {'p95 ms':>8} {'build s':>8} {'size MB':>8}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(
+            f"{row.label:<22} {row.recall:>9.3f} {row.p50_ms:>8.3f} {row.p95_ms:>8.3f} "
+            f"{row.build_seconds:>8.2f} {row.size_mb:>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare FAISS index types on the knowledge base.")
+    parser.add_argument("--vectorstore-dir", type=Path, default=VECTORSTORE_DIR)
+    parser.add_argument("--types", nargs="+", choices=INDEX_TYPES, default=list(INDEX_TYPES))
+    parser.add_argument("--queries", type=int, default=200, help="Chunks held out as queries")
+    parser.add_argument("--k", type=int, default=4, help="Neighbours per query (the retriever's top_k)")
+    parser.add_argument("--max-vectors", type=int, default=0, help="Only use the first N vectors (0 = all)")
+    parser.add_argument("--nlist", type=int, default=0)
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--pq-m", type=int, default=0)
+    parser.add_argument("--pq-bits", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    corpus = load_exact_vectors(args.vectorstore_dir, args.max_vectors)
+    index_specs = [
+        IndexSpec(
+            type=index_type,
+            nlist=args.nlist,
+            hnsw_m=args.hnsw_m,
+            pq_m=args.pq_m,
+            pq_bits=args.pq_bits,
+        )
+        for index_type in args.types
+    ]
+    print(f"Benchmarking {len(index_specs)} index types on {len(corpus)} vectors")
+    results = run_benchmark(corpus, index_specs, query_count=args.queries, k=args.k, seed=args.seed)
+    print(format_rows(results, args.k))
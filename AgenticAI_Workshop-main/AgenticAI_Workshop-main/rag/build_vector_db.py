@@ -1,45 +1,491 @@
-"""Utility script to build the FAISS vector store backing the local RAG tool."""
+"""Utility script to build the memory-mapped vector store backing the local RAG tool.
+
+Every .txt/.md/.pdf file under rag/documents is indexed. Rebuilds are incremental: a
+manifest records each file's hash and chunk ids, so only new or changed chunks are
+embedded and chunks of removed files are deleted. Embeddings are cached on disk by
+chunk hash, which makes rebuilds after chunk-size tweaks close to free. Large corpora are
+streamed: chunks are embedded in batches, optionally across worker processes, and
+appended to the store batch by batch.
+
+The store is the memory-mapped format from tools/mapped_vectorstore.py (raw vectors, a
+SQLite docstore and an optional ANN index), so loading it never unpickles anything. Each
+build writes a new version directory and swaps the CURRENT pointer to it in one rename,
+so a running Study Companion never opens a half-replaced store.
+"""
 from __future__ import annotations
 
+import argparse
+import hashlib
+import json
+import os
+import shutil
 import sys
+import time
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+import faiss
+from langchain_core.embeddings import Embeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
 from langchain_community.embeddings import HuggingFaceEmbeddings
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
+from tools.ann_index import INDEX_TYPES, IndexSpec, build_ann_index
+from tools.mapped_vectorstore import (
+    ANN_INDEX_FILE,
+    CURRENT_FILE,
+    DOCSTORE_FILE,
+    STORE_FILES,
+    VERSIONS_DIR,
+    MappedVectorStore,
+    VectorStoreWriter,
+    open_vectors,
+    resolve_store_dir,
+)
 from tools.rag_tool import DEFAULT_EMBEDDING_MODEL
+from rag.embedding_cache import EmbeddingCache
+from rag.embedding_pool import EmbeddingPool
 
 BASE_DIR = Path(__file__).resolve().parent
 DOCUMENTS_DIR = BASE_DIR / "documents"
 VECTORSTORE_DIR = BASE_DIR / "vectorstore"
-DEFAULT_DOC = DOCUMENTS_DIR / "sample_docs.txt"
+EMBEDDING_CACHE_PATH = BASE_DIR / ".embedding_cache.sqlite"
+MANIFEST_FILE = "manifest.json"
+# Pickled LangChain FAISS files from older builds; removed once the new format is written.
+LEGACY_FILES = ("index.pkl", "exact.faiss", "exact.pkl")
+# Bumped whenever the on-disk layout changes; older stores are rebuilt from cached embeddings.
+STORE_FORMAT = 2
+# Versions kept besides the live one, for readers that still map the previous build.
+KEEP_PREVIOUS_VERSIONS = 1
+SUPPORTED_SUFFIXES = (".txt", ".md", ".pdf")
+
+DEFAULT_CHUNK_SIZE = 600
+DEFAULT_CHUNK_OVERLAP = 50
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_WORKERS = 1
+PROGRESS_EVERY_BATCHES = 50
+# Retained chunks are copied from the previous store in slices of this many rows.
+COPY_BATCH_SIZE = 10_000
+
+
+@dataclass
+class Chunk:
+    id: str
+    chunk_hash: str
+    text: str
+    source: str
+
+
+@dataclass
+class BuildStats:
+    files_scanned: int = 0
+    files_changed: int = 0
+    files_removed: int = 0
+    chunks_added: int = 0
+    chunks_removed: int = 0
+    chunks_embedded: int = 0
+    chunks_from_cache: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks_added / self.seconds if self.seconds > 0 else 0.0
+
+    def format(self) -> str:
+        return (
+            f"{self.files_scanned} files scanned, {self.files_changed} changed, "
+            f"{self.files_removed} removed | {self.chunks_added} chunks added, "
+            f"{self.chunks_removed} removed | {self.chunks_embedded} embedded, "
+            f"{self.chunks_from_cache} from cache | {self.chunks_per_second:.1f} chunks/sec"
+        )
+
+
+class _LazyEmbeddings(Embeddings):
+    """Defer loading the embedding model until a vector actually has to be computed."""
+
+    def __init__(self, model_name: str) -> None:
+        self.model_name = model_name
+        self._model: Optional[HuggingFaceEmbeddings] = None
+
+    def _load(self) -> HuggingFaceEmbeddings:
+        if self._model is None:
+            self._model = HuggingFaceEmbeddings(model_name=self.model_name)
+        return self._model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._load().embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._load().embed_query(text)
+
 
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
 
-def build_vector_store(doc_path: Path = DEFAULT_DOC, *, chunk_size: int = 600, chunk_overlap: int = 50) -> None:
-    """Build a FAISS index from the supplied document."""
-    if not doc_path.exists():
-        raise FileNotFoundError(f"Document source not found at {doc_path}")
 
-    text = doc_path.read_text(encoding="utf-8")
-    splitter = RecursiveCharacterTextSplitter(
+def iter_document_files(documents_dir: Path) -> Iterator[Path]:
+    """Yield supported document files under ``documents_dir`` in a stable order."""
+    for path in sorted(documents_dir.rglob("*")):
+        relative_parts = path.relative_to(documents_dir).parts
+        if any(part.startswith(".") for part in relative_parts):
+            continue
+        if path.is_file() and path.suffix.lower() in SUPPORTED_SUFFIXES:
+            yield path
+
+
+def read_document(path: Path) -> str:
+    """Return the plain text of a .txt/.md/.pdf document."""
+    if path.suffix.lower() == ".pdf":
+        try:
+            from pypdf import PdfReader
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError(
+                f"Reading {path} requires the 'pypdf' package. Install it with 'pip install pypdf'."
+            ) from exc
+        reader = PdfReader(str(path))
+        return "\n\n".join(page.extract_text() or "" for page in reader.pages)
+    return path.read_text(encoding="utf-8", errors="replace")
+
+
+def _make_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
         separators=["\n\n", "\n", " "],
     )
-    chunks = splitter.split_text(text)
 
-    embeddings = HuggingFaceEmbeddings(model_name=DEFAULT_EMBEDDING_MODEL)
-    vector_store = FAISS.from_texts(chunks, embedding=embeddings)
 
-    VECTORSTORE_DIR.mkdir(parents=True, exist_ok=True)
-    vector_store.save_local(str(VECTORSTORE_DIR))
-    print(f"Vector store saved to {VECTORSTORE_DIR}")
+def chunk_document(source: str, text: str, splitter: RecursiveCharacterTextSplitter) -> List[Chunk]:
+    """Split a document into chunks whose ids are stable as long as their text is unchanged."""
+    chunks: List[Chunk] = []
+    occurrences: Dict[str, int] = {}
+    for piece in splitter.split_text(text):
+        chunk_hash = _sha256(piece.encode("utf-8"))
+        occurrence = occurrences.get(chunk_hash, 0)
+        occurrences[chunk_hash] = occurrence + 1
+        chunks.append(
+            Chunk(
+                id=f"{source}::{chunk_hash[:16]}::{occurrence}",
+                chunk_hash=chunk_hash,
+                text=piece,
+                source=source,
+            )
+        )
+    return chunks
+
+
+def _load_manifest(vectorstore_dir: Path) -> Optional[dict]:
+    store_dir = resolve_store_dir(vectorstore_dir)
+    manifest_path = store_dir / MANIFEST_FILE
+    if not manifest_path.exists() or not (store_dir / DOCSTORE_FILE).exists():
+        return None
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    return manifest if manifest.get("format") == STORE_FORMAT else None
+
+
+def _write_manifest(vectorstore_dir: Path, manifest: dict) -> None:
+    manifest_path = vectorstore_dir / MANIFEST_FILE
+    tmp_path = manifest_path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    tmp_path.replace(manifest_path)
+
+
+
+def _batched(items: Iterable[Chunk], size: int) -> Iterator[List[Chunk]]:
+    batch: List[Chunk] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _scan_documents(
+    documents_dir: Path,
+    splitter: RecursiveCharacterTextSplitter,
+    previous_files: Dict[str, dict],
+    rechunk_all: bool,
+    files: Dict[str, dict],
+    to_remove: List[str],
+    stats: BuildStats,
+) -> Iterator[Chunk]:
+    """Lazily yield chunks that must be added, one document at a time.
+
+    Fills ``files`` with the new manifest entries and ``to_remove`` with ids of chunks
+    that no longer exist as a side effect.
+    """
+    for path in iter_document_files(documents_dir):
+        stats.files_scanned += 1
+        source = path.relative_to(documents_dir).as_posix()
+        file_hash = _sha256(path.read_bytes())
+        previous = previous_files.get(source)
+        if previous and previous.get("sha256") == file_hash and not rechunk_all:
+            files[source] = previous
+            continue
+
+        stats.files_changed += 1
+        chunks = chunk_document(source, read_document(path), splitter)
+        new_ids = [chunk.id for chunk in chunks]
+        old_ids = set(previous.get("chunk_ids", [])) if previous else set()
+        to_remove.extend(old_ids - set(new_ids))
+        files[source] = {"sha256": file_hash, "chunk_ids": new_ids}
+        for chunk in chunks:
+            if chunk.id not in old_ids:
+                yield chunk
+
+    for source in previous_files.keys() - files.keys():
+        stats.files_removed += 1
+        to_remove.extend(previous_files[source].get("chunk_ids", []))
+
+
+def _embedding_jobs(
+    batches: Iterable[List[Chunk]], cache: EmbeddingCache, model_name: str
+) -> Iterator[Tuple[Tuple[List[Chunk], Dict[str, Sequence[float]], List[str]], List[str]]]:
+    """Pair each chunk batch with the texts whose vectors are not cached yet."""
+    for batch in batches:
+        vectors: Dict[str, Sequence[float]] = dict(
+            cache.get_many(model_name, [chunk.chunk_hash for chunk in batch])
+        )
+        missing: Dict[str, str] = {}
+        for chunk in batch:
+            if chunk.chunk_hash not in vectors:
+                missing.setdefault(chunk.chunk_hash, chunk.text)
+        yield (batch, vectors, list(missing)), list(missing.values())
+
+
+def _install_store(version_dir: Path, vectorstore_dir: Path) -> None:
+    """Point CURRENT at a finished ``version_dir`` in one rename, then prune old versions.
+
+    The previous version is kept so readers that opened it just before the swap can finish.
+    """
+    pointer = vectorstore_dir / CURRENT_FILE
+    tmp_path = pointer.with_name(f"{CURRENT_FILE}.{os.getpid()}.tmp")
+    tmp_path.write_text(version_dir.name + "\n", encoding="utf-8")
+    os.replace(tmp_path, pointer)
+
+    # Files of the unversioned layout written by older builds.
+    for filename in (*STORE_FILES, *LEGACY_FILES, MANIFEST_FILE):
+        (vectorstore_dir / filename).unlink(missing_ok=True)
+    # Version names sort by creation time; newer ones may belong to a build in progress.
+    older = sorted(
+        path
+        for path in (vectorstore_dir / VERSIONS_DIR).iterdir()
+        if path.is_dir() and path.name < version_dir.name
+    )
+    for stale in older[: max(0, len(older) - KEEP_PREVIOUS_VERSIONS)]:
+        shutil.rmtree(stale, ignore_errors=True)
+
+
+def build_vector_store(
+    documents_dir: Path = DOCUMENTS_DIR,
+    *,
+    vectorstore_dir: Path = VECTORSTORE_DIR,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    embedding_model: str = DEFAULT_EMBEDDING_MODEL,
+    index_spec: IndexSpec = IndexSpec(),
+    full_rebuild: bool = False,
+) -> BuildStats:
+    """Build or incrementally update the vector store from every document in ``documents_dir``.
+
+    Documents are read and split lazily and embedded in ``batch_size`` batches (across
+    ``workers`` processes when greater than one); each batch is appended to the store as
+    soon as it is embedded, so peak memory does not grow with the corpus. The new store
+    is written into a new version directory and swapped in at the end; non-flat ``index_spec``
+    types are built over its memory-mapped vectors.
+    """
+    if not documents_dir.exists():
+        raise FileNotFoundError(f"Document source not found at {documents_dir}")
+
+    settings = {
+        "embedding_model": embedding_model,
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+    }
+    manifest = None if full_rebuild else _load_manifest(vectorstore_dir)
+    if manifest is not None and manifest.get("embedding_model") != embedding_model:
+        manifest = None
+    rechunk_all = manifest is None or any(manifest.get(key) != value for key, value in settings.items())
+
+    embeddings = _LazyEmbeddings(embedding_model)
+    previous: Optional[MappedVectorStore] = None
+    previous_files: Dict[str, dict] = {}
+    if manifest is not None:
+        previous = MappedVectorStore(vectorstore_dir)
+        previous_files = manifest.get("files", {})
+
+    try:
+        stats = BuildStats()
+        files: Dict[str, dict] = {}
+        to_remove: List[str] = []
+        chunks = _scan_documents(
+            documents_dir,
+            _make_splitter(chunk_size, chunk_overlap),
+            previous_files,
+            rechunk_all,
+            files,
+            to_remove,
+            stats,
+        )
+
+        version_dir = vectorstore_dir / VERSIONS_DIR / f"v{time.time_ns()}"
+        writer = VectorStoreWriter(version_dir)
+        started = time.perf_counter()
+        cache = EmbeddingCache(EMBEDDING_CACHE_PATH)
+        try:
+            with EmbeddingPool(embedding_model, workers, embeddings=embeddings) as pool:
+                jobs = _embedding_jobs(_batched(chunks, batch_size), cache, embedding_model)
+                for batch_number, ((batch, vectors, missing), embedded) in enumerate(pool.imap(jobs), 1):
+                    computed = list(zip(missing, embedded))
+                    cache.put_many(embedding_model, computed)
+                    vectors.update(computed)
+                    stats.chunks_embedded += len(computed)
+                    embedded_hashes = set(missing)
+                    stats.chunks_from_cache += sum(
+                        1 for chunk in batch if chunk.chunk_hash not in embedded_hashes
+                    )
+
+                    writer.add(
+                        [vectors[chunk.chunk_hash] for chunk in batch],
+                        [
+                            (chunk.id, chunk.text, {"source": chunk.source, "chunk_hash": chunk.chunk_hash})
+                            for chunk in batch
+                        ],
+                    )
+                    stats.chunks_added += len(batch)
+                    stats.seconds = time.perf_counter() - started
+                    if batch_number % PROGRESS_EVERY_BATCHES == 0:
+                        print(f"  {stats.chunks_added} chunks indexed ({stats.chunks_per_second:.1f} chunks/sec)")
+        except BaseException:
+            writer.abort()
+            raise
+        finally:
+            cache.close()
+        stats.seconds = time.perf_counter() - started
+
+        index_changed = manifest is None or manifest.get("index") != index_spec.to_dict()
+        if previous is not None and not stats.chunks_added and not to_remove and not index_changed:
+            writer.abort()
+            print(f"Vector store at {vectorstore_dir} is up to date ({stats.format()})")
+            return stats
+
+        try:
+            if previous is not None:
+                # Carry over every chunk that is still current; removed ones are simply not copied.
+                removed = set(to_remove)
+                for old_vectors, records in previous.iter_records(batch_size=COPY_BATCH_SIZE):
+                    keep = [row for row, record in enumerate(records) if record[0] not in removed]
+                    stats.chunks_removed += len(records) - len(keep)
+                    writer.add(old_vectors[keep], [records[row] for row in keep])
+                previous.close()
+            if writer.count == 0:
+                raise ValueError(f"No {', '.join(SUPPORTED_SUFFIXES)} documents found in {documents_dir}")
+            writer.close({"embedding_model": embedding_model, "index_type": index_spec.type})
+
+            if index_spec.type != "flat":
+                ann_index = build_ann_index(open_vectors(version_dir), index_spec)
+                faiss.write_index(ann_index, str(version_dir / ANN_INDEX_FILE))
+                print(f"Built {index_spec.type} index over {ann_index.ntotal} vectors")
+            _write_manifest(
+                version_dir,
+                {"format": STORE_FORMAT, **settings, "index": index_spec.to_dict(), "files": files},
+            )
+        except BaseException:
+            writer.abort()
+            raise
+
+        _install_store(version_dir, vectorstore_dir)
+    finally:
+        # Releases the previous build's mapping on every path, including the early return.
+        if previous is not None:
+            previous.close()
+    print(f"Vector store saved to {vectorstore_dir} ({stats.format()})")
+    return stats
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build or update the Study Companion knowledge base.")
+    parser.add_argument(
+        "--documents-dir",
+        type=Path,
+        default=DOCUMENTS_DIR,
+        help="Directory tree of .txt/.md/.pdf documents to index",
+    )
+    parser.add_argument(
+        "--full-rebuild",
+        action="store_true",
+        help="Ignore the manifest and rebuild the index from scratch (cached embeddings are still reused)",
+    )
+    index_group = parser.add_argument_group("index type")
+    index_group.add_argument(
+        "--index-type",
+        choices=INDEX_TYPES,
+        default="flat",
+        help="Search index: exact search over the mapped vectors, IVF, HNSW or compressed IVF-PQ",
+    )
+    index_group.add_argument("--nlist", type=int, default=0, help="IVF cells (0 = ~4*sqrt(chunks))")
+    index_group.add_argument("--hnsw-m", type=int, default=32, help="HNSW neighbours per node")
+    index_group.add_argument("--ef-construction", type=int, default=200, help="HNSW build-time beam width")
+    index_group.add_argument("--pq-m", type=int, default=0, help="PQ sub-quantizers (0 = dim/8)")
+    index_group.add_argument("--pq-bits", type=int, default=8, help="Bits per PQ code")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Maximum characters per chunk",
+    )
+    parser.add_argument(
+        "--chunk-overlap",
+        type=int,
+        default=DEFAULT_CHUNK_OVERLAP,
+        help="Characters shared between consecutive chunks",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Number of chunks embedded and appended to the index at a time",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Embedding worker processes; 1 embeds in-process (best for small corpora)",
+    )
+    args = parser.parse_args()
+    if args.chunk_overlap >= args.chunk_size:
+        parser.error("--chunk-overlap must be smaller than --chunk-size")
+    if args.batch_size < 1 or args.workers < 1:
+        parser.error("--batch-size and --workers must be at least 1")
+    return args
 
 
 if __name__ == "__main__":
-    build_vector_store()
+    args = _parse_args()
+    build_vector_store(
+        args.documents_dir,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        index_spec=IndexSpec(
+            type=args.index_type,
+            nlist=args.nlist,
+            hnsw_m=args.hnsw_m,
+            ef_construction=args.ef_construction,
+            pq_m=args.pq_m,
+            pq_bits=args.pq_bits,
+        ),
+        full_rebuild=args.full_rebuild,
+    )
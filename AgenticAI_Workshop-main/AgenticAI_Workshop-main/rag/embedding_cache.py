@@ -0,0 +1,69 @@
+"""On-disk chunk-hash -> embedding vector cache used by the vector store builder."""
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vectors (
+    model TEXT NOT NULL,
+    chunk_hash TEXT NOT NULL,
+    dim INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (model, chunk_hash)
+)
+"""
+
+# SQLite limits the number of bound parameters per statement.
+_LOOKUP_BATCH = 500
+
+
+class EmbeddingCache:
+    """SQLite-backed store of float32 vectors keyed by (embedding model, chunk hash)."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def get_many(self, model: str, chunk_hashes: Sequence[str]) -> Dict[str, List[float]]:
+        """Return cached vectors for whichever of ``chunk_hashes`` are present."""
+        found: Dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(chunk_hashes))
+        with self._lock:
+            for start in range(0, len(unique), _LOOKUP_BATCH):
+                batch = unique[start : start + _LOOKUP_BATCH]
+                placeholders = ",".join("?" for _ in batch)
+                rows = self._conn.execute(
+                    f"SELECT chunk_hash, vector FROM vectors WHERE model = ? AND chunk_hash IN ({placeholders})",
+                    (model, *batch),
+                )
+                for chunk_hash, blob in rows:
+                    found[chunk_hash] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, model: str, items: Iterable[Tuple[str, Sequence[float]]]) -> None:
+        rows = []
+        for chunk_hash, vector in items:
+            array = np.asarray(vector, dtype=np.float32)
+            rows.append((model, chunk_hash, int(array.shape[0]), array.tobytes()))
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vectors (model, chunk_hash, dim, vector) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,88 @@
+"""Process pool that embeds batches of text with one embedding model per worker."""
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+T = TypeVar("T")
+
+_worker_embeddings: Optional[Embeddings] = None
+
+
+def _init_worker(model_name: str, threads: int) -> None:
+    global _worker_embeddings
+    try:
+        import torch
+
+        # Avoid oversubscribing cores: each worker gets its share of the CPU.
+        torch.set_num_threads(threads)
+    except ImportError:  # pragma: no cover - torch ships with sentence-transformers
+        pass
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+    _worker_embeddings = HuggingFaceEmbeddings(model_name=model_name)
+
+
+def _embed_batch(texts: List[str]) -> np.ndarray:
+    assert _worker_embeddings is not None, "worker was not initialised"
+    return np.asarray(_worker_embeddings.embed_documents(texts), dtype=np.float32)
+
+
+class EmbeddingPool:
+    """Embed text batches in order, in-process or across ``workers`` processes.
+
+    At most ``2 * workers`` batches are in flight at once, so memory stays bounded no
+    matter how many batches the input iterator produces.
+    """
+
+    def __init__(self, model_name: str, workers: int, *, embeddings: Embeddings) -> None:
+        self.workers = max(1, workers)
+        self.max_in_flight = 2 * self.workers
+        self._embeddings = embeddings
+        self._executor: Optional[ProcessPoolExecutor] = None
+        if self.workers > 1:
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(model_name, threads),
+            )
+
+    def imap(
+        self, jobs: Iterable[Tuple[T, List[str]]]
+    ) -> Iterator[Tuple[T, Sequence[Sequence[float]]]]:
+        """Yield ``(tag, vectors)`` for each ``(tag, texts)`` job, preserving input order."""
+        if self._executor is None:
+            for tag, texts in jobs:
+                yield tag, self._embeddings.embed_documents(texts) if texts else []
+            return
+
+        in_flight: Deque[Tuple[T, Optional[Future[Any]]]] = deque()
+        for tag, texts in jobs:
+            future = self._executor.submit(_embed_batch, texts) if texts else None
+            in_flight.append((tag, future))
+            while len(in_flight) >= self.max_in_flight:
+                yield self._resolve(in_flight.popleft())
+        while in_flight:
+            yield self._resolve(in_flight.popleft())
+
+    @staticmethod
+    def _resolve(item: Tuple[T, Optional[Future[Any]]]) -> Tuple[T, Sequence[Sequence[float]]]:
+        tag, future = item
+        return tag, future.result() if future is not None else []
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> "EmbeddingPool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,154 @@
+"""Content-addressed on-disk cache for study packs and per-task outputs."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from config.settings import RESULT_CACHE_DIR, RESULT_CACHE_MAX_BYTES, RESULT_CACHE_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 1
+
+
+def normalize_topic(topic: str) -> str:
+    """Collapse case and whitespace so trivially different spellings share a cache entry."""
+    return " ".join(topic.lower().split())
+
+
+def content_key(*parts: Any) -> str:
+    """Return a SHA-256 hex digest over the JSON encoding of ``parts``."""
+    payload = json.dumps([CACHE_FORMAT_VERSION, *parts], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """JSON files addressed by content hash, bounded by total size and entry age.
+
+    Writes keep a running size total, so the directory is only scanned when that total
+    passes ``max_bytes`` or every ``sweep_interval`` seconds (to drop expired entries and
+    pick up writes from other processes), not on every put.
+    """
+
+    def __init__(
+        self,
+        directory: Path = RESULT_CACHE_DIR,
+        *,
+        max_bytes: int = RESULT_CACHE_MAX_BYTES,
+        ttl_seconds: float = RESULT_CACHE_TTL_SECONDS,
+        sweep_interval: float = 300.0,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        self._lock = threading.Lock()
+        # Bytes on disk as of the last sweep plus this process's writes since; None until
+        # the first sweep.
+        self._total_bytes: Optional[int] = None
+        self._last_sweep = 0.0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for ``key`` or None if it is missing or expired."""
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError):
+            logger.warning("Discarding unreadable cache entry %s", path, exc_info=True)
+            path.unlink(missing_ok=True)
+            return None
+        return entry.get("value")
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store ``value`` under ``key`` atomically; evicts once the size bound is passed."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps(
+            {"created_at": time.time(), "value": value}, ensure_ascii=False
+        ).encode("utf-8")
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(payload)
+        tmp_path.replace(path)
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += len(payload) - replaced
+            due = (
+                self._total_bytes is None
+                or self._total_bytes > self.max_bytes
+                or time.monotonic() - self._last_sweep >= self.sweep_interval
+            )
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """Delete expired entries, then the oldest ones until under ``max_bytes``."""
+        with self._lock:
+            now = time.time()
+            removed = 0
+            entries = []
+            for path in self._entries():
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                if now - stat.st_mtime > self.ttl_seconds:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+
+            self._total_bytes = total
+            self._last_sweep = time.monotonic()
+            if removed:
+                logger.info("Result cache evicted %d entries (%d bytes remain)", removed, total)
+            return removed
+
+    def clear(self) -> None:
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._total_bytes = 0
+
+    def _entries(self) -> Iterable[Path]:
+        if not self.directory.exists():
+            return []
+        return list(self.directory.glob("*/*.json"))
+
+
+_DEFAULT_CACHE: Optional[ResultCache] = None
+_DEFAULT_CACHE_LOCK = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Return the process-wide result cache rooted at RESULT_CACHE_DIR."""
+    global _DEFAULT_CACHE
+    with _DEFAULT_CACHE_LOCK:
+        if _DEFAULT_CACHE is None:
+            _DEFAULT_CACHE = ResultCache()
+        return _DEFAULT_CACHE
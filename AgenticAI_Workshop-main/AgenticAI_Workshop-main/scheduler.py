@@ -0,0 +1,247 @@
+"""Dependency-aware parallel scheduler for the educational task graph."""
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Mapping, Optional, Sequence
+
+from pipeline_events import TASK_COMPLETED, TASK_STARTED, EventCallback, bind_tasks, emit, unbind_tasks
+from tracing import TASK, get_tracer, span
+
+if TYPE_CHECKING:  # pragma: no cover - typing helpers only
+    from crewai import Task
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TaskRunResult:
+    """Output and wall-clock timing for a single task executed by the scheduler."""
+
+    name: str
+    output: str
+    seconds: float
+    cached: bool = False
+    token_usage: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    llm_requests: int = 0
+    attempt: int = 1
+
+
+@dataclass
+class TokenUsage:
+    """Prompt/completion token counts and LLM request count recorded by one agent."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    requests: int = 0
+
+
+# Runs one task by name with the joined outputs of its dependencies as context.
+TaskExecutor = Callable[[str, str], TaskRunResult]
+
+
+def _interpolate_task(task: Task, inputs: Mapping[str, Any]) -> None:
+    """Fill '{topic}'-style placeholders the same way Crew.kickoff does."""
+    interpolate = getattr(task, "interpolate_inputs_and_add_conversation_history", None)
+    if interpolate is None:
+        interpolate = task.interpolate_inputs
+    interpolate(dict(inputs))
+
+
+def _task_output_text(output: Any) -> str:
+    candidate = getattr(output, "raw", None) or getattr(output, "raw_output", None)
+    return str(candidate if candidate is not None else output)
+
+
+def agent_usage(agent: Any) -> TokenUsage:
+    """Best-effort token counts recorded by a CrewAI agent."""
+    try:
+        token_process = getattr(agent, "_token_process", None)
+        if token_process is not None:
+            summary = token_process.get_summary()
+        else:
+            summary = agent.llm.get_token_usage_summary()
+    except Exception:  # pragma: no cover - depends on CrewAI internals
+        return TokenUsage()
+
+    def _field(name: str) -> int:
+        value = summary.get(name) if isinstance(summary, dict) else getattr(summary, name, 0)
+        return int(value or 0)
+
+    return TokenUsage(
+        prompt_tokens=_field("prompt_tokens"),
+        completion_tokens=_field("completion_tokens"),
+        total_tokens=_field("total_tokens"),
+        requests=_field("successful_requests"),
+    )
+
+
+def agent_token_usage(agent: Any) -> int:
+    """Best-effort total token count recorded by a CrewAI agent."""
+    return agent_usage(agent).total_tokens
+
+
+def execute_crewai_task(
+    task: Task,
+    inputs: Mapping[str, Any],
+    context: str,
+    *,
+    on_event: Optional[EventCallback] = None,
+) -> TaskRunResult:
+    """Interpolate and run a single CrewAI task outside of a Crew, streaming its events."""
+    _interpolate_task(task, inputs)
+    bind_tasks([task], on_event)
+    started = time.perf_counter()
+    try:
+        output = task.execute_sync(agent=task.agent, context=context, tools=task.tools)
+    finally:
+        unbind_tasks([task])
+    usage = agent_usage(task.agent)
+    return TaskRunResult(
+        name=task.name,
+        output=_task_output_text(output),
+        seconds=time.perf_counter() - started,
+        token_usage=usage.total_tokens,
+        prompt_tokens=usage.prompt_tokens,
+        completion_tokens=usage.completion_tokens,
+        llm_requests=usage.requests,
+    )
+
+
+def validate_task_graph(
+    task_names: Sequence[str], dependencies: Mapping[str, Sequence[str]]
+) -> None:
+    """Raise ValueError if the dependency map references unknown tasks or contains a cycle."""
+    known = set(task_names)
+    for name in task_names:
+        missing = [dep for dep in dependencies.get(name, ()) if dep not in known]
+        if missing:
+            raise ValueError(f"Task '{name}' depends on unknown tasks: {missing}")
+
+    resolved: set[str] = set()
+    remaining = list(task_names)
+    while remaining:
+        ready = [name for name in remaining if set(dependencies.get(name, ())) <= resolved]
+        if not ready:
+            raise ValueError(f"Task dependency cycle detected among: {remaining}")
+        resolved.update(ready)
+        remaining = [name for name in remaining if name not in resolved]
+
+
+def _run_node(
+    execute: TaskExecutor, name: str, context: str, on_event: Optional[EventCallback]
+) -> TaskRunResult:
+    logger.info("Task '%s' started", name)
+    emit(on_event, TASK_STARTED, task=name)
+    started = time.perf_counter()
+    with span(TASK, name) as task_span:
+        result = execute(name, context)
+        task_span.set(
+            attempt=result.attempt,
+            prompt_tokens=result.prompt_tokens,
+            completion_tokens=result.completion_tokens,
+            total_tokens=result.token_usage,
+            llm_requests=result.llm_requests,
+        )
+    # Wall-clock time includes any failover attempts made by the executor.
+    result.seconds = time.perf_counter() - started
+    logger.info("Task '%s' finished in %.2fs (attempt %d)", name, result.seconds, result.attempt)
+    emit(
+        on_event,
+        TASK_COMPLETED,
+        task=name,
+        text=result.output,
+        seconds=result.seconds,
+        cached=False,
+        attempt=result.attempt,
+    )
+    return result
+
+
+def run_task_graph(
+    task_names: Sequence[str],
+    dependencies: Mapping[str, Sequence[str]],
+    execute: TaskExecutor,
+    *,
+    max_workers: int | None = None,
+    completed: Optional[Mapping[str, str]] = None,
+    on_task_complete: Optional[Callable[[TaskRunResult], None]] = None,
+    on_event: Optional[EventCallback] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Dict[str, TaskRunResult]:
+    """Run tasks as soon as their dependencies finish, executing independent tasks concurrently.
+
+    ``execute(name, context)`` runs one task, where context joins the raw outputs of its
+    declared dependencies. Outputs passed in ``completed`` (e.g. from the result cache)
+    are used as-is instead of running the task. ``on_task_complete`` is called for every
+    freshly executed task, and ``on_event`` receives task lifecycle events. Results are
+    returned keyed by task name, in the original task order.
+
+    When a task fails, ``cancel`` is set so running siblings can stop at their next step
+    (see failover.cancellation_check), tasks not started yet are dropped, and the error is
+    raised without waiting for the siblings to finish.
+    """
+    cancel = cancel if cancel is not None else threading.Event()
+    validate_task_graph(task_names, dependencies)
+
+    results: Dict[str, TaskRunResult] = {
+        name: TaskRunResult(name=name, output=output, seconds=0.0, cached=True)
+        for name, output in (completed or {}).items()
+        if name in task_names
+    }
+    for name, cached in results.items():
+        logger.info("Task '%s' served from cache", name)
+        get_tracer().record(TASK, name, 0.0, cached=True)
+        emit(on_event, TASK_COMPLETED, task=name, text=cached.output, seconds=0.0, cached=True)
+
+    waiting = [name for name in task_names if name not in results]
+    pending: Dict[Future[TaskRunResult], str] = {}
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers or max(1, len(waiting)), thread_name_prefix="edu-task"
+    )
+    try:
+        while waiting or pending:
+            ready = [
+                name
+                for name in waiting
+                if all(dep in results for dep in dependencies.get(name, ()))
+            ]
+            for name in ready:
+                waiting.remove(name)
+                context = "\n\n".join(
+                    results[dep].output for dep in dependencies.get(name, ())
+                )
+                # Tasks run in a copy of the caller's context so their spans nest under the run.
+                pending[
+                    executor.submit(
+                        contextvars.copy_context().run, _run_node, execute, name, context, on_event
+                    )
+                ] = name
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception:
+                    cancel.set()
+                    logger.error(
+                        "Task '%s' failed; aborting task graph (%d task(s) still running)",
+                        name,
+                        len(pending),
+                    )
+                    raise
+                if on_task_complete is not None:
+                    on_task_complete(results[name])
+    finally:
+        # On failure, running siblings stop at their next step; nobody waits for them.
+        executor.shutdown(wait=not cancel.is_set(), cancel_futures=True)
+
+    return {name: results[name] for name in task_names}
@@ -1,21 +1,60 @@
 """Task definitions for the Educational Workflow System."""
 from __future__ import annotations
 
-from typing import List
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
 
-from crewai import Task
+if TYPE_CHECKING:  # pragma: no cover - typing helpers only
+    from crewai import Task
 
-from tools import create_calculator_tool, create_knowledge_retriever, create_web_search_tool
+# Task names, dependencies and budgets are imported by the frontend and main.py before any
+# pipeline runs, so CrewAI and the tool backends are only imported inside the factories.
 
+STUDY_PLAN_TASK = "Study Management & Planning"
+NOTES_TASK = "Notes Generation"
+EXAMPLES_TASK = "Example Problem Solving"
+QUIZ_TASK = "Quiz Creation"
 
-def create_study_management_task(agent, tools=None) -> Task:
-    """Task 1: Orchestrate the educational workflow and define the study plan."""
-    tools = list(tools) if tools is not None else [
-        create_knowledge_retriever(),
-        create_web_search_tool(),
-        create_calculator_tool(),
-    ]
-    return Task(
+# Upstream tasks whose output each task needs as context. Notes, examples and the
+# quiz only build on the study plan, so they can run concurrently once it exists.
+TASK_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    STUDY_PLAN_TASK: (),
+    NOTES_TASK: (STUDY_PLAN_TASK,),
+    EXAMPLES_TASK: (STUDY_PLAN_TASK,),
+    QUIZ_TASK: (STUDY_PLAN_TASK,),
+}
+
+
+@dataclass(frozen=True)
+class TaskBudget:
+    """Completion-token cap for a task's LLM calls, and how far it may grow after truncation."""
+
+    max_tokens: int
+    ceiling: int
+
+
+# Sized to each task's expected output: the plan is an outline, while the quiz needs
+# 10 MCQs, 5 short answers and a full answer key. See token_budget.py for how caps grow.
+TASK_BUDGETS: Dict[str, TaskBudget] = {
+    STUDY_PLAN_TASK: TaskBudget(max_tokens=600, ceiling=1000),
+    NOTES_TASK: TaskBudget(max_tokens=1200, ceiling=2000),
+    EXAMPLES_TASK: TaskBudget(max_tokens=1400, ceiling=2400),
+    QUIZ_TASK: TaskBudget(max_tokens=2200, ceiling=3600),
+}
+
+
+def _default_tools(*kinds: str) -> list:
+    """Process-wide tool instances, so their caches and loaded models outlive one run."""
+    from tools import get_shared_tool
+
+    return [get_shared_tool(kind) for kind in kinds]
+
+
+def study_management_task_kwargs(tools=None) -> Dict[str, Any]:
+    """Constructor arguments (all but the agent) of the study planning task."""
+    if tools is None:
+        tools = _default_tools("knowledge", "web_search", "calculator")
+    return dict(
         description=(
             "Analyze the study topic '{topic}' and create a comprehensive learning plan. "
             "Define learning objectives, identify key concepts to cover, and establish "
@@ -26,20 +65,23 @@ def create_study_management_task(agent, tools=None) -> Task:
             "A detailed study plan outlining: 1) Learning objectives, 2) Key topics and subtopics, "
             "3) Coordination guidelines for other agents, 4) Quality criteria, and 5) Final study pack structure."
         ),
-        agent=agent,
-        tools=tools,
-        name="Study Management & Planning",
+        tools=list(tools),
+        name=STUDY_PLAN_TASK,
     )
 
 
-def create_notes_generation_task(agent, tools=None) -> Task:
-    """Task 2: Generate easy-to-understand notes and summaries."""
-    tools = list(tools) if tools is not None else [
-        create_knowledge_retriever(),
-        create_web_search_tool(),
-        create_calculator_tool(),
-    ]
-    return Task(
+def create_study_management_task(agent, tools=None) -> Task:
+    """Task 1: Orchestrate the educational workflow and define the study plan."""
+    from crewai import Task
+
+    return Task(**study_management_task_kwargs(tools), agent=agent)
+
+
+def notes_generation_task_kwargs(tools=None) -> Dict[str, Any]:
+    """Constructor arguments (all but the agent) of the notes task."""
+    if tools is None:
+        tools = _default_tools("knowledge", "web_search", "calculator")
+    return dict(
         description=(
             "Create comprehensive yet easy-to-understand study notes on '{topic}'. "
             "Use the knowledge base and web search tools to gather accurate information. "
@@ -52,20 +94,23 @@ def create_notes_generation_task(agent, tools=None) -> Task:
             "Each section should include: definitions, key concepts, important points, and a brief summary. "
             "Notes should be concise, easy to read, and suitable for quick review and deep study."
         ),
-        agent=agent,
-        tools=tools,
-        name="Notes Generation",
+        tools=list(tools),
+        name=NOTES_TASK,
     )
 
 
-def create_example_solving_task(agent, tools=None) -> Task:
-    """Task 3: Solve example problems with step-by-step solutions."""
-    tools = list(tools) if tools is not None else [
-        create_calculator_tool(),
-        create_knowledge_retriever(),
-        create_web_search_tool(),
-    ]
-    return Task(
+def create_notes_generation_task(agent, tools=None) -> Task:
+    """Task 2: Generate easy-to-understand notes and summaries."""
+    from crewai import Task
+
+    return Task(**notes_generation_task_kwargs(tools), agent=agent)
+
+
+def example_solving_task_kwargs(tools=None) -> Dict[str, Any]:
+    """Constructor arguments (all but the agent) of the worked examples task."""
+    if tools is None:
+        tools = _default_tools("calculator", "knowledge", "web_search")
+    return dict(
         description=(
             "Create and solve example problems related to '{topic}'. "
             "Generate 3-5 relevant example problems that cover key concepts. "
@@ -81,19 +126,23 @@ def create_example_solving_task(agent, tools=None) -> Task:
             "- Annotations explaining the reasoning, "
             "- Final Answer with verification where applicable."
         ),
-        agent=agent,
-        tools=tools,
-        name="Example Problem Solving",
+        tools=list(tools),
+        name=EXAMPLES_TASK,
     )
 
 
-def create_quiz_making_task(agent, tools=None) -> Task:
-    """Task 4: Create practice questions including MCQs and short answers."""
-    tools = list(tools) if tools is not None else [
-        create_knowledge_retriever(),
-        create_web_search_tool(),
-    ]
-    return Task(
+def create_example_solving_task(agent, tools=None) -> Task:
+    """Task 3: Solve example problems with step-by-step solutions."""
+    from crewai import Task
+
+    return Task(**example_solving_task_kwargs(tools), agent=agent)
+
+
+def quiz_making_task_kwargs(tools=None) -> Dict[str, Any]:
+    """Constructor arguments (all but the agent) of the quiz task."""
+    if tools is None:
+        tools = _default_tools("knowledge", "web_search")
+    return dict(
         description=(
             "Design a comprehensive practice quiz for '{topic}'. Create: "
             "1) 10 Multiple Choice Questions (MCQs) with 4 options each, "
@@ -112,12 +161,17 @@ def create_quiz_making_task(agent, tools=None) -> Task:
             "  * Detailed explanations for each answer, "
             "  * Common mistakes to avoid."
         ),
-        agent=agent,
-        tools=tools,
-        name="Quiz Creation",
+        tools=list(tools),
+        name=QUIZ_TASK,
     )
 
 
+def create_quiz_making_task(agent, tools=None) -> Task:
+    """Task 4: Create practice questions including MCQs and short answers."""
+    from crewai import Task
+
+    return Task(**quiz_making_task_kwargs(tools), agent=agent)
+
 
 def build_educational_tasks(
     study_manager,
@@ -126,10 +180,20 @@ def build_educational_tasks(
     quiz_maker,
     tools=None
 ) -> List[Task]:
-    """Create the full educational task list for all agents."""
-    return [
+    """Create the full educational task list for all agents, wired per TASK_DEPENDENCIES."""
+    return wire_task_context([
         create_study_management_task(study_manager, tools=tools),
         create_notes_generation_task(notes_generator, tools=tools),
         create_example_solving_task(example_solver, tools=tools),
         create_quiz_making_task(quiz_maker, tools=tools),
-    ]
+    ])
+
+
+def wire_task_context(tasks: List[Task]) -> List[Task]:
+    """Set each task's ``context`` to the tasks it depends on per TASK_DEPENDENCIES."""
+    by_name = {task.name: task for task in tasks}
+    for task in tasks:
+        dependencies = TASK_DEPENDENCIES.get(task.name, ())
+        if dependencies:
+            task.context = [by_name[name] for name in dependencies]
+    return tasks
@@ -0,0 +1,133 @@
+"""Fallback attempts: first success, hedging on lack of progress, race width and cancelling."""
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+import failover
+from failover import AttemptCancelled, FailoverPolicy, run_with_failover
+
+
+@pytest.fixture
+def slots(monkeypatch):
+    """A private pool of two speculative slots, so other tests cannot hold any."""
+    semaphore = threading.BoundedSemaphore(2)
+    monkeypatch.setattr(failover, "_speculative_slots", semaphore)
+    return semaphore
+
+
+def _returns(value):
+    return lambda control: value
+
+
+def _fails(message):
+    def _run(control):
+        raise RuntimeError(message)
+
+    return _run
+
+
+def _waits_for_cancel(cancelled):
+    """An attempt that runs until it is cancelled, like a slow LLM call."""
+
+    def _run(control):
+        if control.cancel.wait(5):
+            cancelled.set()
+            raise AttemptCancelled("lost")
+        return "timed out"
+
+    return _run
+
+
+def test_first_success_wins_after_failures():
+    failures = []
+    result = run_with_failover(
+        [_fails("first"), _returns("second"), _returns("third")],
+        FailoverPolicy(strategy="sequential"),
+        on_failure=lambda index, exc: failures.append((index, str(exc))),
+    )
+    assert result == ("second", 2)
+    assert failures == [(1, "first")]
+
+
+def test_all_attempts_failing_raises_the_last_error():
+    with pytest.raises(RuntimeError, match="third"):
+        run_with_failover(
+            [_fails("first"), _fails("second"), _fails("third")],
+            FailoverPolicy(strategy="sequential"),
+        )
+
+
+def test_hedge_fires_when_no_attempt_progressed(slots):
+    cancelled = threading.Event()
+    result = run_with_failover(
+        [_waits_for_cancel(cancelled), _returns("hedge")],
+        FailoverPolicy(strategy="hedged", hedge_delay=0.05),
+    )
+    assert result == ("hedge", 2)
+    assert cancelled.wait(2)
+
+
+def test_no_hedge_once_an_attempt_progressed(slots):
+    hedged = []
+
+    def _progressing(control):
+        control.progressed.set()
+        # Still running after several hedge delays, but making progress.
+        threading.Event().wait(0.3)
+        return "primary"
+
+    result = run_with_failover(
+        [_progressing, lambda control: hedged.append(1) or "hedge"],
+        FailoverPolicy(strategy="hedged", hedge_delay=0.05),
+    )
+    assert result == ("primary", 1)
+    assert hedged == []
+
+
+def test_race_runs_at_most_race_width_attempts_at_once(slots):
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def _attempt(fail):
+        def _run(control):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            threading.Event().wait(0.05)
+            with lock:
+                active[0] -= 1
+            if fail:
+                raise RuntimeError("failed")
+            return "done"
+
+        return _run
+
+    result = run_with_failover(
+        [_attempt(True), _attempt(True), _attempt(True), _attempt(False)],
+        FailoverPolicy(strategy="race", race_width=2),
+    )
+    assert result == ("done", 4)
+    assert peak[0] == 2
+
+
+def test_losers_are_cancelled_and_release_their_slot(slots):
+    loser_started = threading.Event()
+    loser_cancelled = threading.Event()
+
+    def _winner(control):
+        loser_started.wait(5)
+        return "winner"
+
+    def _loser(control):
+        loser_started.set()
+        return _waits_for_cancel(loser_cancelled)(control)
+
+    result = run_with_failover([_winner, _loser], FailoverPolicy(strategy="race", race_width=2))
+    assert result == ("winner", 1)
+    assert loser_cancelled.wait(2)
+    # The loser's thread has stopped, so both speculative slots are free again.
+    assert slots.acquire(timeout=2)
+    assert slots.acquire(timeout=2)
@@ -0,0 +1,123 @@
+"""Job queue semantics: submit/dedupe, claim, leases, cancel and release."""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from jobs import CANCELLED, FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue
+
+LEASE_SECONDS = 0.05
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(tmp_path / "jobs.sqlite", lease_seconds=LEASE_SECONDS, max_attempts=2)
+
+
+def _expire_lease():
+    time.sleep(LEASE_SECONDS * 2)
+
+
+def test_submit_deduplicates_pending_topics(queue):
+    first = queue.submit("Photosynthesis")
+    assert first.status == QUEUED
+    assert queue.submit("  photosynthesis ").id == first.id
+    assert queue.submit("Photosynthesis", cache_mode="off").id != first.id
+
+
+def test_submit_rejects_unknown_options(queue):
+    with pytest.raises(ValueError, match="bogus"):
+        queue.submit("Photosynthesis", bogus=1)
+
+
+def test_finished_topic_can_be_submitted_again(queue):
+    job = queue.submit("Photosynthesis")
+    queue.claim("w1")
+    assert queue.finish(job.id, "w1", SUCCEEDED, result={"output": "pack"})
+    assert queue.get(job.id).output == "pack"
+    assert queue.submit("Photosynthesis").id != job.id
+
+
+def test_claim_takes_oldest_queued_job_once(queue):
+    first = queue.submit("First")
+    second = queue.submit("Second")
+    claimed = queue.claim("w1")
+    assert (claimed.id, claimed.status, claimed.worker, claimed.attempts) == (
+        first.id,
+        RUNNING,
+        "w1",
+        1,
+    )
+    assert queue.claim("w2").id == second.id
+    assert queue.claim("w3") is None
+
+
+def test_only_the_owner_can_finish_a_job(queue):
+    job = queue.submit("Photosynthesis")
+    queue.claim("w1")
+    assert not queue.finish(job.id, "w2", SUCCEEDED, result={"output": "pack"})
+    assert queue.finish(job.id, "w1", FAILED, error="boom")
+    assert queue.get(job.id).error == "boom"
+
+
+def test_expired_lease_is_requeued_then_failed(queue):
+    job = queue.submit("Photosynthesis")
+    queue.claim("dead-1")
+    _expire_lease()
+    reclaimed = queue.claim("w2")
+    assert (reclaimed.id, reclaimed.attempts) == (job.id, 2)
+    assert not queue.heartbeat(job.id, "dead-1")
+    _expire_lease()
+    assert queue.claim("w3") is None
+    expired = queue.get(job.id)
+    assert (expired.status, expired.error) == (FAILED, "Worker stopped responding")
+
+
+def test_heartbeat_keeps_the_lease(queue):
+    job = queue.submit("Photosynthesis")
+    queue.claim("w1")
+    for _ in range(3):
+        time.sleep(LEASE_SECONDS / 2)
+        assert queue.heartbeat(job.id, "w1", {"message": "working"})
+    assert queue.claim("w2") is None
+    assert queue.get(job.id).progress == {"message": "working"}
+
+
+def test_cancel_queued_job(queue):
+    job = queue.submit("Photosynthesis")
+    assert queue.cancel(job.id).status == CANCELLED
+    assert queue.claim("w1") is None
+
+
+def test_cancel_running_job_stops_it_at_next_heartbeat(queue):
+    job = queue.submit("Photosynthesis")
+    queue.claim("w1")
+    assert queue.cancel(job.id).status == RUNNING
+    assert not queue.heartbeat(job.id, "w1")
+    assert queue.finish(job.id, "w1", CANCELLED, error="Cancelled")
+
+
+def test_cancelled_job_with_expired_lease_is_not_rerun(queue):
+    job = queue.submit("Photosynthesis")
+    queue.claim("dead-1")
+    queue.cancel(job.id)
+    _expire_lease()
+    assert queue.claim("w2") is None
+    assert queue.get(job.id).status == CANCELLED
+
+
+def test_release_requeues_without_counting_the_claim(queue):
+    job = queue.submit("Photosynthesis")
+    queue.claim("w1")
+    assert queue.release(job.id, "w1")
+    released = queue.get(job.id)
+    assert (released.status, released.attempts, released.worker) == (QUEUED, 0, None)
+
+
+def test_release_leaves_cancelled_job_alone(queue):
+    job = queue.submit("Photosynthesis")
+    queue.claim("w1")
+    queue.cancel(job.id)
+    assert not queue.release(job.id, "w1")
+    assert queue.get(job.id).status == RUNNING
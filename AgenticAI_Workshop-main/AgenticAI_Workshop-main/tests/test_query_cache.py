@@ -0,0 +1,35 @@
+"""Knowledge-query cache: exact hits, near-duplicate hits and their aliases' expiry."""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from tools.query_cache import QueryCache  # noqa: E402
+
+
+def test_exact_hit_ignores_case_and_whitespace():
+    cache = QueryCache()
+    cache.put("What is  Photosynthesis", "v1", ["doc"])
+    assert cache.get("what is photosynthesis", "v1") == ["doc"]
+    assert cache.get("what is photosynthesis", "v2") is None
+
+
+def test_near_duplicate_hit_within_scope():
+    cache = QueryCache(semantic_threshold=0.95)
+    cache.put("photosynthesis", "v1", ["doc"], [1.0, 0.0])
+    assert cache.get_similar([0.99, 0.01], "v1") == ["doc"]
+    assert cache.get_similar([0.0, 1.0], "v1") is None
+    assert cache.get_similar([0.99, 0.01], "v2") is None
+
+
+def test_alias_expires_with_the_original_entry():
+    cache = QueryCache(ttl_seconds=0.05, semantic_threshold=0.95)
+    cache.put("photosynthesis", "v1", ["doc"], [1.0, 0.0])
+    time.sleep(0.03)
+    assert cache.get_similar([0.99, 0.01], "v1", alias="photosynthesis process") == ["doc"]
+    assert cache.get("photosynthesis process", "v1") == ["doc"]
+    time.sleep(0.03)
+    assert cache.get("photosynthesis process", "v1") is None
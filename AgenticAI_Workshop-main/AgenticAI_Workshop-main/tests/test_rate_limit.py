@@ -0,0 +1,199 @@
+"""Token bucket, Retry-After parsing, shared pauses, backoff bounds and 429 detection."""
+from __future__ import annotations
+
+import random
+import time
+from email.utils import formatdate
+
+import pytest
+
+from config.rate_limit import (
+    TokenBucket,
+    backoff_delay,
+    call_with_rate_limit,
+    is_rate_limit_error,
+    retry_after_seconds,
+)
+
+
+class FakeClock:
+    """Monotonic clock that only moves when something sleeps on it."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code=429, headers=None) -> None:
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class HTTPError(Exception):
+    def __init__(self, response) -> None:
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+
+class RateLimitError(Exception):
+    """Named like the provider SDK's error, which carries no status code here."""
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _bucket(clock, rate_per_minute=60, burst=2):
+    return TokenBucket(rate_per_minute, burst=burst, clock=clock, sleep=clock.sleep)
+
+
+def test_bucket_allows_a_burst_then_refills_at_its_rate(clock):
+    bucket = _bucket(clock)
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == pytest.approx(1.0)
+    clock.now += 0.25
+    assert bucket.try_acquire() == pytest.approx(0.75)
+    assert bucket.acquire() == pytest.approx(0.75)
+    assert clock.sleeps == [pytest.approx(0.75)]
+
+
+def test_bucket_never_saves_up_more_than_its_burst(clock):
+    bucket = _bucket(clock)
+    clock.now += 3600
+    assert bucket.try_acquire(2) == 0.0
+    assert bucket.try_acquire() > 0
+
+
+def test_pause_holds_callers_and_drops_the_saved_burst(clock):
+    bucket = _bucket(clock)
+    bucket.pause(10)
+    assert bucket.try_acquire() == pytest.approx(10)
+    clock.now += 10
+    # The burst is gone: the next token still has to refill.
+    assert bucket.try_acquire() == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"retry-after": "7"}, 7.0),
+        ({"retry-after-ms": "1500"}, 1.5),
+        ({"retry-after-ms": "oops", "retry-after": "2"}, 2.0),
+        ({"retry-after": "-3"}, 0.0),
+        ({"retry-after": "soon"}, None),
+        ({}, None),
+    ],
+)
+def test_retry_after_headers(headers, expected):
+    assert retry_after_seconds(HTTPError(FakeResponse(headers=headers))) == expected
+
+
+def test_retry_after_http_date():
+    past = formatdate(time.time() - 30, usegmt=True)
+    future = formatdate(time.time() + 30, usegmt=True)
+    assert retry_after_seconds(HTTPError(FakeResponse(headers={"retry-after": past}))) == 0.0
+    delay = retry_after_seconds(HTTPError(FakeResponse(headers={"retry-after": future})))
+    assert 28 <= delay <= 31
+
+
+def test_retry_after_is_read_through_wrapped_errors():
+    try:
+        try:
+            raise HTTPError(FakeResponse(headers={"retry-after": "4"}))
+        except HTTPError as exc:
+            raise RuntimeError("LLM call failed") from exc
+    except RuntimeError as wrapped:
+        assert retry_after_seconds(wrapped) == 4.0
+
+
+def test_rate_limit_detection_through_wrapped_exceptions():
+    assert is_rate_limit_error(HTTPError(FakeResponse(429)))
+    assert is_rate_limit_error(RateLimitError("slow down"))
+    assert not is_rate_limit_error(HTTPError(FakeResponse(500)))
+    assert not is_rate_limit_error(ValueError("bad input"))
+
+    def _wrapped(inner, explicit):
+        try:
+            try:
+                raise inner
+            except Exception as exc:
+                if explicit:
+                    raise RuntimeError("wrapped") from exc
+                raise RuntimeError("wrapped")
+        except RuntimeError as outer:
+            return outer
+
+    assert is_rate_limit_error(_wrapped(HTTPError(FakeResponse(429)), explicit=True))
+    assert is_rate_limit_error(_wrapped(RateLimitError("slow down"), explicit=False))
+    assert not is_rate_limit_error(_wrapped(HTTPError(FakeResponse(503)), explicit=True))
+
+
+def test_full_jitter_backoff_stays_within_its_bounds():
+    random.seed(0)
+    for attempt in range(8):
+        ceiling = min(10.0, 0.5 * 2**attempt)
+        delays = [backoff_delay(attempt, base=0.5, cap=10.0) for _ in range(200)]
+        assert all(0.0 <= delay <= ceiling for delay in delays)
+        # Full jitter spreads retries over the whole range rather than clustering at the top.
+        assert min(delays) < ceiling / 4 and max(delays) > ceiling * 3 / 4
+
+
+def test_retry_after_pauses_the_shared_bucket(clock):
+    bucket = _bucket(clock, burst=5)
+    calls = []
+    own_sleeps = []
+
+    def _call():
+        calls.append(clock.now)
+        if len(calls) == 1:
+            raise HTTPError(FakeResponse(headers={"retry-after": "3"}))
+        return "ok"
+
+    result = call_with_rate_limit(
+        _call, bucket, max_retries=2, backoff_base=0.0, backoff_max=60, sleep=own_sleeps.append
+    )
+    assert result == "ok"
+    # The retry waited on the bucket, so every other caller of the bucket waits too.
+    assert own_sleeps == []
+    assert calls[1] - calls[0] >= 3
+    assert bucket.try_acquire() > 0
+
+
+def test_retries_without_retry_after_use_backoff_then_give_up():
+    sleeps = []
+
+    def _call():
+        raise HTTPError(FakeResponse(429))
+
+    with pytest.raises(HTTPError):
+        call_with_rate_limit(
+            _call, None, max_retries=3, backoff_base=1.0, backoff_max=2.0, sleep=sleeps.append
+        )
+    assert len(sleeps) == 3
+    assert all(0.0 <= delay <= 2.0 for delay in sleeps)
+
+
+def test_other_errors_are_not_retried():
+    sleeps = []
+    calls = []
+
+    def _call():
+        calls.append(1)
+        raise HTTPError(FakeResponse(500))
+
+    with pytest.raises(HTTPError):
+        call_with_rate_limit(
+            _call, None, max_retries=3, backoff_base=1.0, backoff_max=2.0, sleep=sleeps.append
+        )
+    assert calls == [1]
+    assert sleeps == []
@@ -0,0 +1,41 @@
+"""Result cache round trips and the size bound enforced without a scan per write."""
+from __future__ import annotations
+
+import pytest
+
+from result_cache import ResultCache, content_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(tmp_path, max_bytes=1000, ttl_seconds=3600, sweep_interval=3600)
+
+
+def test_put_then_get(cache):
+    key = content_key("task", "photosynthesis")
+    cache.put(key, {"output": "notes"})
+    assert cache.get(key) == {"output": "notes"}
+    assert cache.get(content_key("task", "other")) is None
+
+
+def test_expired_entry_is_dropped(tmp_path):
+    cache = ResultCache(tmp_path, ttl_seconds=-1)
+    key = content_key("task", "photosynthesis")
+    cache.put(key, {"output": "notes"})
+    assert cache.get(key) is None
+
+
+def test_puts_under_the_bound_do_not_rescan(cache, monkeypatch):
+    cache.put(content_key(0), {"output": "x"})
+    scans = []
+    monkeypatch.setattr(cache, "_entries", lambda: scans.append(1) or [])
+    for index in range(1, 5):
+        cache.put(content_key(index), {"output": "x"})
+    assert scans == []
+
+
+def test_entries_are_evicted_past_max_bytes(cache):
+    for index in range(20):
+        cache.put(content_key(index), {"output": "x" * 100})
+    assert 0 < len(cache._entries()) < 20
+    assert sum(path.stat().st_size for path in cache._entries()) <= cache.max_bytes
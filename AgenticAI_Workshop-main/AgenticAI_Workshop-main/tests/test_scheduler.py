@@ -0,0 +1,115 @@
+"""Task graph scheduling: concurrency, cached outputs, validation and aborting on failure."""
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from scheduler import TaskRunResult, run_task_graph, validate_task_graph
+
+# plan -> (notes, examples) -> quiz, like the educational pipeline.
+TASKS = ("plan", "notes", "examples", "quiz")
+DEPENDENCIES = {"notes": ("plan",), "examples": ("plan",), "quiz": ("notes", "examples")}
+
+
+def _echo(calls):
+    def _execute(name, context):
+        calls.append((name, context))
+        return TaskRunResult(name=name, output=f"{name} output", seconds=0.0)
+
+    return _execute
+
+
+def test_tasks_receive_their_dependencies_outputs():
+    calls = []
+    results = run_task_graph(TASKS, DEPENDENCIES, _echo(calls))
+    assert list(results) == list(TASKS)
+    contexts = dict(calls)
+    assert contexts["plan"] == ""
+    assert contexts["notes"] == "plan output"
+    assert contexts["quiz"] == "notes output\n\nexamples output"
+
+
+def test_independent_tasks_run_concurrently():
+    # Both middle tasks must be inside execute() at the same time to pass the barrier.
+    barrier = threading.Barrier(2, timeout=5)
+
+    def _execute(name, context):
+        if name in ("notes", "examples"):
+            barrier.wait()
+        return TaskRunResult(name=name, output=name, seconds=0.0)
+
+    results = run_task_graph(TASKS, DEPENDENCIES, _execute)
+    assert set(results) == set(TASKS)
+
+
+def test_completed_outputs_are_used_instead_of_running_tasks():
+    calls = []
+    completed_tasks = []
+    results = run_task_graph(
+        TASKS,
+        DEPENDENCIES,
+        _echo(calls),
+        completed={"plan": "cached plan", "notes": "cached notes"},
+        on_task_complete=lambda result: completed_tasks.append(result.name),
+    )
+    assert sorted(name for name, _ in calls) == ["examples", "quiz"]
+    assert dict(calls)["examples"] == "cached plan"
+    assert results["plan"].cached and results["plan"].output == "cached plan"
+    assert not results["quiz"].cached
+    assert sorted(completed_tasks) == ["examples", "quiz"]
+
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(ValueError, match="unknown"):
+        validate_task_graph(["notes"], {"notes": ["plan"]})
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        run_task_graph(["a", "b"], {"a": ["b"], "b": ["a"]}, _echo([]))
+
+
+def test_failure_aborts_the_graph_without_waiting_for_siblings():
+    cancel = threading.Event()
+    sibling_stopped = threading.Event()
+    calls = []
+
+    def _execute(name, context):
+        calls.append(name)
+        if name == "notes":
+            raise RuntimeError("notes failed")
+        if name == "examples":
+            # A long LLM task that stops at its next step once the graph is cancelled.
+            cancel.wait(5)
+            sibling_stopped.set()
+        return TaskRunResult(name=name, output=name, seconds=0.0)
+
+    started = time.monotonic()
+    with pytest.raises(RuntimeError, match="notes failed"):
+        run_task_graph(TASKS, DEPENDENCIES, _execute, cancel=cancel)
+    assert time.monotonic() - started < 2
+    assert cancel.is_set()
+    assert sibling_stopped.wait(2)
+    assert "quiz" not in calls
+
+
+def test_aborted_graph_stops_the_tasks_failover_attempts():
+    from failover import FailoverPolicy, TaskGraphAborted, cancellation_check, run_with_failover
+
+    graph_cancel = threading.Event()
+    graph_cancel.set()
+    attempted = []
+
+    def _attempt(index):
+        def _run(control):
+            attempted.append(index)
+            cancellation_check(control.cancel, graph_cancel=graph_cancel)()
+            return index
+
+        return _run
+
+    with pytest.raises(TaskGraphAborted):
+        run_with_failover([_attempt(1), _attempt(2)], FailoverPolicy(strategy="sequential"))
+    assert attempted == [1]
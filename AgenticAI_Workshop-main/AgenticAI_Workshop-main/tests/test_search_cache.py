@@ -0,0 +1,99 @@
+"""Web search cache (TTL, offline replay, LRU bound) and in-flight request coalescing."""
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from tools.search_cache import RequestCoalescer, SearchCache, search_key
+
+RESULTS = [{"title": "Photosynthesis", "href": "https://example.org/p", "body": "Light"}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SearchCache(tmp_path / "web.sqlite", ttl_seconds=3600, max_entries=3)
+
+
+def _put(cache, query, results=RESULTS):
+    key = search_key("text", query, 5)
+    cache.put(key, "text", query, 5, results)
+    return key
+
+
+def _age(cache, key, seconds):
+    cache._conn.execute(
+        "UPDATE results SET created_at = created_at - ? WHERE key = ?", (seconds, key)
+    )
+    cache._conn.commit()
+
+
+def test_key_ignores_case_and_whitespace():
+    assert search_key("text", "Photo  Synthesis", 5) == search_key("text", "photo synthesis", 5)
+    assert search_key("text", "photosynthesis", 5) != search_key("news", "photosynthesis", 5)
+
+
+def test_round_trip(cache):
+    key = _put(cache, "photosynthesis")
+    assert cache.get(key) == RESULTS
+    assert cache.get(search_key("text", "other", 5)) is None
+
+
+def test_expired_entry_is_dropped_online(cache):
+    key = _put(cache, "photosynthesis")
+    _age(cache, key, 7200)
+    assert cache.get(key) is None
+    assert cache.get(key, ignore_ttl=True) is None
+
+
+def test_offline_replay_serves_and_keeps_stale_entries(cache):
+    key = _put(cache, "photosynthesis")
+    _age(cache, key, 7200)
+    assert cache.get(key, ignore_ttl=True) == RESULTS
+    assert cache.get(key, ignore_ttl=True) == RESULTS
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    keys = [_put(cache, f"query {index}") for index in range(3)]
+    time.sleep(0.01)
+    cache.get(keys[0])
+    _put(cache, "query 3")
+    assert cache.get(keys[0]) == RESULTS
+    assert cache.get(keys[1]) is None
+
+
+def test_coalescer_shares_one_in_flight_call():
+    coalescer = RequestCoalescer()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return RESULTS
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(coalescer.run("key", fetch)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert calls == [1]
+    assert results == [RESULTS] * 4
+
+
+def test_coalescer_propagates_errors_and_forgets_the_key():
+    coalescer = RequestCoalescer()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        coalescer.run("key", fail)
+    assert coalescer.run("key", lambda: RESULTS) == RESULTS
@@ -0,0 +1,23 @@
+"""Startup budget: the CLI and frontend must start without importing heavy backends."""
+from __future__ import annotations
+
+import statistics
+
+import pytest
+
+import check_startup_time as startup
+
+
+def test_tools_package_imports_lazily():
+    assert startup.heavy_modules_loaded(("tools",)) == []
+
+
+def test_frontend_imports_no_heavy_backends():
+    pytest.importorskip("dotenv")
+    assert startup.heavy_modules_loaded() == []
+
+
+def test_cli_help_within_budget():
+    pytest.importorskip("dotenv")
+    timings = startup.time_help(3)
+    assert statistics.median(timings) <= startup.DEFAULT_BUDGET_SECONDS
@@ -0,0 +1,40 @@
+"""Span export to JSONL (buffering, rotation) and the shared percentile helper."""
+from __future__ import annotations
+
+from tracing import RUN, TASK, JsonlExporter, Tracer, load_spans, percentile
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 50) == 0.0
+
+
+def test_spans_are_written_when_the_run_ends(tmp_path):
+    exporter = JsonlExporter(tmp_path / "traces.jsonl")
+    tracer = Tracer([exporter])
+    with tracer.span(RUN, "topic"):
+        with tracer.span(TASK, "notes"):
+            pass
+        assert not exporter.path.exists() or exporter.path.read_text() == ""
+    spans = load_spans([exporter.path])
+    assert [span["kind"] for span in spans] == [TASK, RUN]
+    assert spans[0]["parent_id"] == spans[1]["span_id"]
+    exporter.close()
+
+
+def test_file_rotates_past_max_bytes(tmp_path):
+    exporter = JsonlExporter(tmp_path / "traces.jsonl", max_bytes=600, backups=2)
+    tracer = Tracer([exporter])
+    for index in range(10):
+        with tracer.span(RUN, f"topic-{index}"):
+            pass
+    exporter.close()
+    files = sorted(path.name for path in tmp_path.iterdir())
+    assert "traces.jsonl.2" in files and "traces.jsonl.3" not in files
+    kept = load_spans(sorted(tmp_path.iterdir(), reverse=True))
+    assert 0 < len(kept) < 10
+    assert kept[-1]["name"] == "topic-9"
@@ -0,0 +1,74 @@
+"""Per-task max_tokens that adapts when completions keep hitting the cap."""
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Dict, Mapping
+
+from tasks import TASK_BUDGETS, TaskBudget
+
+logger = logging.getLogger(__name__)
+
+# A task whose average completion per LLM call reaches this share of its cap was
+# probably truncated, so its cap grows by GROWTH_FACTOR (up to the task's ceiling).
+TRUNCATION_RATIO = 0.9
+GROWTH_FACTOR = 1.5
+
+
+class AdaptiveTokenBudgets:
+    """Thread-safe current max_tokens per task, starting from the declared budgets."""
+
+    def __init__(self, budgets: Mapping[str, TaskBudget]) -> None:
+        self._budgets = dict(budgets)
+        self._current: Dict[str, int] = {
+            name: budget.max_tokens for name, budget in budgets.items()
+        }
+        self._lock = threading.Lock()
+
+    def max_tokens(self, task_name: str) -> int | None:
+        with self._lock:
+            return self._current.get(task_name)
+
+    def record(self, task_name: str, completion_tokens: int, requests: int) -> None:
+        """Raise a task's cap when its completions look truncated."""
+        if completion_tokens <= 0:
+            return
+        budget = self._budgets.get(task_name)
+        if budget is None:
+            return
+        per_call = completion_tokens / max(1, requests)
+        with self._lock:
+            current = self._current[task_name]
+            if per_call < TRUNCATION_RATIO * current or current >= budget.ceiling:
+                return
+            grown = min(budget.ceiling, int(current * GROWTH_FACTOR))
+            self._current[task_name] = grown
+        logger.info(
+            "Task '%s' averaged %.0f completion tokens per call against a cap of %d; "
+            "raising max_tokens to %d",
+            task_name,
+            per_call,
+            current,
+            grown,
+        )
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._current)
+
+
+_budgets = AdaptiveTokenBudgets(TASK_BUDGETS)
+
+
+def get_token_budgets() -> AdaptiveTokenBudgets:
+    """Return the process-wide budgets, so later runs benefit from earlier truncations."""
+    return _budgets
+
+
+def with_task_budget(task_name: str, overrides: Mapping[str, Any] | None) -> Dict[str, Any]:
+    """Return LLM overrides carrying the task's current max_tokens unless one is set explicitly."""
+    merged = dict(overrides or {})
+    max_tokens = _budgets.max_tokens(task_name)
+    if max_tokens is not None and "max_tokens" not in merged:
+        merged["max_tokens"] = max_tokens
+    return merged
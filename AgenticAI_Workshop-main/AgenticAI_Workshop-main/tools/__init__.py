@@ -1,34 +1,91 @@
-"""Educational tool factories for the Study Companion system."""
+"""Educational tool factories for the Study Companion system.
+
+The tool modules import CrewAI, LangChain, FAISS and DuckDuckGo, so they are loaded on
+first use: ``import tools`` stays cheap and the classes below resolve lazily.
+"""
 from __future__ import annotations
 
+import importlib
+import threading
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Any, Callable, Dict, List
 
-from crewai.tools import BaseTool
+if TYPE_CHECKING:  # pragma: no cover - typing helpers only
+    from crewai.tools import BaseTool
 
-from .calculator import EducationalCalculator
-from .rag_tool import EducationalKnowledgeRetriever
-from .web_search import create_web_search_tool
+    from .calculator import EducationalCalculator
+    from .rag_tool import EducationalKnowledgeRetriever
+    from .vectorstore_registry import get_vectorstore_registry
+    from .web_search import EducationalWebSearch
 
 __all__ = [
+    "EducationalCalculator",
+    "EducationalKnowledgeRetriever",
+    "EducationalWebSearch",
     "create_knowledge_retriever",
     "create_web_search_tool",
     "create_calculator_tool",
     "get_default_toolkit",
+    "get_shared_tool",
+    "get_shared_toolkit",
+    "get_vectorstore_registry",
 ]
 
+# Exports resolved by __getattr__ from the submodule that defines them.
+_LAZY_EXPORTS = {
+    "EducationalCalculator": ".calculator",
+    "EducationalKnowledgeRetriever": ".rag_tool",
+    "EducationalWebSearch": ".web_search",
+    "get_vectorstore_registry": ".vectorstore_registry",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
 DEFAULT_VECTORSTORE_DIR = Path(__file__).resolve().parents[1] / "rag" / "vectorstore"
 
 
-def create_knowledge_retriever(vectorstore_path: Path | None = None, *, top_k: int = 4) -> EducationalKnowledgeRetriever:
+def create_knowledge_retriever(
+    vectorstore_path: Path | None = None,
+    *,
+    top_k: int = 4,
+    nprobe: int | None = None,
+    ef_search: int | None = None,
+    retrieval_mode: str = "hybrid",
+    rerank: bool = False,
+) -> EducationalKnowledgeRetriever:
     """Instantiate the educational knowledge retrieval tool (RAG)."""
+    from .rag_tool import EducationalKnowledgeRetriever
+
     target_path = vectorstore_path or DEFAULT_VECTORSTORE_DIR
-    return EducationalKnowledgeRetriever(vectorstore_path=target_path, top_k=top_k)
+    return EducationalKnowledgeRetriever(
+        vectorstore_path=target_path,
+        top_k=top_k,
+        nprobe=nprobe,
+        ef_search=ef_search,
+        retrieval_mode=retrieval_mode,
+        rerank=rerank,
+    )
+
+
+def create_web_search_tool() -> EducationalWebSearch:
+    """Instantiate the educational web search tool (see tools/web_search.py)."""
+    from .web_search import create_web_search_tool as _create_web_search_tool
+
+    return _create_web_search_tool()
 
 
 def create_calculator_tool() -> EducationalCalculator:
     """Instantiate the educational calculator tool for mathematical problem-solving."""
+    from .calculator import EducationalCalculator
+
     return EducationalCalculator()
 
 
@@ -39,3 +96,28 @@ def get_default_toolkit() -> List[BaseTool]:
         create_web_search_tool(),
         create_calculator_tool(),
     ]
+
+
+# Default tools shared by every crew in the process (Streamlit requests, warm-up), so the
+# retriever's query cache and the web search sessions survive from one run to the next.
+SHARED_TOOL_FACTORIES: Dict[str, Callable[[], "BaseTool"]] = {
+    "knowledge": create_knowledge_retriever,
+    "web_search": create_web_search_tool,
+    "calculator": create_calculator_tool,
+}
+_shared_tools: Dict[str, "BaseTool"] = {}
+_shared_tools_lock = threading.Lock()
+
+
+def get_shared_tool(kind: str) -> "BaseTool":
+    """Return the process-wide instance of a default tool (a key of SHARED_TOOL_FACTORIES)."""
+    with _shared_tools_lock:
+        tool = _shared_tools.get(kind)
+        if tool is None:
+            tool = _shared_tools[kind] = SHARED_TOOL_FACTORIES[kind]()
+        return tool
+
+
+def get_shared_toolkit() -> List["BaseTool"]:
+    """Like get_default_toolkit, but the same instances on every call."""
+    return [get_shared_tool(kind) for kind in SHARED_TOOL_FACTORIES]
@@ -0,0 +1,135 @@
+"""Approximate nearest-neighbour FAISS indexes for the knowledge base and their search knobs."""
+from __future__ import annotations
+
+import math
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf", "hnsw", "ivfpq")
+
+# Vectors are fed to FAISS in slices of this size so memory-mapped inputs are never copied whole.
+_COPY_BATCH = 50_000
+# k-means wants roughly this many training points per centroid.
+_POINTS_PER_CENTROID = 39
+
+# Search defaults written into built indexes (FAISS itself defaults to nprobe=1, efSearch=16).
+DEFAULT_NPROBE = 16
+DEFAULT_EF_SEARCH = 64
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """Build-time description of a FAISS index.
+
+    ``nlist`` (IVF cells) and ``pq_m`` (PQ sub-quantizers) default to values derived from
+    the corpus size and vector dimension when left at 0.
+    """
+
+    type: str = "flat"
+    nlist: int = 0
+    hnsw_m: int = 32
+    ef_construction: int = 200
+    pq_m: int = 0
+    pq_bits: int = 8
+
+    def __post_init__(self) -> None:
+        if self.type not in INDEX_TYPES:
+            raise ValueError(
+                f"Unknown index type '{self.type}'. Expected one of: {', '.join(INDEX_TYPES)}"
+            )
+        if self.nlist < 0 or self.pq_m < 0:
+            raise ValueError("nlist and pq_m must be non-negative")
+        if self.hnsw_m < 2 or self.ef_construction < 1 or not 1 <= self.pq_bits <= 16:
+            raise ValueError("hnsw_m >= 2, ef_construction >= 1 and 1 <= pq_bits <= 16 are required")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def auto_nlist(count: int) -> int:
+    """Number of IVF cells for ``count`` vectors: ~4*sqrt(n), bounded by training data."""
+    return max(1, min(int(4 * math.sqrt(count)), count // _POINTS_PER_CENTROID))
+
+
+def auto_pq_m(dim: int) -> int:
+    """Largest divisor of ``dim`` giving sub-vectors of at least 8 dimensions."""
+    target = max(1, dim // 8)
+    return max(m for m in range(1, target + 1) if dim % m == 0)
+
+
+def factory_string(spec: IndexSpec, count: int, dim: int) -> str:
+    """Return the faiss.index_factory description for ``spec`` on a corpus of ``count`` vectors."""
+    if spec.type == "flat":
+        return "Flat"
+    if spec.type == "hnsw":
+        return f"HNSW{spec.hnsw_m},Flat"
+    nlist = spec.nlist or auto_nlist(count)
+    if spec.type == "ivf":
+        return f"IVF{nlist},Flat"
+    pq_m = spec.pq_m or auto_pq_m(dim)
+    if dim % pq_m:
+        raise ValueError(f"pq_m={pq_m} must divide the embedding dimension {dim}")
+    return f"IVF{nlist},PQ{pq_m}x{spec.pq_bits}"
+
+
+def iter_slices(vectors: np.ndarray, batch_size: int = _COPY_BATCH) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yield ``(offset, contiguous float32 slice)`` pairs covering ``vectors``."""
+    for start in range(0, len(vectors), batch_size):
+        yield start, np.ascontiguousarray(vectors[start : start + batch_size], dtype=np.float32)
+
+
+def _training_sample(vectors: np.ndarray, size: int) -> np.ndarray:
+    step = max(1, len(vectors) // size)
+    return np.ascontiguousarray(vectors[::step][:size], dtype=np.float32)
+
+
+def build_ann_index(
+    vectors: np.ndarray, spec: IndexSpec, *, max_training_points: int = 100_000
+) -> faiss.Index:
+    """Build the index described by ``spec`` over a (possibly memory-mapped) vector matrix.
+
+    Vectors are added in row order, so index positions match docstore positions.
+    """
+    count, dim = vectors.shape
+    description = factory_string(spec, count, dim)
+    index = faiss.index_factory(dim, description)
+    if spec.type == "hnsw":
+        index.hnsw.efConstruction = spec.ef_construction
+
+    if not index.is_trained:
+        nlist = faiss.extract_index_ivf(index).nlist
+        required = max(nlist, 2 ** spec.pq_bits if spec.type == "ivfpq" else 0)
+        if count < required:
+            raise ValueError(
+                f"A '{spec.type}' index ({description}) needs at least {required} vectors to "
+                f"train, but the corpus has {count}. Use a smaller nlist/pq_bits or a flat index."
+            )
+        index.train(_training_sample(vectors, max(required, max_training_points)))
+
+    for _start, batch in iter_slices(vectors):
+        index.add(batch)
+
+    # Default knobs are serialized with the index; retrievers can override them per query.
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(ivf.nlist, DEFAULT_NPROBE)
+    elif spec.type == "hnsw":
+        index.hnsw.efSearch = DEFAULT_EF_SEARCH
+    return index
+
+
+def search_parameters(
+    index: faiss.Index, *, nprobe: Optional[int] = None, ef_search: Optional[int] = None
+) -> Optional[faiss.SearchParameters]:
+    """Per-query search parameters for IVF (``nprobe``) or HNSW (``efSearch``) indexes.
+
+    Returns None when the index type has no matching knob or none was given.
+    """
+    if nprobe and faiss.try_extract_index_ivf(index) is not None:
+        return faiss.SearchParametersIVF(nprobe=nprobe)
+    if ef_search and isinstance(index, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(efSearch=ef_search)
+    return None
@@ -9,6 +9,8 @@ from typing import Any, Dict
 
 from crewai.tools import BaseTool
 
+from tracing import TOOL, span
+
 _ALLOWED_OPERATORS: Dict[type[ast.AST], Any] = {
     ast.Add: operator.add,
     ast.Sub: operator.sub,
@@ -41,6 +43,10 @@ class EducationalCalculator(BaseTool):
 
     def _run(self, query: str) -> str:
         """Evaluate a mathematical expression for educational purposes."""
+        with span(TOOL, self.name, query=query):
+            return self._calculate(query)
+
+    def _calculate(self, query: str) -> str:
         try:
             # Clean the query
             query = query.strip()
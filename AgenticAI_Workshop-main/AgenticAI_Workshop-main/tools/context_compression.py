@@ -0,0 +1,98 @@
+"""Fit ranked passages (knowledge-base chunks, web snippets) into a prompt token budget."""
+from __future__ import annotations
+
+import re
+from typing import List, Sequence, Tuple
+
+# Rough size of a token for English prose; good enough to budget prompts without a tokenizer.
+CHARS_PER_TOKEN = 4
+# Passages at least this contained in an already kept passage are dropped as duplicates.
+DUPLICATE_CONTAINMENT = 0.8
+# A passage is only truncated to fit when at least this many tokens of it would remain.
+MIN_TRUNCATED_TOKENS = 40
+# Shortest shared suffix/prefix treated as splitter overlap between neighbouring chunks.
+MIN_OVERLAP_CHARS = 20
+MAX_OVERLAP_CHARS = 400
+
+_DECORATION = re.compile(r"^[\s─━═\-=_*~#•·.]{3,}$")
+_SPACES = re.compile(r"[ \t]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_WORD = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def clean_passage(text: str) -> str:
+    """Drop separator lines and collapse runs of whitespace."""
+    lines = [_SPACES.sub(" ", line).strip() for line in text.splitlines()]
+    kept = "\n".join(line for line in lines if not _DECORATION.match(line))
+    return _BLANK_LINES.sub("\n\n", kept).strip()
+
+
+def strip_overlap(previous: str, text: str) -> str:
+    """Remove the start of ``text`` that repeats the end of ``previous`` (chunk overlap)."""
+    longest = min(len(previous), len(text), MAX_OVERLAP_CHARS)
+    for size in range(longest, MIN_OVERLAP_CHARS - 1, -1):
+        if text.startswith(previous[-size:]):
+            return text[size:].lstrip()
+    return text
+
+
+def truncate_to_tokens(text: str, tokens: int) -> str:
+    """Cut ``text`` to about ``tokens`` tokens, preferring a sentence or line boundary."""
+    limit = tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    boundary = max(cut.rfind(". "), cut.rfind("\n"))
+    if boundary >= limit // 2:
+        cut = cut[: boundary + 1]
+    return cut.rstrip() + " …"
+
+
+def _shingles(text: str, size: int = 5) -> set[Tuple[str, ...]]:
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def fit_passages(passages: Sequence[str], budget_tokens: int) -> List[Tuple[int, str]]:
+    """Clean, deduplicate and trim passages ranked best-first to fit ``budget_tokens``.
+
+    Returns ``(original index, text)`` pairs. Lower-ranked passages are truncated or
+    dropped first; a budget of 0 or less only cleans and deduplicates.
+    """
+    kept: List[Tuple[int, str]] = []
+    kept_shingles: List[set[Tuple[str, ...]]] = []
+    for index, raw in enumerate(passages):
+        text = clean_passage(raw)
+        for _, previous in kept:
+            text = strip_overlap(previous, text)
+        if not text:
+            continue
+        shingles = _shingles(text)
+        if shingles and any(
+            len(shingles & other) >= DUPLICATE_CONTAINMENT * len(shingles) for other in kept_shingles
+        ):
+            continue
+        kept.append((index, text))
+        kept_shingles.append(shingles)
+
+    if budget_tokens <= 0:
+        return kept
+
+    fitted: List[Tuple[int, str]] = []
+    remaining = budget_tokens
+    for index, text in kept:
+        cost = estimate_tokens(text)
+        if cost <= remaining:
+            fitted.append((index, text))
+            remaining -= cost
+            continue
+        if remaining >= MIN_TRUNCATED_TOKENS:
+            fitted.append((index, truncate_to_tokens(text, remaining)))
+        break
+    return fitted
@@ -0,0 +1,18 @@
+"""Rank fusion helpers for combining keyword (BM25) and vector retrieval results."""
+from __future__ import annotations
+
+from typing import Dict, Hashable, List, Sequence, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+# Constant from Cormack et al.; dampens the advantage of the very top ranks.
+DEFAULT_RRF_K = 60
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[T]], *, k: int = DEFAULT_RRF_K) -> List[T]:
+    """Merge ranked lists by summing ``1 / (k + rank)`` per item; ties keep first-seen order."""
+    scores: Dict[T, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda item: scores[item], reverse=True)
@@ -0,0 +1,291 @@
+"""Memory-mapped vector store: raw float32 vectors, an optional FAISS ANN index and a SQLite docstore.
+
+Nothing is unpickled and nothing proportional to the corpus is read at open time: vectors
+are mapped from ``vectors.f32`` (so every process on a host shares the page cache), an
+ANN ``index.faiss`` is read with FAISS' mmap flag, and chunk texts are fetched from
+``docstore.sqlite`` only for the positions a search returns. The docstore also carries an
+FTS5 full-text index used for BM25 keyword search.
+
+Builds write each store into ``versions/<name>/`` and then atomically replace the one-line
+``CURRENT`` pointer, so a reader resolving the pointer always sees one complete set of
+files. Stores from older builds keep their files directly in the store directory.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import re
+import shutil
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from .ann_index import search_parameters
+
+VECTORS_FILE = "vectors.f32"
+DOCSTORE_FILE = "docstore.sqlite"
+ANN_INDEX_FILE = "index.faiss"
+STORE_FILES = (VECTORS_FILE, DOCSTORE_FILE, ANN_INDEX_FILE)
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+
+_SCHEMA = """
+CREATE TABLE chunks (
+    position INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    text TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+# External-content FTS5 table over chunks.text; '_' is kept inside tokens so code
+# identifiers such as ``binary_search`` stay searchable as one term.
+_SPARSE_SCHEMA = """
+CREATE VIRTUAL TABLE chunks_fts USING fts5(
+    text, content='chunks', content_rowid='position', tokenize="unicode61 tokenchars '_'"
+)
+"""
+_TERM_PATTERN = re.compile(r"\w+")
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement.
+_LOOKUP_BATCH = 500
+
+# (chunk id, text, metadata) as stored in the docstore.
+ChunkRecord = Tuple[str, str, Dict[str, Any]]
+
+
+def _read_meta(docstore_path: Path) -> Dict[str, str]:
+    conn = sqlite3.connect(f"file:{docstore_path}?mode=ro", uri=True)
+    try:
+        return dict(conn.execute("SELECT key, value FROM meta"))
+    finally:
+        conn.close()
+
+
+def resolve_store_dir(directory: Path) -> Path:
+    """Return the directory holding the live store files: the version CURRENT points to."""
+    directory = Path(directory)
+    try:
+        version = (directory / CURRENT_FILE).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return directory
+    return directory / VERSIONS_DIR / version
+
+
+def open_vectors(directory: Path) -> np.ndarray:
+    """Map the raw vector matrix of a store read-only, without loading it into memory."""
+    directory = resolve_store_dir(directory)
+    meta = _read_meta(directory / DOCSTORE_FILE)
+    count, dim = int(meta["count"]), int(meta["dim"])
+    if count == 0:
+        return np.zeros((0, dim), dtype=np.float32)
+    return np.memmap(directory / VECTORS_FILE, dtype=np.float32, mode="r", shape=(count, dim))
+
+
+class VectorStoreWriter:
+    """Write a complete store into an (empty) directory, batch by batch."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        if self.directory.exists():
+            shutil.rmtree(self.directory)
+        self.directory.mkdir(parents=True)
+        self.count = 0
+        self.dim: Optional[int] = None
+        self._vectors = open(self.directory / VECTORS_FILE, "wb")
+        self._conn = sqlite3.connect(str(self.directory / DOCSTORE_FILE))
+        self._conn.executescript(_SCHEMA)
+
+    def add(self, vectors: Any, records: Sequence[ChunkRecord]) -> None:
+        """Append one batch of vectors and their (id, text, metadata) records."""
+        if not records:
+            return
+        array = np.ascontiguousarray(vectors, dtype=np.float32)
+        if array.ndim != 2 or array.shape[0] != len(records):
+            raise ValueError(f"Expected {len(records)} vectors, got an array of shape {array.shape}")
+        if self.dim is None:
+            self.dim = int(array.shape[1])
+        elif array.shape[1] != self.dim:
+            raise ValueError(f"Vector dimension changed from {self.dim} to {array.shape[1]}")
+
+        self._vectors.write(array.tobytes())
+        self._conn.executemany(
+            "INSERT INTO chunks (position, id, text, metadata) VALUES (?, ?, ?, ?)",
+            [
+                (self.count + offset, chunk_id, text, json.dumps(metadata, ensure_ascii=False))
+                for offset, (chunk_id, text, metadata) in enumerate(records)
+            ],
+        )
+        self.count += len(records)
+
+    def _build_sparse_index(self) -> str:
+        try:
+            self._conn.execute(_SPARSE_SCHEMA)
+        except sqlite3.OperationalError:
+            logger.warning("SQLite was built without FTS5; keyword search will be unavailable")
+            return "none"
+        self._conn.execute("INSERT INTO chunks_fts(chunks_fts) VALUES ('rebuild')")
+        return "fts5"
+
+    def close(self, meta: Optional[Dict[str, Any]] = None) -> None:
+        """Flush everything, build the keyword index and record the matrix shape plus ``meta``."""
+        self._vectors.close()
+        entries = {
+            **(meta or {}),
+            "count": self.count,
+            "dim": self.dim or 0,
+            "sparse_index": self._build_sparse_index(),
+        }
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [(key, str(value)) for key, value in entries.items()],
+        )
+        self._conn.commit()
+        self._conn.close()
+
+    def abort(self) -> None:
+        self._vectors.close()
+        self._conn.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class MappedVectorStore:
+    """Read-only, thread-safe view of a store written by :class:`VectorStoreWriter`."""
+
+    def __init__(self, directory: Path, embeddings: Optional[Embeddings] = None) -> None:
+        # Resolved once, so a rebuild swapping CURRENT never mixes files of two versions.
+        self.directory = resolve_store_dir(directory)
+        self._docstore_path = self.directory / DOCSTORE_FILE
+        if not self._docstore_path.exists():
+            raise FileNotFoundError(
+                f"No docstore at {self._docstore_path}. Run 'python rag/build_vector_db.py --full-rebuild'."
+            )
+        self.embeddings = embeddings
+        # Changes whenever the store is rebuilt; lets callers scope caches to one build.
+        self.version = self._docstore_path.stat().st_mtime_ns
+        self.meta = _read_meta(self._docstore_path)
+        self.vectors = open_vectors(self.directory)
+        self.count, self.dim = self.vectors.shape
+        ann_path = self.directory / ANN_INDEX_FILE
+        self.index: Optional[faiss.Index] = None
+        if ann_path.exists():
+            # IVF inverted lists are mapped rather than read; other index types ignore the flag.
+            self.index = faiss.read_index(str(ann_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        self._local = threading.local()
+        # Every thread's connection, so close() can release them all.
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self._docstore_path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def search_vectors(
+        self,
+        queries: Any,
+        k: int,
+        *,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Batched k-NN search returning (distances, positions); missing results are -1."""
+        matrix = np.ascontiguousarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        k = min(k, self.count)
+        if k == 0:
+            empty = np.empty((len(matrix), 0))
+            return empty.astype(np.float32), empty.astype(np.int64)
+        if self.index is None:
+            return faiss.knn(matrix, self.vectors, k)
+        params = search_parameters(self.index, nprobe=nprobe, ef_search=ef_search)
+        return self.index.search(matrix, k, params=params)
+
+    @property
+    def has_sparse_index(self) -> bool:
+        return self.meta.get("sparse_index") == "fts5"
+
+    def keyword_search(self, query: str, k: int) -> List[int]:
+        """BM25-ranked positions of chunks matching any term of ``query`` (best first)."""
+        terms = _TERM_PATTERN.findall(query.lower())
+        if not terms or not self.has_sparse_index:
+            return []
+        # Quote every term so user text can never be parsed as FTS5 query syntax.
+        match = " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+        rows = self._connection().execute(
+            "SELECT rowid FROM chunks_fts WHERE chunks_fts MATCH ? ORDER BY bm25(chunks_fts) LIMIT ?",
+            (match, k),
+        )
+        return [position for (position,) in rows]
+
+    def documents(self, positions: Sequence[int]) -> List[Document]:
+        """Fetch documents for index positions, in the given order, skipping -1 entries."""
+        wanted = [int(position) for position in positions if position >= 0]
+        rows = self.documents_by_position(wanted)
+        return [rows[position] for position in wanted if position in rows]
+
+    def documents_by_position(self, positions: Iterable[int]) -> Dict[int, Document]:
+        """Fetch the documents stored at ``positions`` in as few queries as possible."""
+        wanted = sorted({int(position) for position in positions if position >= 0})
+        rows: Dict[int, Document] = {}
+        conn = self._connection()
+        for start in range(0, len(wanted), _LOOKUP_BATCH):
+            batch = wanted[start : start + _LOOKUP_BATCH]
+            placeholders = ",".join("?" for _ in batch)
+            for position, text, metadata in conn.execute(
+                f"SELECT position, text, metadata FROM chunks WHERE position IN ({placeholders})",
+                batch,
+            ):
+                rows[position] = Document(page_content=text, metadata=json.loads(metadata))
+        return rows
+
+    def iter_records(self, batch_size: int = 1000) -> Iterator[Tuple[np.ndarray, List[ChunkRecord]]]:
+        """Yield (vectors, records) slices in position order; used to copy retained chunks."""
+        conn = self._connection()
+        for start in range(0, self.count, batch_size):
+            rows = conn.execute(
+                "SELECT id, text, metadata FROM chunks WHERE position >= ? AND position < ? ORDER BY position",
+                (start, start + batch_size),
+            ).fetchall()
+            records = [(chunk_id, text, json.loads(metadata)) for chunk_id, text, metadata in rows]
+            yield np.asarray(self.vectors[start : start + len(records)]), records
+
+    def similarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        *,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[Document]:
+        if self.embeddings is None:
+            raise RuntimeError("This store was opened without an embedding model")
+        vector = self.embeddings.embed_query(query)
+        _, positions = self.search_vectors([vector], k, nprobe=nprobe, ef_search=ef_search)
+        return self.documents(positions[0])
+
+    def close(self) -> None:
+        """Release the mapping and every thread's connection so the files can be replaced.
+
+        A closed store behaves as an empty one.
+        """
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+        self.count = 0
+        self.vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self.index = None
@@ -0,0 +1,157 @@
+"""In-process cache of knowledge-base search results with exact and semantic (near-duplicate) hits."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def normalize_query(query: str) -> str:
+    """Collapse case and whitespace so trivially different phrasings share an entry."""
+    return " ".join(query.lower().split())
+
+
+@dataclass
+class QueryCacheStats:
+    """Hit/miss counters for one :class:`QueryCache`."""
+
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {**asdict(self), "hit_rate": self.hit_rate}
+
+
+@dataclass
+class _Entry:
+    value: Any
+    scope: Hashable
+    vector: Optional[np.ndarray]
+    created_at: float
+
+
+class QueryCache:
+    """Thread-safe LRU keyed by (normalized query, scope) with TTL expiry.
+
+    ``scope`` captures everything besides the query text that affects results (store
+    version, top_k, search settings); semantic hits are only served within the same scope.
+    When ``semantic_threshold`` is set, a lookup whose query embedding has at least that
+    cosine similarity to a cached query's embedding returns the cached value.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 900.0,
+        semantic_threshold: Optional[float] = None,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.semantic_threshold = semantic_threshold
+        self._entries: "OrderedDict[Tuple[str, Hashable], _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = QueryCacheStats()
+
+    def get(self, query: str, scope: Hashable) -> Optional[Any]:
+        """Return the value cached for exactly this normalized query, counting only hits."""
+        key = (normalize_query(query), scope)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._expired(entry):
+                del self._entries[key]
+                self._stats.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.exact_hits += 1
+            return entry.value
+
+    def get_similar(
+        self, vector: Sequence[float], scope: Hashable, *, alias: Optional[str] = None
+    ) -> Optional[Any]:
+        """Return the value of the most similar cached query above the threshold, if any.
+
+        With ``alias``, a hit is also cached under that query so its next lookup is exact;
+        the alias keeps the matched entry's ``created_at`` and so expires with it.
+        """
+        if self.semantic_threshold is None:
+            return None
+        probe = _unit(vector)
+        with self._lock:
+            best_key, best_score = None, self.semantic_threshold
+            for key, entry in list(self._entries.items()):
+                if entry.scope != scope or entry.vector is None:
+                    continue
+                if self._expired(entry):
+                    del self._entries[key]
+                    self._stats.evictions += 1
+                    continue
+                score = float(np.dot(probe, entry.vector))
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            self._stats.semantic_hits += 1
+            match = self._entries[best_key]
+            if alias is not None:
+                self._store(
+                    (normalize_query(alias), scope),
+                    _Entry(match.value, scope, probe, match.created_at),
+                )
+            return match.value
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self._stats.misses += 1
+
+    def put(
+        self, query: str, scope: Hashable, value: Any, vector: Optional[Sequence[float]] = None
+    ) -> None:
+        key = (normalize_query(query), scope)
+        entry = _Entry(
+            value=value,
+            scope=scope,
+            vector=_unit(vector) if vector is not None else None,
+            created_at=time.monotonic(),
+        )
+        with self._lock:
+            self._store(key, entry)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {**self._stats.as_dict(), "entries": len(self._entries)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats = QueryCacheStats()
+
+    def _store(self, key: Tuple[str, Hashable], entry: _Entry) -> None:
+        # Callers hold self._lock.
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats.evictions += 1
+
+    def _expired(self, entry: _Entry) -> bool:
+        return time.monotonic() - entry.created_at > self.ttl_seconds
+
+
+def _unit(vector: Sequence[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm else array
@@ -2,17 +2,26 @@
 from __future__ import annotations
 
 import logging
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Hashable, List, Optional, Sequence
 
 from langchain_core.documents import Document
 from crewai.tools import BaseTool
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from pydantic import Field, PrivateAttr
 
+from tracing import TOOL, current_span, span
+
+from .context_compression import fit_passages
+from .hybrid_search import DEFAULT_RRF_K, reciprocal_rank_fusion
+from .mapped_vectorstore import MappedVectorStore
+from .query_cache import QueryCache
+from .vectorstore_registry import get_vectorstore_registry
+
 DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 DEFAULT_VECTORSTORE_DIR = Path(__file__).resolve().parents[1] / "rag" / "vectorstore"
+DEFAULT_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+RETRIEVAL_MODES = ("dense", "hybrid")
 
 
 class EducationalKnowledgeRetriever(BaseTool):
@@ -27,18 +36,41 @@ class EducationalKnowledgeRetriever(BaseTool):
     vectorstore_path: Path = Field(default_factory=lambda: DEFAULT_VECTORSTORE_DIR)
     top_k: int = 4
     embedding_model: str = DEFAULT_EMBEDDING_MODEL
+    # ANN search knobs; ignored unless the index was built as IVF/IVF-PQ (nprobe) or HNSW (ef_search).
+    nprobe: Optional[int] = None
+    ef_search: Optional[int] = None
+    # "hybrid" fuses BM25 keyword hits with vector hits (reciprocal-rank fusion); "dense" is vectors only.
+    retrieval_mode: str = "hybrid"
+    candidate_k: int = 20
+    rrf_k: int = DEFAULT_RRF_K
+    rerank: bool = False
+    rerank_model: str = DEFAULT_RERANK_MODEL
+    # Result cache shared by every agent using this tool instance; 0 entries disables it.
+    cache_size: int = 256
+    cache_ttl_seconds: float = 900.0
+    # Queries whose embeddings are at least this cosine-similar reuse cached passages (None: exact only).
+    semantic_cache_threshold: Optional[float] = 0.95
+    # Passages handed to the agent are deduplicated and trimmed to this many tokens (0: no limit).
+    context_token_budget: int = 1200
 
-    _vectorstore: Optional[FAISS] = PrivateAttr(default=None)
     _logger = logging.getLogger(__name__)
+    _cache: Optional[QueryCache] = PrivateAttr(default=None)
 
     def __init__(self, **data) -> None:
         super().__init__(**data)
         self.vectorstore_path = Path(self.vectorstore_path)
+        if self.retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(
+                f"Unknown retrieval mode '{self.retrieval_mode}'. Expected one of: {', '.join(RETRIEVAL_MODES)}"
+            )
+        if self.cache_size > 0:
+            self._cache = QueryCache(
+                max_entries=self.cache_size,
+                ttl_seconds=self.cache_ttl_seconds,
+                semantic_threshold=self.semantic_cache_threshold,
+            )
 
-    def _load_vectorstore(self) -> FAISS:
-        if self._vectorstore is not None:
-            return self._vectorstore
-
+    def _load_vectorstore(self) -> MappedVectorStore:
         if not self.vectorstore_path.exists():
             self._logger.error(
                 "Vector store missing at %s. Did you run rag/build_vector_db.py?",
@@ -48,23 +80,17 @@ class EducationalKnowledgeRetriever(BaseTool):
                 f"Vector store not found at {self.vectorstore_path}. Run 'python rag/build_vector_db.py' first."
             )
 
-        embeddings = HuggingFaceEmbeddings(model_name=self.embedding_model)
-        self._vectorstore = FAISS.load_local(
-            folder_path=str(self.vectorstore_path),
-            embeddings=embeddings,
-            allow_dangerous_deserialization=True,
+        # The registry shares one model/index per process and reloads when the files change.
+        return get_vectorstore_registry().get_vectorstore(
+            self.vectorstore_path, self.embedding_model
         )
-        self._logger.info(
-            "Loaded FAISS vector store from %s using embedding model %s",
-            self.vectorstore_path,
-            self.embedding_model,
-        )
-        return self._vectorstore
 
     def _run(self, query: str) -> str:
         """Retrieve educational content from the knowledge base."""
-        store = self._load_vectorstore()
-        docs = store.similarity_search(query, k=self.top_k)
+        with span(TOOL, self.name, query=query) as tool_span:
+            store = self._load_vectorstore()
+            docs = self._cached_retrieve(store, query)
+            tool_span.set(passages=len(docs))
         if not docs:
             return (
                 "No relevant information found in the educational knowledge base for this query. "
@@ -78,14 +104,179 @@ class EducationalKnowledgeRetriever(BaseTool):
         )
         return formatted
 
+    def cache_stats(self) -> Dict[str, float]:
+        """Exact/semantic hit counts and hit rate of the query cache (empty when disabled)."""
+        return self._cache.stats() if self._cache is not None else {}
+
+    def _cache_scope(self, store: MappedVectorStore) -> Hashable:
+        return (
+            str(store.directory),
+            store.version,
+            self.top_k,
+            self.retrieval_mode,
+            self.candidate_k,
+            self.rerank,
+            self.rerank_model,
+            self.nprobe,
+            self.ef_search,
+        )
+
+    def search_many(self, queries: Sequence[str]) -> List[List[Document]]:
+        """Retrieve passages for several queries with one embedding pass and one batched index search.
+
+        Results follow the order of ``queries``; each list is deduplicated and at most
+        ``top_k`` long. Cached queries are served without searching again.
+        """
+        if not queries:
+            return []
+        store = self._load_vectorstore()
+        return self._cached_retrieve_many(store, list(queries))
+
+    def _cached_retrieve(self, store: MappedVectorStore, query: str) -> list[Document]:
+        return self._cached_retrieve_many(store, [query])[0]
+
+    def _cached_retrieve_many(self, store: MappedVectorStore, queries: List[str]) -> List[List[Document]]:
+        """Serve repeated or near-duplicate queries from the cache, search the rest in one batch."""
+        if self._cache is None:
+            return self._retrieve_many(store, queries)
+
+        scope = self._cache_scope(store)
+        results: List[Optional[List[Document]]] = [None] * len(queries)
+        pending: List[int] = []
+        for index, query in enumerate(queries):
+            results[index] = self._cache.get(query, scope)
+            if results[index] is not None:
+                self._logger.info("Knowledge cache hit for '%s'", query)
+            else:
+                pending.append(index)
+
+        vectors: Dict[int, Sequence[float]] = {}
+        if pending and self._cache.semantic_threshold is not None:
+            embedded = self._embed(store, [queries[index] for index in pending])
+            unresolved = []
+            for index, vector in zip(pending, embedded):
+                vectors[index] = vector
+                docs = self._cache.get_similar(vector, scope, alias=queries[index])
+                if docs is None:
+                    unresolved.append(index)
+                    continue
+                self._logger.info("Knowledge cache near-duplicate hit for '%s'", queries[index])
+                results[index] = docs
+            pending = unresolved
+
+        active = current_span()
+        if active is not None:
+            active.incr("cache_hits", len(queries) - len(pending))
+            active.incr("cache_misses", len(pending))
+
+        if pending:
+            for _ in pending:
+                self._cache.record_miss()
+            found = self._retrieve_many(
+                store,
+                [queries[index] for index in pending],
+                vectors=[vectors[index] for index in pending] if vectors else None,
+            )
+            for index, docs in zip(pending, found):
+                self._cache.put(queries[index], scope, docs, vectors.get(index))
+                results[index] = docs
+        return [docs or [] for docs in results]
+
     @staticmethod
-    def _format_docs(docs: list[Document]) -> str:
-        """Format retrieved documents for educational context."""
+    def _embed(store: MappedVectorStore, queries: Sequence[str]) -> List[List[float]]:
+        if len(queries) == 1:
+            return [store.embeddings.embed_query(queries[0])]
+        # One forward pass for the whole batch; our sentence-transformers models embed
+        # queries and documents identically.
+        return store.embeddings.embed_documents(list(queries))
+
+    def _retrieve_many(
+        self,
+        store: MappedVectorStore,
+        queries: List[str],
+        *,
+        vectors: Optional[Sequence[Sequence[float]]] = None,
+    ) -> List[List[Document]]:
+        """Dense (+ BM25) candidate search, rank fusion and optional rerank, timing every stage."""
+        timings: Dict[str, float] = {}
+        stage_started = time.perf_counter()
+
+        def _lap(stage: str) -> None:
+            nonlocal stage_started
+            now = time.perf_counter()
+            timings[stage] = (now - stage_started) * 1000
+            stage_started = now
+
+        widen = self.retrieval_mode == "hybrid" or self.rerank
+        candidate_k = max(self.top_k, self.candidate_k) if widen else self.top_k
+
+        if vectors is None:
+            vectors = self._embed(store, queries)
+        _lap("embed")
+        # nprobe/efSearch are passed per query instead of mutating the shared index.
+        _, found = store.search_vectors(
+            vectors, candidate_k, nprobe=self.nprobe, ef_search=self.ef_search
+        )
+        rankings = [[int(position) for position in row if position >= 0] for row in found]
+        _lap("dense")
+
+        if self.retrieval_mode == "hybrid" and store.has_sparse_index:
+            sparse = [store.keyword_search(query, candidate_k) for query in queries]
+            _lap("sparse")
+            rankings = [
+                reciprocal_rank_fusion([dense, keyword], k=self.rrf_k)
+                for dense, keyword in zip(rankings, sparse)
+            ]
+            _lap("fuse")
+
+        fetch_k = candidate_k if self.rerank else self.top_k
+        by_position = store.documents_by_position(
+            {position for ranking in rankings for position in ranking[:fetch_k]}
+        )
+        results = [
+            self._dedupe([by_position[p] for p in ranking[:fetch_k] if p in by_position])
+            for ranking in rankings
+        ]
+        _lap("fetch")
+
+        if self.rerank:
+            results = [self._rerank(query, docs) for query, docs in zip(queries, results)]
+            _lap("rerank")
+
+        self._logger.info(
+            "Retrieval stages for %s: %s",
+            f"'{queries[0]}'" if len(queries) == 1 else f"{len(queries)} queries",
+            " ".join(f"{stage}={ms:.1f}ms" for stage, ms in timings.items()),
+        )
+        return [docs[: self.top_k] for docs in results]
+
+    @staticmethod
+    def _dedupe(docs: list[Document]) -> list[Document]:
+        """Drop repeated passages (same chunk text), keeping the best-ranked occurrence."""
+        seen: set[str] = set()
+        unique = []
+        for doc in docs:
+            key = doc.metadata.get("chunk_hash") or doc.page_content
+            if key not in seen:
+                seen.add(key)
+                unique.append(doc)
+        return unique
+
+    def _rerank(self, query: str, docs: list[Document]) -> list[Document]:
+        """Order candidates by CPU cross-encoder relevance to ``query``."""
+        if len(docs) < 2:
+            return docs
+        encoder = get_vectorstore_registry().get_cross_encoder(self.rerank_model)
+        scores = encoder.predict([(query, doc.page_content) for doc in docs])
+        ranked = sorted(zip(scores, range(len(docs))), key=lambda pair: pair[0], reverse=True)
+        return [docs[index] for _score, index in ranked]
+
+    def _format_docs(self, docs: list[Document]) -> str:
+        """Format retrieved documents compactly, best first, within the context token budget."""
+        passages = fit_passages([doc.page_content for doc in docs], self.context_token_budget)
         formatted = []
-        for idx, doc in enumerate(docs, start=1):
-            content = doc.page_content.strip()
-            formatted.append(
-                f"📚 Educational Resource {idx}:\n{content}\n"
-                f"{'─' * 60}"
-            )
+        for number, (index, content) in enumerate(passages, start=1):
+            source = docs[index].metadata.get("source")
+            header = f"[{number}] {source}" if source else f"[{number}]"
+            formatted.append(f"{header}\n{content}")
         return "\n\n".join(formatted)
@@ -0,0 +1,153 @@
+"""SQLite-backed TTL cache and in-flight request coalescing for web search results."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    backend TEXT NOT NULL,
+    query TEXT NOT NULL,
+    max_results INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at);
+CREATE INDEX IF NOT EXISTS results_created_at ON results (created_at);
+"""
+
+
+def normalize_search_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def search_key(backend: str, query: str, max_results: int) -> str:
+    """Cache key for one (backend, normalized query, max_results) search."""
+    payload = json.dumps([backend, normalize_search_query(query), max_results])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """Web search results on disk, bounded by entry age and entry count (least recently used first)."""
+
+    def __init__(self, path: Path, *, ttl_seconds: float, max_entries: int) -> None:
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def get(self, key: str, *, ignore_ttl: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """Return cached results for ``key`` unless missing or older than the TTL.
+
+        With ``ignore_ttl`` (offline replays) expired entries are served and kept.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            payload, created_at = row
+            if not ignore_ttl and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(payload)
+
+    def put(
+        self, key: str, backend: str, query: str, max_results: int, results: List[Dict[str, Any]]
+    ) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results "
+                "(key, backend, query, max_results, payload, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, backend, query, max_results, json.dumps(results, ensure_ascii=False), now, now),
+            )
+            self._evict_locked(now)
+            self._conn.commit()
+
+    def _evict_locked(self, now: float) -> None:
+        expired = self._conn.execute(
+            "DELETE FROM results WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        overflow = self._conn.execute(
+            "DELETE FROM results WHERE key IN ("
+            "SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        ).rowcount
+        if expired or overflow:
+            logger.info("Web search cache evicted %d expired and %d excess entries", expired, overflow)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+
+
+class RequestCoalescer:
+    """Let concurrent callers asking for the same key share a single in-flight call."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future[Any]] = {}
+
+    def run(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+        assert future is not None
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+
+_CACHES: Dict[str, SearchCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_search_cache(path: Path, *, ttl_seconds: float, max_entries: int) -> SearchCache:
+    """Return the process-wide cache for ``path`` so every tool instance shares one connection."""
+    resolved = str(Path(path).resolve())
+    with _CACHES_LOCK:
+        cache = _CACHES.get(resolved)
+        if cache is None:
+            cache = SearchCache(Path(resolved), ttl_seconds=ttl_seconds, max_entries=max_entries)
+            _CACHES[resolved] = cache
+        return cache
@@ -0,0 +1,184 @@
+"""Process-wide registry sharing embedding models and memory-mapped vector stores across retrievers."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Tuple
+
+from .mapped_vectorstore import STORE_FILES, MappedVectorStore, resolve_store_dir
+
+if TYPE_CHECKING:  # pragma: no cover - typing helpers only
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+logger = logging.getLogger(__name__)
+
+StoreKey = Tuple[str, str, Tuple[Any, ...]]
+
+
+@dataclass
+class RegistryStats:
+    """Counters describing how effectively loaded models and indexes are reused."""
+
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    embedding_loads: int = 0
+    cross_encoder_loads: int = 0
+    index_loads: int = 0
+    load_seconds: float = 0.0
+
+
+def _index_signature(store_dir: Path) -> Tuple[Any, ...]:
+    """Return the live version directory and its files' modification times.
+
+    Either changes when the store is rebuilt, so the registry reopens it.
+    """
+    signature: list[Any] = [str(store_dir)]
+    for filename in STORE_FILES:
+        target = store_dir / filename
+        signature.append(target.stat().st_mtime_ns if target.exists() else 0)
+    return tuple(signature)
+
+
+def store_version(vectorstore_path: Path) -> Tuple[Any, ...]:
+    """Identify the live build of the store at ``vectorstore_path`` without opening it."""
+    return _index_signature(resolve_store_dir(Path(vectorstore_path).resolve()))
+
+
+class VectorStoreRegistry:
+    """Thread-safe cache of embedding models and vector stores shared by every retriever."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._load_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._embeddings: Dict[str, HuggingFaceEmbeddings] = {}
+        self._cross_encoders: Dict[str, Any] = {}
+        self._stores: Dict[StoreKey, MappedVectorStore] = {}
+        self._stats = RegistryStats()
+
+    def get_embeddings(self, model_name: str) -> HuggingFaceEmbeddings:
+        """Return the shared embedding model, loading it on first use."""
+        with self._lock:
+            embeddings = self._embeddings.get(model_name)
+            if embeddings is not None:
+                return embeddings
+
+        with self._load_lock(("embeddings", model_name)):
+            with self._lock:
+                embeddings = self._embeddings.get(model_name)
+            if embeddings is not None:
+                return embeddings
+
+            # langchain_community and sentence-transformers take seconds to import.
+            from langchain_community.embeddings import HuggingFaceEmbeddings
+
+            started = time.perf_counter()
+            embeddings = HuggingFaceEmbeddings(model_name=model_name)
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._embeddings[model_name] = embeddings
+                self._stats.embedding_loads += 1
+                self._stats.load_seconds += elapsed
+            logger.info("Loaded embedding model %s in %.2fs", model_name, elapsed)
+            return embeddings
+
+    def get_cross_encoder(self, model_name: str) -> Any:
+        """Return the shared sentence-transformers CrossEncoder used for reranking."""
+        with self._lock:
+            encoder = self._cross_encoders.get(model_name)
+            if encoder is not None:
+                return encoder
+
+        with self._load_lock(("cross_encoder", model_name)):
+            with self._lock:
+                encoder = self._cross_encoders.get(model_name)
+            if encoder is not None:
+                return encoder
+
+            from sentence_transformers import CrossEncoder
+
+            started = time.perf_counter()
+            encoder = CrossEncoder(model_name, device="cpu")
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._cross_encoders[model_name] = encoder
+                self._stats.cross_encoder_loads += 1
+                self._stats.load_seconds += elapsed
+            logger.info("Loaded cross-encoder %s in %.2fs", model_name, elapsed)
+            return encoder
+
+    def get_vectorstore(self, vectorstore_path: Path, embedding_model: str) -> MappedVectorStore:
+        """Return the shared store for a path, reopening it if the files changed on disk."""
+        path_key = str(Path(vectorstore_path).resolve())
+        store_dir = resolve_store_dir(Path(path_key))
+        key: StoreKey = (path_key, embedding_model, _index_signature(store_dir))
+
+        with self._lock:
+            store = self._stores.get(key)
+            if store is not None:
+                self._stats.hits += 1
+                return store
+
+        with self._load_lock((path_key, embedding_model)):
+            with self._lock:
+                store = self._stores.get(key)
+                if store is not None:
+                    self._stats.hits += 1
+                    return store
+                self._stats.misses += 1
+
+            embeddings = self.get_embeddings(embedding_model)
+            started = time.perf_counter()
+            store = MappedVectorStore(store_dir, embeddings)
+            elapsed = time.perf_counter() - started
+
+            with self._lock:
+                stale = [
+                    existing
+                    for existing in self._stores
+                    if existing[:2] == key[:2] and existing != key
+                ]
+                stale_stores = [self._stores.pop(existing) for existing in stale]
+                self._stats.invalidations += len(stale)
+                self._stores[key] = store
+                self._stats.index_loads += 1
+                self._stats.load_seconds += elapsed
+
+            logger.info(
+                "Opened memory-mapped vector store at %s in %.2fs (invalidated %d stale entries)",
+                path_key,
+                elapsed,
+                len(stale),
+            )
+            # Retrievers fetch the store per query, so no new search reaches a stale one.
+            for stale_store in stale_stores:
+                stale_store.close()
+            return store
+
+    def stats(self) -> Dict[str, float]:
+        """Return a snapshot of the hit/miss/load-time counters."""
+        with self._lock:
+            return asdict(self._stats)
+
+    def clear(self) -> None:
+        """Drop every cached model and index (mainly useful for tests and reloads)."""
+        with self._lock:
+            self._embeddings.clear()
+            self._cross_encoders.clear()
+            self._stores.clear()
+            self._stats = RegistryStats()
+
+    def _load_lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(key, threading.Lock())
+
+
+_REGISTRY = VectorStoreRegistry()
+
+
+def get_vectorstore_registry() -> VectorStoreRegistry:
+    """Return the process-wide vector store registry."""
+    return _REGISTRY
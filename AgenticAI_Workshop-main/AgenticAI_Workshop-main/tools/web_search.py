@@ -1,13 +1,165 @@
 """Educational web search tool powered by DuckDuckGo for study material research."""
 from __future__ import annotations
 
+import atexit
+import contextvars
 import logging
-from typing import Any
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from crewai.tools import BaseTool
-from duckduckgo_search import DDGS
 from pydantic import Field
 
+from config.settings import (
+    WEB_SEARCH_BACKENDS,
+    WEB_SEARCH_CACHE_MAX_ENTRIES,
+    WEB_SEARCH_CACHE_PATH,
+    WEB_SEARCH_CACHE_TTL_SECONDS,
+    WEB_SEARCH_DEADLINE_SECONDS,
+    WEB_SEARCH_OFFLINE,
+    WEB_SEARCH_QUERY_VARIANTS,
+)
+from tracing import TOOL, current_span, span
+
+from .context_compression import fit_passages
+from .search_cache import RequestCoalescer, SearchCache, get_search_cache, search_key
+
+logger = logging.getLogger(__name__)
+
+# Shared by every tool instance so identical concurrent queries from different agents
+# or crews result in a single DuckDuckGo request.
+_COALESCER = RequestCoalescer()
+
+# Rewrites tried, in order, when query variants are requested.
+_VARIANT_TEMPLATES = ("{query} explained", "{query} examples", "{query} tutorial")
+FANOUT_WORKERS = 8
+
+_fanout_pool: Optional[ThreadPoolExecutor] = None
+_fanout_pool_lock = threading.Lock()
+
+# duckduckgo_search is imported on the first real search; tests and benchmarks may assign a
+# stand-in class here beforehand.
+DDGS: Optional[type] = None
+
+
+def _ddgs_class() -> type:
+    global DDGS
+    if DDGS is None:
+        from duckduckgo_search import DDGS as _DDGS
+
+        DDGS = _DDGS
+    return DDGS
+
+
+class DDGSSessionPool:
+    """Process-wide pool of idle DDGS sessions, each used by one search at a time.
+
+    DDGS is not documented as thread-safe, so a search checks a session out for its
+    duration. At most ``max_idle`` sessions are kept; the rest, and any session whose
+    search raised, are closed rather than dropped.
+    """
+
+    def __init__(self, max_idle: int = FANOUT_WORKERS) -> None:
+        self.max_idle = max_idle
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self) -> Iterator[Any]:
+        ddgs_class = _ddgs_class()
+        stale: List[Any] = []
+        session = None
+        with self._lock:
+            while self._idle and session is None:
+                candidate = self._idle.pop()
+                # A stand-in class may have been installed since the session was created.
+                if type(candidate) is ddgs_class:
+                    session = candidate
+                else:
+                    stale.append(candidate)
+        for candidate in stale:
+            _close_session(candidate)
+        if session is None:
+            session = ddgs_class()
+        try:
+            yield session
+        except BaseException:
+            # Start from a fresh session next time in case this one is in a bad state.
+            _close_session(session)
+            raise
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(session)
+                return
+        _close_session(session)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for session in idle:
+            _close_session(session)
+
+
+def _close_session(session: Any) -> None:
+    exit_session = getattr(session, "__exit__", None)
+    if exit_session is None:
+        return
+    try:
+        exit_session(None, None, None)
+    except Exception:  # pragma: no cover - best effort cleanup
+        logger.debug("Closing DDGS session failed", exc_info=True)
+
+
+_SESSIONS = DDGSSessionPool()
+atexit.register(_SESSIONS.close)
+
+
+def _get_fanout_pool() -> ThreadPoolExecutor:
+    """Process-wide pool for fan-out searches; searches outliving their deadline finish here."""
+    global _fanout_pool
+    with _fanout_pool_lock:
+        if _fanout_pool is None:
+            _fanout_pool = ThreadPoolExecutor(
+                max_workers=FANOUT_WORKERS, thread_name_prefix="web-search"
+            )
+        return _fanout_pool
+
+
+def query_variants(query: str, count: int) -> List[str]:
+    """Return ``query`` followed by up to ``count`` educational rewrites of it."""
+    variants = [query]
+    for template in _VARIANT_TEMPLATES[: max(0, count)]:
+        variants.append(template.format(query=query.strip()))
+    return variants
+
+
+def result_url(item: Dict[str, Any]) -> str:
+    return item.get("href") or item.get("url") or ""
+
+
+def merge_results(result_lists: List[List[Dict[str, Any]]], limit: int) -> List[Dict[str, Any]]:
+    """Interleave result lists round-robin, dropping repeated URLs, up to ``limit`` items."""
+    merged: List[Dict[str, Any]] = []
+    seen: set[str] = set()
+    depth = max((len(results) for results in result_lists), default=0)
+    for rank in range(depth):
+        for results in result_lists:
+            if rank >= len(results):
+                continue
+            item = results[rank]
+            url = result_url(item).rstrip("/").lower()
+            if url and url in seen:
+                continue
+            seen.add(url)
+            merged.append(item)
+            if len(merged) >= limit:
+                return merged
+    return merged
+
 
 class EducationalWebSearch(BaseTool):
     """Web search tool optimized for educational content and study material research."""
@@ -26,46 +178,169 @@ class EducationalWebSearch(BaseTool):
         default="text",
         description="DuckDuckGo backend to use (text, news, images).",
     )
+    backends: List[str] = Field(
+        default_factory=list,
+        description="Backends to query in parallel; empty means only `backend`.",
+    )
+    variants: int = Field(
+        default=0, ge=0, description="Rewritten query variants to search alongside the query"
+    )
+    deadline_seconds: float = Field(
+        default=15.0, gt=0, description="Return whatever has arrived after this many seconds"
+    )
+    context_token_budget: int = Field(
+        default=800, ge=0, description="Trim result summaries to this many tokens (0: no limit)"
+    )
+    use_cache: bool = Field(default=True, description="Read and write the on-disk result cache")
+    offline: bool = Field(
+        default=False, description="Serve results only from the cache and never touch the network"
+    )
+    cache_path: Path = Field(default_factory=lambda: WEB_SEARCH_CACHE_PATH)
+    cache_ttl_seconds: float = WEB_SEARCH_CACHE_TTL_SECONDS
+    cache_max_entries: int = WEB_SEARCH_CACHE_MAX_ENTRIES
 
     _logger = logging.getLogger(__name__)
 
     def _run(self, query: str) -> str:
         """Search the web for educational content."""
         self._logger.info("Educational web search for: %s", query)
-        results = self._search(query)
+        with span(TOOL, self.name, query=query, offline=self.offline) as tool_span:
+            results = self._search(query)
+            tool_span.set(results=len(results))
         if not results:
+            if self.offline:
+                return (
+                    f"No cached web results for '{query}' (offline mode). "
+                    "Rely on the knowledge base instead."
+                )
             return (
                 f"No web results found for '{query}'. Try rephrasing the search query "
                 "or use more specific educational terms."
             )
 
+        summaries = [
+            item.get("body")
+            or item.get("snippet")
+            or item.get("description")
+            or item.get("title")
+            or result_url(item)
+            for item in results
+        ]
         formatted = []
-        for index, item in enumerate(results, start=1):
+        for number, (index, summary) in enumerate(
+            fit_passages(summaries, self.context_token_budget), start=1
+        ):
+            item = results[index]
             title = item.get("title") or item.get("heading") or "Untitled result"
-            url = item.get("href") or item.get("url") or ""
-            summary = (
-                item.get("body")
-                or item.get("snippet")
-                or item.get("description")
-                or "No summary provided."
-            )
-            formatted.append(
-                f"🔍 Source {index}: {title}\n"
-                f"📎 URL: {url}\n"
-                f"📄 Summary: {summary.strip()}\n"
-                f"{'─' * 60}"
-            )
+            formatted.append(f"[{number}] {title}\nURL: {result_url(item)}\n{summary}")
 
         serialized = "\n\n".join(formatted)
         self._logger.info("Found %d educational web results for: %s", len(results), query)
         return serialized
 
+    def _cache(self) -> Optional[SearchCache]:
+        if not (self.use_cache or self.offline):
+            return None
+        return get_search_cache(
+            self.cache_path,
+            ttl_seconds=self.cache_ttl_seconds,
+            max_entries=self.cache_max_entries,
+        )
+
     def _search(self, query: str) -> list[dict[str, Any]]:
+        """Search every configured (backend, query variant) pair and merge the results."""
+        backends = self.backends or [self.backend]
+        jobs = [
+            (backend, variant)
+            for variant in query_variants(query, self.variants)
+            for backend in backends
+        ]
+        if len(jobs) == 1:
+            return self._search_one(*jobs[0])
+        return self._fan_out(query, backends, jobs)
+
+    def _fan_out(
+        self, query: str, backends: List[str], jobs: List[Tuple[str, str]]
+    ) -> list[dict[str, Any]]:
+        pool = _get_fanout_pool()
+        started = time.perf_counter()
+        # Each search runs in a copy of this context so it counts towards the tool span.
+        futures: Dict[Future, int] = {
+            pool.submit(
+                contextvars.copy_context().run, self._search_one, backend, variant
+            ): position
+            for position, (backend, variant) in enumerate(jobs)
+        }
+        collected: List[List[Dict[str, Any]]] = [[] for _ in jobs]
+        errors: List[BaseException] = []
+        pending = set(futures)
+        deadline = started + self.deadline_seconds
+        while pending:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is not None:
+                    errors.append(error)
+                    backend, variant = jobs[futures[future]]
+                    self._logger.warning("Web search %s/'%s' failed: %s", backend, variant, error)
+                else:
+                    collected[futures[future]] = future.result()
+
+        if pending:
+            # Stragglers keep running in the pool and still fill the cache for next time.
+            self._logger.warning(
+                "Web search deadline of %.1fs hit for '%s'; returning %d/%d result sets",
+                self.deadline_seconds,
+                query,
+                len(jobs) - len(pending) - len(errors),
+                len(jobs),
+            )
+        if errors and len(errors) == len(jobs):
+            raise errors[0]
+        # Variants widen recall but should not multiply the text handed to the agent.
+        merged = merge_results(collected, self.max_results * len(backends))
+        self._logger.info(
+            "Fan-out web search for '%s': %d searches, %d unique results in %.2fs",
+            query,
+            len(jobs),
+            len(merged),
+            time.perf_counter() - started,
+        )
+        return merged
+
+    def _search_one(self, backend: str, query: str) -> list[dict[str, Any]]:
+        """Return results from the cache, a concurrent identical request, or DuckDuckGo."""
+        key = search_key(backend, query, self.max_results)
+        cache = self._cache()
+        if cache is not None:
+            # Offline replays serve whatever is recorded, however old.
+            cached = cache.get(key, ignore_ttl=self.offline)
+            if cached is not None:
+                self._logger.info("Web search cache hit for: %s", query)
+                _count_on_span("cache_hits")
+                return cached
+        if self.offline:
+            self._logger.info("Offline mode: no cached web results for: %s", query)
+            return []
+
+        def _fetch() -> list[dict[str, Any]]:
+            results = self._fetch(backend, query)
+            if cache is not None:
+                cache.put(key, backend, query, self.max_results, results)
+            return results
+
+        _count_on_span("cache_misses")
+        return _COALESCER.run(key, _fetch)
+
+    def _fetch(self, backend: str, query: str) -> list[dict[str, Any]]:
         try:
-            with DDGS() as ddgs:
-                if self.backend == "news":
+            with _SESSIONS.session() as ddgs:
+                if backend == "news":
                     iterator = ddgs.news(query, max_results=self.max_results)
-                elif self.backend == "images":
+                elif backend == "images":
                     iterator = ddgs.images(query, max_results=self.max_results)
                 else:
                     iterator = ddgs.text(query, max_results=self.max_results)
@@ -75,6 +350,18 @@ class EducationalWebSearch(BaseTool):
             raise ValueError(f"DuckDuckGo search failed: {exc}") from exc
 
 
+def _count_on_span(key: str) -> None:
+    active = current_span()
+    if active is not None:
+        active.incr(key)
+
+
 def create_web_search_tool() -> EducationalWebSearch:
     """Create an educational web search tool optimized for study material research."""
-    return EducationalWebSearch(max_results=5)
+    return EducationalWebSearch(
+        max_results=5,
+        backends=WEB_SEARCH_BACKENDS,
+        variants=WEB_SEARCH_QUERY_VARIANTS,
+        deadline_seconds=WEB_SEARCH_DEADLINE_SECONDS,
+        offline=WEB_SEARCH_OFFLINE,
+    )
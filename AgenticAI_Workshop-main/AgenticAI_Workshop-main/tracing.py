@@ -0,0 +1,393 @@
+"""Run-level tracing: nested spans for runs, tasks, tool calls and LLM requests.
+
+Tracing is opt-in (STUDY_COMPANION_TRACING=1). Finished spans are appended to a JSONL
+file (and optionally mirrored to OpenTelemetry). Summarize latency per span type over
+many runs with:
+
+    python tracing.py logs/traces.jsonl
+    python tracing.py logs/traces.jsonl --by-name
+"""
+from __future__ import annotations
+
+import argparse
+import atexit
+import contextlib
+import contextvars
+import json
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Sequence, TextIO
+
+from config.settings import (
+    TRACE_BACKUPS,
+    TRACE_FILE,
+    TRACE_MAX_BYTES,
+    TRACE_OTEL,
+    TRACING_ENABLED,
+)
+
+logger = logging.getLogger(__name__)
+
+RUN = "run"
+TASK = "task"
+# One fallback attempt (whole crew in sequential mode, one task in parallel mode).
+ATTEMPT = "attempt"
+TOOL = "tool"
+LLM = "llm"
+SPAN_KINDS = (RUN, TASK, ATTEMPT, TOOL, LLM)
+
+
+@dataclass
+class Span:
+    """One timed unit of work; ``attributes`` hold tokens, cache hits, attempt index, etc."""
+
+    kind: str
+    name: str
+    trace_id: str
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    parent_id: Optional[str] = None
+    start: float = field(default_factory=time.time)
+    duration_ms: float = 0.0
+    status: str = "ok"
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    def set(self, **attributes: Any) -> None:
+        with self._lock:
+            self.attributes.update(attributes)
+
+    def incr(self, key: str, amount: int = 1) -> None:
+        """Add to a counter attribute; safe when several threads work under one span."""
+        with self._lock:
+            self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            attributes = dict(self.attributes)
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": attributes,
+        }
+
+
+class SpanExporter(Protocol):
+    def on_start(self, span: Span) -> None: ...
+
+    def on_end(self, span: Span) -> None: ...
+
+
+class JsonlExporter:
+    """Append finished spans as JSON lines through one open file, rotating it by size.
+
+    Lines are buffered and written together when a root (run) span ends, every
+    ``flush_every`` spans and at exit, so whole lines reach the file in one write. Once
+    the file passes ``max_bytes`` it is renamed to ``<name>.1`` (older backups shift up,
+    at most ``backups`` are kept) and a new file is started.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_bytes: int = TRACE_MAX_BYTES,
+        backups: int = TRACE_BACKUPS,
+        flush_every: int = 200,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_every = max(1, flush_every)
+        self._lock = threading.Lock()
+        self._pending: List[str] = []
+        self._handle: Optional[TextIO] = None
+        self._size = 0
+        atexit.register(self.close)
+
+    def on_start(self, span: Span) -> None:
+        pass
+
+    def on_end(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            self._pending.append(line + "\n")
+            if span.parent_id is None or len(self._pending) >= self.flush_every:
+                self._flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        if self._handle is None:
+            self._handle = self.path.open("a", encoding="utf-8")
+            self._size = self._handle.seek(0, 2)
+        chunk = "".join(self._pending)
+        self._pending.clear()
+        self._handle.write(chunk)
+        self._handle.flush()
+        self._size += len(chunk.encode("utf-8"))
+        if self.max_bytes and self._size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if self.backups <= 0:
+            self.path.unlink(missing_ok=True)
+            return
+        for index in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{index}")
+            if older.exists():
+                older.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+        self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+
+
+class OpenTelemetryExporter:
+    """Mirror spans to the globally configured OpenTelemetry tracer provider."""
+
+    def __init__(self) -> None:
+        from opentelemetry import trace
+
+        self._trace = trace
+        self._tracer = trace.get_tracer("study_companion")
+        self._live: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span) -> None:
+        with self._lock:
+            parent = self._live.get(span.parent_id or "")
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        otel_span = self._tracer.start_span(
+            f"{span.kind}:{span.name}", context=context, start_time=int(span.start * 1e9)
+        )
+        with self._lock:
+            self._live[span.span_id] = otel_span
+
+    def on_end(self, span: Span) -> None:
+        with self._lock:
+            otel_span = self._live.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        otel_span.set_attribute("span.kind", span.kind)
+        for key, value in span.to_dict()["attributes"].items():
+            if isinstance(value, (bool, int, float, str)):
+                otel_span.set_attribute(key, value)
+        if span.status == "error":
+            from opentelemetry.trace import Status, StatusCode
+
+            otel_span.set_status(Status(StatusCode.ERROR, span.error or ""))
+        otel_span.end(end_time=int((span.start + span.duration_ms / 1000) * 1e9))
+
+
+class Tracer:
+    """Create spans and hand them to the exporters; a tracer without exporters is a no-op."""
+
+    def __init__(self, exporters: Sequence[SpanExporter]) -> None:
+        self.exporters = list(exporters)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    def _notify(self, hook: str, span: Span) -> None:
+        for exporter in self.exporters:
+            try:
+                getattr(exporter, hook)(span)
+            except Exception:  # pragma: no cover - tracing must never break a run
+                logger.debug("Span exporter %s failed", type(exporter).__name__, exc_info=True)
+
+    @contextlib.contextmanager
+    def span(self, kind: str, name: str, **attributes: Any) -> Iterator[Span]:
+        parent = _CURRENT_SPAN.get()
+        span = Span(
+            kind=kind,
+            name=name,
+            trace_id=parent.trace_id if parent is not None else uuid.uuid4().hex,
+            parent_id=parent.span_id if parent is not None else None,
+            attributes=dict(attributes),
+        )
+        token = _CURRENT_SPAN.set(span)
+        started = time.perf_counter()
+        if self.enabled:
+            self._notify("on_start", span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.status = "error"
+            span.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            span.duration_ms = (time.perf_counter() - started) * 1000
+            _CURRENT_SPAN.reset(token)
+            if self.enabled:
+                self._notify("on_end", span)
+
+    def record(self, kind: str, name: str, seconds: float, **attributes: Any) -> None:
+        """Export an already finished span, e.g. a task timed by a CrewAI callback."""
+        if not self.enabled:
+            return
+        parent = _CURRENT_SPAN.get()
+        span = Span(
+            kind=kind,
+            name=name,
+            trace_id=parent.trace_id if parent is not None else uuid.uuid4().hex,
+            parent_id=parent.span_id if parent is not None else None,
+            start=time.time() - seconds,
+            duration_ms=seconds * 1000,
+            attributes=dict(attributes),
+        )
+        self._notify("on_start", span)
+        self._notify("on_end", span)
+
+
+_CURRENT_SPAN: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "study_companion_span", default=None
+)
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def _default_exporters() -> List[SpanExporter]:
+    if not TRACING_ENABLED:
+        return []
+    exporters: List[SpanExporter] = [JsonlExporter(TRACE_FILE)]
+    if TRACE_OTEL:
+        try:
+            exporters.append(OpenTelemetryExporter())
+        except ImportError:
+            logger.warning(
+                "STUDY_COMPANION_TRACE_OTEL is set but opentelemetry-api is not installed"
+            )
+    return exporters
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer, configured from settings on first use."""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(_default_exporters())
+        return _tracer
+
+
+def set_tracer(tracer: Tracer) -> None:
+    """Replace the process-wide tracer (e.g. to export to a different file)."""
+    global _tracer
+    with _tracer_lock:
+        _tracer = tracer
+
+
+def span(kind: str, name: str, **attributes: Any) -> contextlib.AbstractContextManager[Span]:
+    """Open a child of the current span (or a new trace); see :meth:`Tracer.span`."""
+    return get_tracer().span(kind, name, **attributes)
+
+
+def current_span() -> Optional[Span]:
+    return _CURRENT_SPAN.get()
+
+
+# --- Report -----------------------------------------------------------------------
+
+
+def load_spans(paths: Sequence[Path]) -> List[Dict[str, Any]]:
+    spans: List[Dict[str, Any]] = []
+    for path in paths:
+        with Path(path).open(encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if line:
+                    spans.append(json.loads(line))
+    return spans
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 for an empty sequence).
+
+    Shared by the trace report and benchmarks/run_benchmarks.py so their p50/p95 agree.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(spans: Sequence[Dict[str, Any]], *, by_name: bool = False) -> str:
+    """Table of count, p50/p95/max latency, errors, tokens and cache hits per span group."""
+    groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for record in spans:
+        key = f"{record['kind']}:{record['name']}" if by_name else record["kind"]
+        groups[key].append(record)
+
+    order = {kind: index for index, kind in enumerate(SPAN_KINDS)}
+    header = (
+        f"{'span':<44} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10} "
+        f"{'errors':>6} {'tokens':>9} {'cache hits':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for key in sorted(groups, key=lambda k: (order.get(k.split(":")[0], len(order)), k)):
+        records = groups[key]
+        durations = [float(record["duration_ms"]) for record in records]
+        attributes = [record.get("attributes", {}) for record in records]
+        tokens = sum(int(attrs.get("total_tokens", 0) or 0) for attrs in attributes)
+        cache_hits = sum(
+            int(attrs.get("cache_hits", 0) or 0) + (1 if attrs.get("cached") else 0)
+            for attrs in attributes
+        )
+        errors = sum(1 for record in records if record.get("status") == "error")
+        lines.append(
+            f"{key[:44]:<44} {len(records):>6} {percentile(durations, 50):>10.1f} "
+            f"{percentile(durations, 95):>10.1f} {max(durations):>10.1f} "
+            f"{errors:>6} {tokens:>9} {cache_hits:>10}"
+        )
+    return "\n".join(lines)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Summarize span latencies from trace files.")
+    parser.add_argument("files", nargs="*", type=Path, default=[TRACE_FILE])
+    parser.add_argument("--by-name", action="store_true", help="Group by span name, not just type")
+    parser.add_argument("--last-runs", type=int, default=0, help="Only the N most recent runs (0 = all)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    records = load_spans(args.files)
+    if args.last_runs:
+        runs = sorted(
+            (record for record in records if record["kind"] == RUN), key=lambda record: record["start"]
+        )
+        keep = {record["trace_id"] for record in runs[-args.last_runs:]}
+        records = [record for record in records if record["trace_id"] in keep]
+    traces = len({record["trace_id"] for record in records})
+    print(f"{len(records)} spans from {traces} traces")
+    print(summarize(records, by_name=args.by_name))
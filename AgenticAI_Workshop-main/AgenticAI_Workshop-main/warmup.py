@@ -0,0 +1,177 @@
+"""Background warm-up of imports, the knowledge base and LLM connections at process start."""
+from __future__ import annotations
+
+import importlib
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from config.settings import WARMUP_ENABLED, get_llm_clients, get_openrouter_config
+
+logger = logging.getLogger(__name__)
+
+IDLE = "idle"
+WARMING = "warming"
+READY = "ready"
+# Some steps failed; the pipeline still works and loads those pieces on first use.
+DEGRADED = "degraded"
+DISABLED = "disabled"
+
+WARMUP_QUERY = "introduction to the topic"
+CONNECT_TIMEOUT_SECONDS = 10.0
+
+
+@dataclass
+class WarmupStep:
+    """Outcome of one warm-up step."""
+
+    name: str
+    status: str = "pending"
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class WarmupState:
+    """Snapshot of the warm-up for the UI and logs."""
+
+    status: str = IDLE
+    seconds: float = 0.0
+    steps: List[WarmupStep] = field(default_factory=list)
+
+    @property
+    def ready(self) -> bool:
+        return self.status in (READY, DEGRADED, DISABLED)
+
+    @property
+    def current_step(self) -> Optional[str]:
+        for step in self.steps:
+            if step.status == "running":
+                return step.name
+        return None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "seconds": self.seconds,
+            "steps": [asdict(step) for step in self.steps],
+        }
+
+
+def import_pipeline() -> None:
+    """Import CrewAI, LangChain and the tool backends that main.py defers."""
+    importlib.import_module("crew")
+
+
+def load_knowledge_base() -> None:
+    """Load the embedding model and index, and run one embedding and search through them."""
+    from tools.rag_tool import EducationalKnowledgeRetriever
+
+    retriever = EducationalKnowledgeRetriever(cache_size=0)
+    retriever.search_many([WARMUP_QUERY])
+
+
+def open_llm_connections() -> None:
+    """Open keep-alive connections (TCP + TLS) to the primary and fallback LLM endpoints."""
+    config = get_openrouter_config()
+    client = get_llm_clients().http_client("litellm")
+    for base_url in dict.fromkeys([config.base_url, *config.fallback_base_urls]):
+        # Any response will do: the point is the pooled connection left behind.
+        client.head(base_url, timeout=CONNECT_TIMEOUT_SECONDS)
+
+
+DEFAULT_STEPS: Tuple[Tuple[str, Callable[[], None]], ...] = (
+    ("imports", import_pipeline),
+    ("knowledge base", load_knowledge_base),
+    ("LLM connections", open_llm_connections),
+)
+
+
+class Warmer:
+    """Run warm-up steps once, in a daemon thread, and report their progress."""
+
+    def __init__(
+        self,
+        steps: Sequence[Tuple[str, Callable[[], None]]] = DEFAULT_STEPS,
+        *,
+        enabled: bool = True,
+    ) -> None:
+        self._steps = list(steps)
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._state = WarmupState(
+            status=IDLE if enabled else DISABLED,
+            steps=[WarmupStep(name) for name, _ in self._steps],
+        )
+        if not enabled:
+            self._done.set()
+
+    def start(self) -> "Warmer":
+        """Start warming up unless it already started or is disabled; returns immediately."""
+        with self._lock:
+            if self._thread is not None or self._state.status == DISABLED:
+                return self
+            self._state.status = WARMING
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until warm-up finished (or ``timeout`` passed); True when finished."""
+        return self._done.wait(timeout)
+
+    def state(self) -> WarmupState:
+        with self._lock:
+            return WarmupState(
+                status=self._state.status,
+                seconds=self._state.seconds,
+                steps=[WarmupStep(**asdict(step)) for step in self._state.steps],
+            )
+
+    def _run(self) -> None:
+        started = time.perf_counter()
+        failed = False
+        for (name, run), step in zip(self._steps, self._state.steps):
+            with self._lock:
+                step.status = "running"
+            step_started = time.perf_counter()
+            try:
+                run()
+            except Exception as exc:
+                failed = True
+                with self._lock:
+                    step.status = "failed"
+                    step.error = f"{type(exc).__name__}: {exc}"
+                logger.warning("Warm-up step '%s' failed: %s", name, step.error)
+            else:
+                with self._lock:
+                    step.status = "done"
+            finally:
+                with self._lock:
+                    step.seconds = time.perf_counter() - step_started
+        with self._lock:
+            self._state.seconds = time.perf_counter() - started
+            self._state.status = DEGRADED if failed else READY
+        logger.info("Warm-up finished (%s) in %.1fs", self._state.status, self._state.seconds)
+        self._done.set()
+
+
+_warmer: Optional[Warmer] = None
+_warmer_lock = threading.Lock()
+
+
+def get_warmer() -> Warmer:
+    """Return the process-wide warmer, disabled when STUDY_COMPANION_WARMUP is off."""
+    global _warmer
+    with _warmer_lock:
+        if _warmer is None:
+            _warmer = Warmer(enabled=WARMUP_ENABLED)
+        return _warmer
+
+
+def start_warmup() -> Warmer:
+    """Start the process-wide warm-up once; safe to call on every Streamlit rerun."""
+    return get_warmer().start()